@@ -0,0 +1,33 @@
+"""add composite index for conversation listing
+
+Revision ID: 0001_conv_list_index
+Revises:
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_conv_list_index'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Tables are created by init_db (create_all), which never adds indexes to
+    # an existing table, so existing deployments need this migration.
+    op.create_index(
+        'ix_conv_user_arch_updated',
+        'conversations',
+        ['user_id', 'archived', sa.text('updated_at DESC')],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_conv_user_arch_updated', table_name='conversations', if_exists=True)
@@ -10,8 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.user import User
 from app.auth import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     verify_token,
@@ -62,7 +62,7 @@ async def register(
     # Create user
     user = User(
         email=request.email,
-        password_hash=hash_password(request.password),
+        password_hash=await hash_password_async(request.password),
         display_name=request.display_name,
     )
     db.add(user)
@@ -90,7 +90,7 @@ async def login(
     )
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(request.password, user.password_hash):
+    if not user or not await verify_password_async(request.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -4,27 +4,69 @@ Chat Endpoints
 Core chat functionality with streaming responses and tool execution.
 """
 
-import json
+import asyncio
 import logging
 from typing import Optional
 from uuid import UUID, uuid4
 from datetime import datetime
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import delete, func, lambda_stmt, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
 
 from app.database import get_db
 from app.models.user import User
 from app.models.conversation import Conversation, Message
-from app.auth.deps import get_current_user
+from app.auth.deps import get_auth_context, get_current_user
 from app.services.claude import ClaudeService
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Pre-encoded SSE frames - Starlette sends bytes as-is, skipping a per-chunk encode
+_SSE_END = b'data: {"type":"end"}\n\n'
+
+
+def _sse(event: dict) -> bytes:
+    """Encode one event as an SSE data frame."""
+    return b"data: " + orjson.dumps(event) + b"\n\n"
+
+
+# Ownership-scoped statements. lambda_stmt caches the constructed statement
+# and its cache key on the lambda's code location, so per-request work is
+# just binding the closure variables (conversation_id, user_id) as parameters.
+def _owned_conversation(conversation_id: UUID, user_id: UUID):
+    """SELECT the conversation only if it belongs to user_id."""
+    return lambda_stmt(
+        lambda: select(Conversation)
+        .where(Conversation.id == conversation_id)
+        .where(Conversation.user_id == user_id)
+    )
+
+
+def _owned_conversation_id(conversation_id: UUID, user_id: UUID):
+    """SELECT just the id, for existence/ownership checks."""
+    return lambda_stmt(
+        lambda: select(Conversation.id)
+        .where(Conversation.id == conversation_id)
+        .where(Conversation.user_id == user_id)
+    )
+
+
+def _delete_owned_conversation(conversation_id: UUID, user_id: UUID):
+    """DELETE the conversation if owned, RETURNING its id."""
+    return lambda_stmt(
+        lambda: delete(Conversation)
+        .where(Conversation.id == conversation_id)
+        .where(Conversation.user_id == user_id)
+        .returning(Conversation.id)
+    )
+
+
 # Initialize Claude service
 _claude_service = None
 
@@ -62,6 +104,32 @@ class ConversationListResponse(BaseModel):
     total: int
 
 
+class MessageOut(BaseModel):
+    id: UUID
+    role: str
+    content: str
+    tool_calls: Optional[dict]
+    tool_results: Optional[dict]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ConversationDetailResponse(BaseModel):
+    id: UUID
+    title: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    favorite: bool
+    archived: bool
+    tags: Optional[list[str]]
+    messages: list[MessageOut]
+
+    class Config:
+        from_attributes = True
+
+
 # Endpoints
 @router.post("/message")
 async def send_message(
@@ -88,9 +156,7 @@ async def send_message(
     conversation = None
     if request.conversation_id:
         result = await db.execute(
-            select(Conversation)
-            .where(Conversation.id == request.conversation_id)
-            .where(Conversation.user_id == user.id)
+            _owned_conversation(request.conversation_id, user.id)
         )
         conversation = result.scalar_one_or_none()
 
@@ -125,21 +191,26 @@ async def send_message(
     system_prompt = """You are ApexAurum, a helpful AI assistant. Be concise, accurate, and friendly."""
 
     if request.stream:
-        async def stream_response():
-            full_response = ""
+        # The upstream reader runs as its own task and hands pre-encoded frames
+        # over a bounded queue, so a slow client write doesn't stall reading
+        # from Claude (and vice versa) beyond the queue's slack.
+        queue: asyncio.Queue = asyncio.Queue(maxsize=64)
+
+        async def produce():
+            full_response = []
             try:
-                yield f"data: {json.dumps({'type': 'start', 'conversation_id': str(conversation.id)})}\n\n"
+                await queue.put(_sse({"type": "start", "conversation_id": str(conversation.id)}))
 
                 async for event in claude.chat_stream(
                     messages=messages,
                     model=request.model,
                     system=system_prompt,
                 ):
-                    yield f"data: {json.dumps(event)}\n\n"
+                    await queue.put(_sse(event))
                     if event.get("type") == "token":
-                        full_response += event.get("content", "")
+                        full_response.append(event.get("content", ""))
 
-                yield f"data: {json.dumps({'type': 'end'})}\n\n"
+                await queue.put(_SSE_END)
 
                 # Save assistant message after streaming completes
                 # Note: This runs in the generator context, db session may be closed
@@ -147,7 +218,19 @@ async def send_message(
 
             except Exception as e:
                 logger.error(f"Streaming error: {e}")
-                yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+                await queue.put(_sse({"type": "error", "message": str(e)}))
+
+            # Sentinel: end of stream (skipped when cancelled - nobody is reading)
+            await queue.put(None)
+
+        async def stream_response():
+            producer = asyncio.create_task(produce())
+            try:
+                while (frame := await queue.get()) is not None:
+                    yield frame
+            finally:
+                # Client disconnected (or stream finished) - stop reading upstream
+                producer.cancel()
 
         return StreamingResponse(
             stream_response(),
@@ -203,28 +286,42 @@ async def list_conversations(
     limit: int = 50,
     offset: int = 0,
     archived: bool = False,
-    user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    ctx: tuple[User, AsyncSession] = Depends(get_auth_context),
 ):
     """List user's conversations."""
+    user, db = ctx
+    # Count messages in SQL instead of lazy-loading c.messages per row (N+1).
+    # The window count is evaluated after GROUP BY and before LIMIT, so every
+    # row also carries the total number of matching conversations.
     result = await db.execute(
-        select(Conversation)
+        select(
+            Conversation,
+            func.count(Message.id).label("message_count"),
+            func.count().over().label("total"),
+        )
+        .outerjoin(Message, Message.conversation_id == Conversation.id)
         .where(Conversation.user_id == user.id)
         .where(Conversation.archived == archived)
+        .group_by(Conversation.id)
         .order_by(Conversation.updated_at.desc())
         .limit(limit)
         .offset(offset)
+        .options(raiseload("*"))
     )
-    conversations = result.scalars().all()
-
-    # Get total count
-    from sqlalchemy import func
-    count_result = await db.execute(
-        select(func.count(Conversation.id))
-        .where(Conversation.user_id == user.id)
-        .where(Conversation.archived == archived)
-    )
-    total = count_result.scalar()
+    rows = result.all()
+
+    if rows:
+        total = rows[0].total
+    elif offset:
+        # Paged past the end - no row to read the window total from
+        count_result = await db.execute(
+            select(func.count(Conversation.id))
+            .where(Conversation.user_id == user.id)
+            .where(Conversation.archived == archived)
+        )
+        total = count_result.scalar()
+    else:
+        total = 0
 
     return ConversationListResponse(
         conversations=[
@@ -233,28 +330,30 @@ async def list_conversations(
                 title=c.title,
                 created_at=c.created_at.isoformat(),
                 updated_at=c.updated_at.isoformat(),
-                message_count=len(c.messages),
+                message_count=message_count,
                 favorite=c.favorite,
                 archived=c.archived,
             )
-            for c in conversations
+            for c, message_count, _ in rows
         ],
         total=total,
     )
 
 
-@router.get("/conversations/{conversation_id}")
+@router.get(
+    "/conversations/{conversation_id}",
+    response_model=ConversationDetailResponse,
+    response_class=ORJSONResponse,
+)
 async def get_conversation(
     conversation_id: UUID,
-    user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    ctx: tuple[User, AsyncSession] = Depends(get_auth_context),
 ):
     """Get a conversation with all messages."""
-    result = await db.execute(
-        select(Conversation)
-        .where(Conversation.id == conversation_id)
-        .where(Conversation.user_id == user.id)
-    )
+    user, db = ctx
+    stmt = _owned_conversation(conversation_id, user.id)
+    stmt += lambda s: s.options(selectinload(Conversation.messages), raiseload("*"))
+    result = await db.execute(stmt)
     conversation = result.scalar_one_or_none()
 
     if not conversation:
@@ -263,49 +362,25 @@ async def get_conversation(
             detail="Conversation not found"
         )
 
-    return {
-        "id": conversation.id,
-        "title": conversation.title,
-        "created_at": conversation.created_at.isoformat(),
-        "updated_at": conversation.updated_at.isoformat(),
-        "favorite": conversation.favorite,
-        "archived": conversation.archived,
-        "tags": conversation.tags,
-        "messages": [
-            {
-                "id": m.id,
-                "role": m.role,
-                "content": m.content,
-                "tool_calls": m.tool_calls,
-                "tool_results": m.tool_results,
-                "created_at": m.created_at.isoformat(),
-            }
-            for m in conversation.messages
-        ],
-    }
+    return ConversationDetailResponse.model_validate(conversation)
 
 
 @router.delete("/conversations/{conversation_id}")
 async def delete_conversation(
     conversation_id: UUID,
-    user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    ctx: tuple[User, AsyncSession] = Depends(get_auth_context),
 ):
     """Delete a conversation."""
-    result = await db.execute(
-        select(Conversation)
-        .where(Conversation.id == conversation_id)
-        .where(Conversation.user_id == user.id)
-    )
-    conversation = result.scalar_one_or_none()
+    user, db = ctx
+    # Authorize and delete in one round trip; messages go via ON DELETE CASCADE
+    result = await db.execute(_delete_owned_conversation(conversation_id, user.id))
 
-    if not conversation:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found"
         )
 
-    await db.delete(conversation)
     return {"message": "Conversation deleted"}
 
 
@@ -315,28 +390,36 @@ async def update_conversation(
     title: Optional[str] = None,
     favorite: Optional[bool] = None,
     archived: Optional[bool] = None,
-    user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    ctx: tuple[User, AsyncSession] = Depends(get_auth_context),
 ):
     """Update conversation metadata."""
-    result = await db.execute(
-        select(Conversation)
-        .where(Conversation.id == conversation_id)
-        .where(Conversation.user_id == user.id)
-    )
-    conversation = result.scalar_one_or_none()
+    user, db = ctx
+    changes = {}
+    if title is not None:
+        changes["title"] = title
+    if favorite is not None:
+        changes["favorite"] = favorite
+    if archived is not None:
+        changes["archived"] = archived
+
+    if changes:
+        # Authorize and update in one round trip. The SET clause depends on
+        # which fields were sent, so this one stays a regular statement.
+        stmt = (
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .where(Conversation.user_id == user.id)
+            .values(**changes)
+            .returning(Conversation.id)
+        )
+    else:
+        stmt = _owned_conversation_id(conversation_id, user.id)
+    result = await db.execute(stmt)
 
-    if not conversation:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Conversation not found"
         )
 
-    if title is not None:
-        conversation.title = title
-    if favorite is not None:
-        conversation.favorite = favorite
-    if archived is not None:
-        conversation.archived = archived
-
     return {"message": "Conversation updated"}
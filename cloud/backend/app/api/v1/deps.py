@@ -8,7 +8,7 @@ from typing import AsyncGenerator
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_session_factory
+from app.database import get_session_factory, has_pending_writes
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -17,7 +17,8 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with session_factory() as session:
         try:
             yield session
-            await session.commit()
+            if has_pending_writes(session):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -12,7 +12,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.user import User
-from app.auth.deps import get_current_user
+from app.auth.deps import get_current_user, invalidate_cached_user
 
 router = APIRouter()
 
@@ -65,6 +65,7 @@ async def update_profile(
     db: AsyncSession = Depends(get_db)
 ):
     """Update user profile."""
+    invalidate_cached_user(user.id, db)
     if request.display_name is not None:
         user.display_name = request.display_name
 
@@ -162,6 +163,7 @@ async def update_preferences(
     db: AsyncSession = Depends(get_db)
 ):
     """Update user preferences."""
+    invalidate_cached_user(user.id, db)
     current_settings = user.settings or {}
     current_settings.update(preferences)
     user.settings = current_settings
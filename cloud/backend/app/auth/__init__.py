@@ -3,8 +3,13 @@ ApexAurum Cloud - Authentication Module
 """
 
 from app.auth.jwt import create_access_token, create_refresh_token, verify_token
-from app.auth.password import hash_password, verify_password
-from app.auth.deps import get_current_user
+from app.auth.password import (
+    hash_password,
+    verify_password,
+    hash_password_async,
+    verify_password_async,
+)
+from app.auth.deps import get_current_user, get_auth_context
 
 __all__ = [
     "create_access_token",
@@ -12,5 +17,8 @@ __all__ = [
     "verify_token",
     "hash_password",
     "verify_password",
+    "hash_password_async",
+    "verify_password_async",
     "get_current_user",
+    "get_auth_context",
 ]
@@ -2,13 +2,16 @@
 Authentication Dependencies
 """
 
-from typing import Optional
+import copy
+from typing import Any, Optional
 from uuid import UUID
 
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy import select
+from sqlalchemy import event, inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from app.database import get_db
 from app.models.user import User
@@ -17,6 +20,51 @@ from app.auth.jwt import verify_token
 # Bearer token security scheme
 security = HTTPBearer()
 
+# Short-lived per-process cache of authenticated users, keyed by (sub, iat)
+# so a fresh login always reads the row again. Entries are snapshots of the
+# row's column values, never live instances: an instance belongs to the
+# session that loaded it and is expired by that session's rollback.
+_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+
+# Bumped on every invalidation, so a read that raced a committed change
+# doesn't put the old row back in the cache
+_user_generation: dict[str, int] = {}
+
+
+def _snapshot(user: User) -> dict[str, Any]:
+    """Column values of a loaded User."""
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+
+def _drop_cached_user(sub: str) -> None:
+    _user_generation[sub] = _user_generation.get(sub, 0) + 1
+    for key in [k for k in list(_user_cache.keys()) if k[0] == sub]:
+        _user_cache.pop(key, None)
+
+
+def invalidate_cached_user(user_id: UUID, db: Optional[AsyncSession] = None) -> None:
+    """
+    Drop cached entries for a user (call whenever the user row changes).
+
+    With the session making the change, this happens once it commits, so
+    no request can re-cache the old row in between; a rollback drops it.
+    """
+    if db is None:
+        _drop_cached_user(str(user_id))
+    else:
+        db.info.setdefault("invalidate_users", set()).add(str(user_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    for sub in session.info.pop("invalidate_users", ()):
+        _drop_cached_user(sub)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop("invalidate_users", None)
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -38,7 +86,18 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    cache_key = (payload["sub"], payload.get("iat"))
+    cached = _user_cache.get(cache_key)
+    if cached is not None:
+        # Rebuild a detached instance from the snapshot (copied, so in-place
+        # edits such as settings.update() can't reach the cache) and attach
+        # it to this session without a SELECT
+        user = User(**copy.deepcopy(cached))
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+
     # Get user from database
+    generation = _user_generation.get(payload["sub"], 0)
     user_id = UUID(payload["sub"])
     result = await db.execute(
         select(User).where(User.id == user_id)
@@ -52,9 +111,26 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if _user_generation.get(payload["sub"], 0) == generation:
+        _user_cache[cache_key] = _snapshot(user)
     return user
 
 
+async def get_auth_context(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> tuple[User, AsyncSession]:
+    """
+    Dependency returning (user, session) in one resolution.
+
+    Endpoints that need both use this instead of separate get_current_user
+    and get_db dependencies, so FastAPI resolves a single node per request
+    and the user lookup runs on the request's own session.
+    """
+    user = await get_current_user(credentials, db)
+    return user, db
+
+
 async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(
         HTTPBearer(auto_error=False)
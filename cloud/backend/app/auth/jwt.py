@@ -9,9 +9,16 @@ from uuid import UUID
 import jwt
 from jwt.exceptions import InvalidTokenError
 
-from app.config import get_settings
+from app.config import (
+    SECRET_KEY,
+    JWT_ALGORITHM,
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+)
 
-settings = get_settings()
+_ACCESS_TTL = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+_REFRESH_TTL = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+_ALGORITHMS = [JWT_ALGORITHM]
 
 
 def create_access_token(
@@ -21,7 +28,7 @@ def create_access_token(
 ) -> str:
     """Create a new access token."""
     expire = datetime.utcnow() + (
-        expires_delta or timedelta(minutes=settings.access_token_expire_minutes)
+        expires_delta or _ACCESS_TTL
     )
 
     payload = {
@@ -34,8 +41,8 @@ def create_access_token(
 
     return jwt.encode(
         payload,
-        settings.secret_key,
-        algorithm=settings.jwt_algorithm
+        SECRET_KEY,
+        algorithm=JWT_ALGORITHM
     )
 
 
@@ -46,7 +53,7 @@ def create_refresh_token(
 ) -> str:
     """Create a new refresh token."""
     expire = datetime.utcnow() + (
-        expires_delta or timedelta(days=settings.refresh_token_expire_days)
+        expires_delta or _REFRESH_TTL
     )
 
     payload = {
@@ -59,8 +66,8 @@ def create_refresh_token(
 
     return jwt.encode(
         payload,
-        settings.secret_key,
-        algorithm=settings.jwt_algorithm
+        SECRET_KEY,
+        algorithm=JWT_ALGORITHM
     )
 
 
@@ -73,8 +80,8 @@ def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
     try:
         payload = jwt.decode(
             token,
-            settings.secret_key,
-            algorithms=[settings.jwt_algorithm]
+            SECRET_KEY,
+            algorithms=_ALGORITHMS
         )
 
         # Verify token type
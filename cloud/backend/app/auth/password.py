@@ -1,21 +1,86 @@
 """
 Password Hashing - Using Argon2 (more secure than bcrypt, no length limits)
+
+Calls argon2-cffi directly rather than going through passlib's scheme
+dispatch. The time cost is calibrated once at startup so a hash takes
+roughly PASSWORD_HASH_TARGET_MS on the deployment host.
 """
 
-from passlib.context import CryptContext
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+from app.config import get_settings
+
+# Upper bound for calibration so a slow host can't stall startup indefinitely
+_MAX_TIME_COST = 16
 
-# Use Argon2 - winner of Password Hashing Competition, no 72-byte limit
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto",
+_hasher: Optional[PasswordHasher] = None
+
+# Hashing is CPU-bound by design; run it off the event loop. argon2-cffi
+# releases the GIL inside the C call, so threads hash in parallel without the
+# pickling and per-process calibration a process pool would need.
+_hash_pool = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="argon2",
 )
 
 
+def calibrate_time_cost(target_ms: int) -> int:
+    """Find the smallest Argon2 time cost whose hash takes at least target_ms."""
+    time_cost = 1
+    while time_cost < _MAX_TIME_COST:
+        hasher = PasswordHasher(time_cost=time_cost)
+        start = time.perf_counter()
+        hasher.hash("calibration-password")
+        if (time.perf_counter() - start) * 1000 >= target_ms:
+            break
+        time_cost += 1
+    return time_cost
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Get or create the Argon2 hasher, calibrating the time cost if unset."""
+    global _hasher
+    if _hasher is None:
+        settings = get_settings()
+        if not settings.password_hash_time_cost:
+            settings.password_hash_time_cost = calibrate_time_cost(
+                settings.password_hash_target_ms
+            )
+        _hasher = PasswordHasher(time_cost=settings.password_hash_time_cost)
+    return _hasher
+
+
 def hash_password(password: str) -> str:
     """Hash a password using Argon2."""
-    return pwd_context.hash(password)
+    return get_password_hasher().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        # Parameters are read from the hash, so hashes made with an older
+        # time cost (or by passlib) still verify
+        return get_password_hasher().verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hash_pool, verify_password, plain_password, hashed_password
+    )
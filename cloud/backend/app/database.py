@@ -4,8 +4,11 @@ ApexAurum Cloud - Database Connection
 Async SQLAlchemy setup with PostgreSQL.
 """
 
+import asyncio
+
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, ORMExecuteState, Session
 
 from app.config import get_settings
 
@@ -22,9 +25,11 @@ def get_engine():
         _engine = create_async_engine(
             settings.async_database_url,
             echo=settings.debug,
-            pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10,
+            pool_pre_ping=False,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_recycle=settings.db_pool_recycle_seconds,
+            pool_use_lifo=True,
         )
     return _engine
 
@@ -46,13 +51,48 @@ class Base(DeclarativeBase):
     pass
 
 
+# Sessions record whether they wrote anything so read-only requests can skip
+# the COMMIT round trip. Flushed ORM changes are no longer in new/dirty/deleted,
+# and Core INSERT/UPDATE/DELETE never are, so both are tracked via events.
+@event.listens_for(Session, "after_flush")
+def _mark_flushed(session, flush_context):
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dml(orm_execute_state: ORMExecuteState):
+    if (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_writes(session):
+    session.info.pop("has_writes", None)
+
+
+def has_pending_writes(session: AsyncSession) -> bool:
+    """True if the session has changes that still need a COMMIT."""
+    return bool(
+        session.info.get("has_writes")
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
+
 async def get_db() -> AsyncSession:
-    """Dependency for getting database session."""
+    """Dependency for getting database session (commits only if it wrote)."""
     session_factory = get_session_factory()
     async with session_factory() as session:
         try:
             yield session
-            await session.commit()
+            if has_pending_writes(session):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -67,6 +107,17 @@ async def init_db():
         await conn.run_sync(Base.metadata.create_all)
 
 
+async def warm_db_pool():
+    """Open pool_size connections up front so early requests skip the connect."""
+    engine = get_engine()
+
+    async def _ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_ping() for _ in range(get_settings().db_pool_size)))
+
+
 async def close_db():
     """Close database connections."""
     engine = get_engine()
@@ -8,11 +8,12 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
 from app.config import get_settings
-from app.database import init_db, close_db
+from app.database import init_db, warm_db_pool, close_db
 from app.api.v1 import router as api_v1_router
+from app.auth.password import get_password_hasher
 
 settings = get_settings()
 
@@ -26,6 +27,10 @@ async def lifespan(app: FastAPI):
     print("=" * 50)
     await init_db()
     print("Database initialized - FRESH BUILD")
+    await warm_db_pool()
+    print(f"Connection pool warmed ({settings.db_pool_size} connections)")
+    get_password_hasher()
+    print(f"Password hashing calibrated (argon2 time_cost={settings.password_hash_time_cost})")
 
     yield
 
@@ -56,6 +61,7 @@ app = FastAPI(
     """,
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
 )
@@ -6,7 +6,7 @@ from datetime import datetime
 from typing import Optional
 from uuid import uuid4
 
-from sqlalchemy import String, Text, DateTime, Boolean, Integer, ForeignKey, JSON, ARRAY, Numeric
+from sqlalchemy import String, Text, DateTime, Boolean, Integer, ForeignKey, JSON, ARRAY, Numeric, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID
 
@@ -17,6 +17,15 @@ class Conversation(Base):
     """Conversation (chat session) model."""
 
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Serves list_conversations: filter by user/archived, newest first
+        Index(
+            "ix_conv_user_arch_updated",
+            "user_id",
+            "archived",
+            text("updated_at DESC"),
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -12,9 +12,143 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from collections import defaultdict
 import json
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on similarity-matrix entries computed at once by the duplicate
+# scan (rows per block = this // collection size), ~64MB of float32
+SIMILARITY_BLOCK_ELEMS = 1 << 24
+
+# From this many documents on, the duplicate scan only scores each document's
+# ANN_NEIGHBORS nearest neighbours (HNSW) instead of every pair
+ANN_SCAN_MIN_DOCS = 10_000
+ANN_NEIGHBORS = 8
+ANN_QUERY_BATCH = 512
+
+
+def _column(metadatas: List[Dict[str, Any]], key: str, default: Any, dtype: Any) -> np.ndarray:
+    """One metadata field across all rows as a NumPy array (missing -> default)."""
+    return np.fromiter(
+        (metadata.get(key, default) for metadata in metadatas),
+        dtype=dtype,
+        count=len(metadatas)
+    )
+
+
+def _documents_for(coll: Any, ids: List[str]) -> Dict[str, str]:
+    """Document text for just these ids, as {id: text}."""
+    if not ids:
+        return {}
+    docs = coll.get(ids=ids, include=["documents"])
+    return dict(zip(docs["ids"], docs["documents"]))
+
+
+def _similarity_block(
+    rows: np.ndarray,
+    embs: np.ndarray,
+    rows_sq: np.ndarray,
+    embs_sq: np.ndarray,
+    space: str
+) -> np.ndarray:
+    """
+    Similarity of each row against every embedding, as 1.0 - Chroma distance.
+
+    Matches what collection.query() reports for the collection's hnsw:space:
+    squared L2 for "l2" (Chroma's default), 1 - cos for "cosine", 1 - dot for "ip".
+    """
+    dots = rows @ embs.T
+    if space == "cosine":
+        norms = np.sqrt(rows_sq)[:, None] * np.sqrt(embs_sq)[None, :]
+        return dots / np.maximum(norms, 1e-12)
+    if space == "ip":
+        return dots
+    return 1.0 - (rows_sq[:, None] + embs_sq[None, :] - 2.0 * dots)
+
+
+def _exact_pairs(
+    embs: np.ndarray,
+    checked: int,
+    threshold: float,
+    limit: int,
+    space: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Every pair (i < checked, j > i) at or above threshold, by blocked matrix products.
+
+    Returns:
+        (similarities, i indices, j indices), at most `limit` per block
+    """
+    total = len(embs)
+    embs_sq = np.einsum("ij,ij->i", embs, embs)
+
+    # Scan row blocks; j > i keeps each unordered pair once and drops self-matches
+    block = max(1, SIMILARITY_BLOCK_ELEMS // total)
+    cand_sim, cand_i, cand_j = [], [], []
+    for start in range(0, checked, block):
+        stop = min(start + block, checked)
+        sims = _similarity_block(embs[start:stop], embs, embs_sq[start:stop], embs_sq, space)
+        sims[np.arange(total)[None, :] <= np.arange(start, stop)[:, None]] = -np.inf
+        rows, cols = np.nonzero(sims >= threshold)
+        if rows.size:
+            hits = sims[rows, cols]
+            if hits.size > limit:
+                # Only this block's best `limit` can make the final cut
+                top = np.argpartition(-hits, limit - 1)[:limit]
+                hits, rows, cols = hits[top], rows[top], cols[top]
+            cand_sim.append(hits)
+            cand_i.append(rows + start)
+            cand_j.append(cols)
+
+    if not cand_sim:
+        return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    return np.concatenate(cand_sim), np.concatenate(cand_i), np.concatenate(cand_j)
+
+
+def _ann_pairs(
+    coll: Any,
+    ids: List[str],
+    embs: np.ndarray,
+    checked: int,
+    threshold: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pairs at or above threshold among each checked document's nearest neighbours.
+
+    Uses the collection's HNSW index (ANN_NEIGHBORS per document) instead of
+    comparing against every row, so the work is ~N*k rather than N^2. The
+    distances Chroma returns are exact for the pairs it finds.
+
+    Returns:
+        (similarities, i indices, j indices) with i < j
+    """
+    index_of = {vector_id: i for i, vector_id in enumerate(ids)}
+    n_results = min(ANN_NEIGHBORS + 1, len(ids))  # +1: each document finds itself
+
+    seen = set()
+    cand_sim, cand_i, cand_j = [], [], []
+    for start in range(0, checked, ANN_QUERY_BATCH):
+        stop = min(start + ANN_QUERY_BATCH, checked)
+        results = coll.nearest(embs[start:stop], n_results=n_results)
+        for row, (hit_ids, distances) in enumerate(zip(results["ids"], results["distances"]), start):
+            for hit_id, distance in zip(hit_ids, distances):
+                similarity = 1.0 - distance
+                j = index_of.get(hit_id)
+                if j is None or j == row or similarity < threshold:
+                    continue
+                pair = (row, j) if row < j else (j, row)
+                if pair not in seen:
+                    seen.add(pair)
+                    cand_sim.append(similarity)
+                    cand_i.append(pair[0])
+                    cand_j.append(pair[1])
+
+    return (
+        np.asarray(cand_sim, dtype=np.float32),
+        np.asarray(cand_i, dtype=np.intp),
+        np.asarray(cand_j, dtype=np.intp),
+    )
+
 
 def get_stale_memories(
     days_unused: int = 30,
@@ -50,8 +184,8 @@ def get_stale_memories(
         cutoff_date = datetime.now() - timedelta(days=days_unused)
         cutoff_ts = cutoff_date.timestamp()
 
-        # Get all documents (ChromaDB doesn't support complex filtering in query)
-        all_docs = coll.get(limit=None)  # Get all
+        # Metadata only - document text is fetched for the flagged rows alone
+        all_docs = coll.get(limit=None, include=["metadatas"])  # Get all
 
         if not all_docs["ids"]:
             return {
@@ -61,41 +195,36 @@ def get_stale_memories(
                 "cutoff_date": cutoff_date.isoformat()
             }
 
-        # Filter in Python
-        stale_memories = []
+        # Filter as whole columns (ChromaDB doesn't support complex filtering in query)
+        metadatas = all_docs["metadatas"]
+        last_accessed = _column(metadatas, "last_accessed_ts", 0, np.float64)
+        mask = last_accessed < cutoff_ts
+        if min_confidence is not None:
+            # Skip high-confidence items
+            mask &= _column(metadatas, "confidence", 1.0, np.float64) < min_confidence
 
-        for i, (doc_id, doc_text, metadata) in enumerate(
-            zip(all_docs["ids"], all_docs["documents"], all_docs["metadatas"])
-        ):
-            last_accessed = metadata.get("last_accessed_ts", 0)
-            confidence = metadata.get("confidence", 1.0)
-            access_count = metadata.get("access_count", 0)
-
-            # Check if stale
-            is_stale = last_accessed < cutoff_ts
-
-            # Check confidence filter if specified
-            if min_confidence is not None and confidence >= min_confidence:
-                continue  # Skip high-confidence items
-
-            if is_stale:
-                last_accessed_dt = datetime.fromtimestamp(last_accessed) if last_accessed else None
-
-                stale_memories.append({
-                    "id": doc_id,
-                    "text": doc_text[:200] + "..." if len(doc_text) > 200 else doc_text,
-                    "full_text": doc_text,
-                    "last_accessed": last_accessed_dt.isoformat() if last_accessed_dt else "never",
-                    "days_since_access": (datetime.now() - last_accessed_dt).days if last_accessed_dt else 999,
-                    "access_count": access_count,
-                    "confidence": confidence,
-                    "category": metadata.get("category", "unknown"),
-                    "source": metadata.get("source", "unknown")
-                })
+        # Apply limit (first matches in collection order)
+        flagged = np.flatnonzero(mask)[:limit or None]
+        texts = _documents_for(coll, [all_docs["ids"][i] for i in flagged])
 
-            # Apply limit
-            if limit and len(stale_memories) >= limit:
-                break
+        now = datetime.now()
+        stale_memories = []
+        for i in flagged:
+            doc_id, metadata = all_docs["ids"][i], metadatas[i]
+            doc_text = texts.get(doc_id, "")
+            last_accessed_dt = datetime.fromtimestamp(last_accessed[i]) if last_accessed[i] else None
+
+            stale_memories.append({
+                "id": doc_id,
+                "text": doc_text[:200] + "..." if len(doc_text) > 200 else doc_text,
+                "full_text": doc_text,
+                "last_accessed": last_accessed_dt.isoformat() if last_accessed_dt else "never",
+                "days_since_access": (now - last_accessed_dt).days if last_accessed_dt else 999,
+                "access_count": metadata.get("access_count", 0),
+                "confidence": metadata.get("confidence", 1.0),
+                "category": metadata.get("category", "unknown"),
+                "source": metadata.get("source", "unknown")
+            })
 
         # Sort by days since access (oldest first)
         stale_memories.sort(key=lambda x: x["days_since_access"], reverse=True)
@@ -146,8 +275,8 @@ def get_low_access_memories(
 
         coll = db.get_or_create_collection(collection)
 
-        # Get all documents
-        all_docs = coll.get(limit=None)
+        # Metadata only - document text is fetched for the flagged rows alone
+        all_docs = coll.get(limit=None, include=["metadatas"])
 
         if not all_docs["ids"]:
             return {
@@ -157,46 +286,49 @@ def get_low_access_memories(
             }
 
         # Calculate age cutoff
-        age_cutoff = datetime.now() - timedelta(days=min_age_days)
+        now = datetime.now()
+        age_cutoff = now - timedelta(days=min_age_days)
         age_cutoff_ts = age_cutoff.timestamp()
 
-        # Filter
-        low_access_memories = []
+        # Access counts filter as one column compare; only those rows get
+        # their added_at parsed for the age check
+        metadatas = all_docs["metadatas"]
+        access_counts = _column(metadatas, "access_count", 0, np.int64)
 
-        for doc_id, doc_text, metadata in zip(
-            all_docs["ids"], all_docs["documents"], all_docs["metadatas"]
-        ):
-            access_count = metadata.get("access_count", 0)
-            added_at = metadata.get("added_at", None)
+        flagged = []
+        for i in np.flatnonzero(access_counts <= max_access_count):
+            added_at = metadatas[i].get("added_at", None)
 
             # Parse added_at
             if added_at:
                 try:
-                    added_dt = datetime.fromisoformat(added_at)
-                    added_ts = added_dt.timestamp()
+                    added_ts = datetime.fromisoformat(added_at).timestamp()
                 except:
                     added_ts = 0
             else:
                 added_ts = 0
 
-            # Check conditions
-            is_old_enough = added_ts < age_cutoff_ts
-            is_low_access = access_count <= max_access_count
+            if added_ts < age_cutoff_ts:
+                flagged.append((i, added_ts))
+                if limit and len(flagged) >= limit:
+                    break
 
-            if is_old_enough and is_low_access:
-                age_days = (datetime.now() - datetime.fromtimestamp(added_ts)).days if added_ts else 999
+        texts = _documents_for(coll, [all_docs["ids"][i] for i, _ in flagged])
 
-                low_access_memories.append({
-                    "id": doc_id,
-                    "text": doc_text[:200] + "..." if len(doc_text) > 200 else doc_text,
-                    "access_count": access_count,
-                    "age_days": age_days,
-                    "confidence": metadata.get("confidence", 1.0),
-                    "category": metadata.get("category", "unknown")
-                })
-
-            if limit and len(low_access_memories) >= limit:
-                break
+        low_access_memories = []
+        for i, added_ts in flagged:
+            doc_id, metadata = all_docs["ids"][i], metadatas[i]
+            doc_text = texts.get(doc_id, "")
+            age_days = (now - datetime.fromtimestamp(added_ts)).days if added_ts else 999
+
+            low_access_memories.append({
+                "id": doc_id,
+                "text": doc_text[:200] + "..." if len(doc_text) > 200 else doc_text,
+                "access_count": int(access_counts[i]),
+                "age_days": age_days,
+                "confidence": metadata.get("confidence", 1.0),
+                "category": metadata.get("category", "unknown")
+            })
 
         # Sort by access count (lowest first)
         low_access_memories.sort(key=lambda x: (x["access_count"], -x["age_days"]))
@@ -225,17 +357,20 @@ def get_duplicate_candidates(
     sample_size: Optional[int] = None
 ) -> Dict[str, Any]:
     """
-    Find potential duplicate memories using search-based similarity.
+    Find potential duplicate memories by comparing stored embeddings.
 
-    IMPLEMENTATION NOTE: We use ChromaDB's own search rather than O(n²) comparisons.
-    For each document, we search for similar documents. If similarity > threshold
-    and it's a different document, it's a duplicate candidate.
+    IMPLEMENTATION NOTE: Instead of re-embedding and querying once per document,
+    the stored embeddings are compared with blocked matrix products (BLAS), so
+    every pair above the threshold is found without any model calls. From
+    ANN_SCAN_MIN_DOCS documents on, only each document's nearest neighbours
+    from the HNSW index are scored. Similarity is 1.0 - Chroma distance for
+    the collection's space, as query() reports it.
 
     Args:
         collection: Collection to scan (default: "knowledge")
         similarity_threshold: Similarity cutoff (default: 0.95, range 0.0-1.0)
-        limit: Maximum duplicate pairs to return
-        sample_size: If set, only check this many recent documents (for performance)
+        limit: Maximum duplicate pairs to return (most similar first)
+        sample_size: If set, only check this many documents against the collection
 
     Returns:
         Dict with duplicate pairs and stats
@@ -249,71 +384,49 @@ def get_duplicate_candidates(
 
         coll = db.get_or_create_collection(collection)
 
-        # Get documents to check
-        all_docs = coll.get(limit=sample_size)
+        # Stored embeddings for the whole collection; the sample is the
+        # first sample_size of them (the same documents get(limit=) returns)
+        all_docs = coll.get(include=["documents", "embeddings"])
+        total = len(all_docs["ids"])
+        checked = total if sample_size is None else min(sample_size, total)
 
-        if not all_docs["ids"]:
+        if checked == 0:
             return {
                 "success": True,
                 "duplicate_pairs": [],
                 "total_checked": 0
             }
 
-        # Find duplicates using search
-        seen_pairs = set()
-        duplicate_pairs = []
-
-        for doc_id, doc_text in zip(all_docs["ids"], all_docs["documents"]):
-            # Search for similar documents
-            results = coll.query(
-                query_text=doc_text,
-                n_results=5,  # Top 5 similar
-                include_distances=True
-            )
-
-            # Check results
-            for result_id, result_doc, distance in zip(
-                results["ids"], results["documents"], results["distances"]
-            ):
-                # Skip self-match
-                if result_id == doc_id:
-                    continue
-
-                # Calculate similarity (1.0 - distance)
-                similarity = 1.0 - distance
-
-                # Check threshold
-                if similarity >= similarity_threshold:
-                    # Create canonical pair ID (sorted to avoid duplicates)
-                    pair_id = tuple(sorted([doc_id, result_id]))
-
-                    if pair_id not in seen_pairs:
-                        seen_pairs.add(pair_id)
-
-                        duplicate_pairs.append({
-                            "id1": doc_id,
-                            "id2": result_id,
-                            "similarity": round(similarity, 4),
-                            "text1": doc_text[:150] + "..." if len(doc_text) > 150 else doc_text,
-                            "text2": result_doc[:150] + "..." if len(result_doc) > 150 else result_doc
-                        })
-
-                        # Apply limit
-                        if len(duplicate_pairs) >= limit:
-                            break
-
-            if len(duplicate_pairs) >= limit:
-                break
+        embs = np.asarray(all_docs["embeddings"], dtype=np.float32)
+        if total >= ANN_SCAN_MIN_DOCS:
+            sim, pi, pj = _ann_pairs(coll, all_docs["ids"], embs, checked, similarity_threshold)
+        else:
+            space = coll.metadata.get("hnsw:space", "l2")
+            sim, pi, pj = _exact_pairs(embs, checked, similarity_threshold, limit, space)
 
-        # Sort by similarity (highest first)
-        duplicate_pairs.sort(key=lambda x: x["similarity"], reverse=True)
+        duplicate_pairs = []
+        if sim.size:
+            # Highest similarity first, only the top `limit`
+            order = np.argsort(-sim, kind="stable")[:limit]
+
+            ids, docs = all_docs["ids"], all_docs["documents"]
+            for k in order:
+                i, j = int(pi[k]), int(pj[k])
+                text1, text2 = docs[i], docs[j]
+                duplicate_pairs.append({
+                    "id1": ids[i],
+                    "id2": ids[j],
+                    "similarity": round(float(sim[k]), 4),
+                    "text1": text1[:150] + "..." if len(text1) > 150 else text1,
+                    "text2": text2[:150] + "..." if len(text2) > 150 else text2
+                })
 
         logger.info(f"Found {len(duplicate_pairs)} duplicate candidates in {collection}")
 
         return {
             "success": True,
             "duplicate_pairs": duplicate_pairs,
-            "total_checked": len(all_docs["ids"]),
+            "total_checked": checked,
             "duplicates_found": len(duplicate_pairs),
             "threshold": similarity_threshold
         }
@@ -353,10 +466,12 @@ def consolidate_memories(
         keep: Strategy for which to keep
 
     Returns:
-        Dict with consolidation result
+        Dict with consolidation result, including both memories' metadata
+        from before the merge ("premerge_meta", in id1, id2 order)
     """
     try:
         from tools.vector_search import _get_vector_db
+        from core.vector_db import related_memory_ids
 
         db = _get_vector_db()
         if db is None:
@@ -365,7 +480,7 @@ def consolidate_memories(
         coll = db.get_or_create_collection(collection)
 
         # Get both documents
-        docs = coll.get(ids=[id1, id2])
+        docs = coll.get(ids=[id1, id2], include=["metadatas"])
 
         if len(docs["ids"]) != 2:
             return {
@@ -376,6 +491,7 @@ def consolidate_memories(
         # Extract metadata
         meta1 = docs["metadatas"][0]
         meta2 = docs["metadatas"][1]
+        premerge = dict(zip(docs["ids"], docs["metadatas"]))
 
         # Determine which to keep
         if keep == "higher_confidence":
@@ -411,12 +527,11 @@ def consolidate_memories(
         )
 
         # Merge related_memories (stored as JSON string)
-        related_keep = json.loads(keep_meta.get("related_memories", "[]"))
-        related_discard = json.loads(discard_meta.get("related_memories", "[]"))
-        related = set(related_keep)
-        related.update(related_discard)
+        related = set(related_memory_ids(keep_meta))
+        related.update(related_memory_ids(discard_meta))
         related.add(discard_id)  # Add the discarded ID
-        merged_meta["related_memories"] = json.dumps(list(related))
+        related = list(related)
+        merged_meta["related_memories"] = json.dumps(related)
 
         # Average confidence (or keep higher - configurable)
         merged_meta["confidence"] = max(
@@ -442,7 +557,9 @@ def consolidate_memories(
             "discarded_id": discard_id,
             "new_access_count": merged_meta["access_count"],
             "new_confidence": merged_meta["confidence"],
-            "related_memories": json.loads(merged_meta["related_memories"])
+            "related_memories": related,
+            # Metadata of id1 and id2 as they were before the merge
+            "premerge_meta": [premerge[id1], premerge[id2]]
         }
 
     except Exception as e:
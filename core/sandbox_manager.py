@@ -6,6 +6,7 @@ Designed for Raspberry Pi 5 (ARM64) with persistent workspace support.
 
 Features:
 - Dual-mode execution (safe REPL vs full sandbox)
+- Warm container pool (executions exec into idle containers)
 - Persistent workspace across executions
 - Configurable network access
 - Resource limits (CPU, memory, time)
@@ -14,12 +15,27 @@ Features:
 """
 
 import docker
+import atexit
 import os
+import platform
 import json
+import pickle
 import tempfile
 import shutil
 import time
 import hashlib
+import uuid
+import re
+import functools
+import io
+import contextlib
+import math
+import datetime
+import collections
+import itertools
+import random
+import string
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Union
 from dataclasses import dataclass, field
@@ -27,9 +43,262 @@ from enum import Enum
 import logging
 import threading
 import queue
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+# Label applied to warm pool containers so they can be found and reaped.
+# The value names the owning process ("host:pid"), so the startup sweep only
+# removes containers whose owner is gone.
+POOL_LABEL = "apex-sandbox-pool"
+_POOL_OWNER = f"{platform.node()}:{os.getpid()}"
+
+# Managers whose pools are torn down at interpreter exit. Weak references, so
+# registering doesn't keep a dropped manager (and its containers) alive.
+_live_managers: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def _shutdown_managers():
+    for manager in list(_live_managers):
+        try:
+            manager.shutdown()
+        except Exception as e:
+            logger.warning(f"Sandbox shutdown failed: {e}")
+
+
+atexit.register(_shutdown_managers)
+
+# HTTP connections kept open to the Docker daemon by the shared client, so
+# concurrent executions don't serialize on one connection
+_DOCKER_MAX_POOL_SIZE = 32
+
+# Substrings (matched case-insensitively) that force sandbox mode, and the
+# analysis flag each one sets
+_SANDBOX_INDICATORS = {
+    "subprocess": "uses_subprocess",
+    "os.system": "uses_subprocess",
+    "popen": "uses_subprocess",
+    "open(": "uses_file_io",
+    "pathlib": "uses_file_io",
+    "requests": "uses_network",
+    "urllib": "uses_network",
+    "socket": "uses_network",
+    "http": "uses_network",
+}
+# One pass over the source; the zero-width lookahead lets overlapping hits
+# (e.g. "popen(" -> "popen" and "open(") both register
+_SANDBOX_INDICATOR_RE = re.compile(
+    "(?=(" + "|".join(re.escape(k) for k in _SANDBOX_INDICATORS) + "))",
+    re.IGNORECASE,
+)
+
+# Top-level module of each `import x` / `from x import y` line
+_IMPORT_RE = re.compile(r"(?m)^[ \t]*(?:import|from)[ \t]+([A-Za-z_][\w.]*)")
+
+
+@functools.lru_cache(maxsize=256)
+def _extract_imports(code: str) -> tuple:
+    """Top-level module names imported by code, in source order."""
+    return tuple(m.split(".")[0] for m in _IMPORT_RE.findall(code))
+
+
+# Max number of _analyze_code results kept per manager
+_ANALYSIS_CACHE_SIZE = 512
+
+# Max number of wrapped sandbox scripts kept per manager
+_WRAP_CACHE_SIZE = 128
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_safe(code: str):
+    """Compile SAFE-mode source once; repeat snippets reuse the code object."""
+    # Default optimize level on purpose: optimize=2 would strip user asserts
+    return compile(code, "<safe>", "exec", dont_inherit=True)
+
+
+# orjson turns integers outside int64/uint64 into floats; json keeps them
+# exact. Any 19-digit run may be one (e.g. -9300000000000000000), so those
+# files go to json.
+_WIDE_INT_RE = re.compile(rb"\d{19}")
+
+
+def _loads_result(data: bytes):
+    """Parse _result.json (written by stdlib json in the container) with orjson when available."""
+    if orjson is not None and not _WIDE_INT_RE.search(data):
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            pass  # NaN/Infinity are valid for json.dumps but rejected by orjson
+    return json.loads(data)
+
+
+# ----- Script templates used by SandboxManager._wrap_code -----
+# The boilerplate never changes between executions, so it lives here as
+# constants and _wrap_code only formats the per-call pieces around it.
+
+# Sidecar file listing the packages ensure_packages found or pip installed
+ENSURED_FILE = "_ensured.txt"
+
+_PKG_INSTALL_TMPL = f"""
+import importlib
+import site
+import subprocess
+import sys
+
+_ensured = []
+
+def ensure_packages(packages):
+    try:
+        for pkg in packages:
+            try:
+                __import__(pkg.split('[')[0].replace('-', '_'))
+            except ImportError:
+                print(f"Installing {{pkg}}...")
+                subprocess.check_call([
+                    sys.executable, "-m", "pip", "install", "--user",
+                    pkg, "-q", "--disable-pip-version-check"
+                ])
+                # In a fresh workspace the user site didn't exist when the
+                # interpreter started, so site left it off sys.path
+                site.addsitedir(site.getusersitepackages())
+                importlib.invalidate_caches()
+            _ensured.append(pkg)
+    finally:
+        with open({ENSURED_FILE!r}, 'w') as _ensured_file:
+            _ensured_file.write('\\n'.join(_ensured))
+"""
+
+# Best-effort install of the script's own imports (format with packages=)
+_AUTO_INSTALL_TMPL = """
+try:
+    ensure_packages({packages!r})
+except Exception as e:
+    print(f"Warning: Package installation issue: {{e}}")
+
+"""
+
+# Map common import names to pip packages
+_PIP_NAMES = {
+    "cv2": "opencv-python",
+    "PIL": "Pillow",
+    "sklearn": "scikit-learn",
+    "yaml": "pyyaml",
+    "bs4": "beautifulsoup4",
+}
+
+# Packages known to be importable in the sandbox, kept in workspace/.cache.
+# Runtime installs go to the user site (/root/.local, mounted from
+# workspace/.cache/local), so they outlive any one pool container.
+INSTALLED_FILE = "installed.json"
+
+# Sidecar file holding the pickled context dict for a sandbox run
+CONTEXT_FILE = "_context.pkl"
+
+_CONTEXT_LOAD = f"""
+# Injected context
+import pickle
+with open({CONTEXT_FILE!r}, 'rb') as _ctx_file:
+    __context__ = pickle.load(_ctx_file)
+globals().update(__context__)
+"""
+
+_MPL_CAPTURE = """
+import sys
+import os
+
+# Configure matplotlib for headless operation
+import matplotlib
+matplotlib.use('Agg')
+
+# Patch plt.show() to save figures
+_figure_count = [0]
+_original_show = None
+
+def _capture_show():
+    import matplotlib.pyplot as plt
+    _figure_count[0] += 1
+    filename = f"figure_{_figure_count[0]}.png"
+    plt.savefig(filename, dpi=150, bbox_inches='tight')
+    print(f"[Saved figure: {filename}]")
+    plt.close()
+
+try:
+    import matplotlib.pyplot as plt
+    _original_show = plt.show
+    plt.show = _capture_show
+except:
+    pass
+"""
+
+_RESULT_CAPTURE = """
+# Save result if defined
+import json as _json, os as _os
+
+for _var in ('result', '_result', 'output', '_output'):
+    if _var in globals():
+        try:
+            _data = _json.dumps(globals()[_var], default=str).encode()
+        except Exception:
+            continue
+        _fd = _os.open('_result.json', _os.O_WRONLY | _os.O_CREAT | _os.O_TRUNC, 0o644)
+        try:
+            _os.write(_fd, _data)
+        finally:
+            _os.close(_fd)
+        break
+"""
+
+# ----- SAFE mode execution environment -----
+# Built once at import; _execute_safe only copies the globals dict per call.
+
+# Safe modules that can be imported
+_SAFE_MODULES = {
+    "math": math,
+    "json": json,
+    "re": re,
+    "datetime": datetime,
+    "collections": collections,
+    "itertools": itertools,
+    "functools": functools,
+    "random": random,
+    "string": string,
+}
+# Names alone, for AUTO-mode import checks
+_SAFE_MODULES_FS = frozenset(_SAFE_MODULES)
+
+
+def _restricted_import(name, globals=None, locals=None, fromlist=(), level=0):
+    """__import__ replacement that only allows _SAFE_MODULES."""
+    if name in _SAFE_MODULES:
+        return _SAFE_MODULES[name]
+    raise ImportError(f"Import of '{name}' is not allowed in safe mode. Use sandbox mode for external packages.")
+
+
+# Restricted builtins
+_SAFE_BUILTINS = {
+    "abs": abs, "all": all, "any": any, "bool": bool,
+    "dict": dict, "enumerate": enumerate, "filter": filter,
+    "float": float, "int": int, "len": len, "list": list,
+    "map": map, "max": max, "min": min, "pow": pow,
+    "print": print, "range": range, "round": round,
+    "set": set, "sorted": sorted, "str": str, "sum": sum,
+    "tuple": tuple, "type": type, "zip": zip,
+    "True": True, "False": False, "None": None,
+    "__import__": _restricted_import,
+}
+
+_BASE_SAFE_GLOBALS = {
+    "__builtins__": _SAFE_BUILTINS,
+    # Pre-load safe modules so they're available without import
+    **_SAFE_MODULES,
+}
+
 
 class ExecutionMode(Enum):
     SAFE = "safe"           # Current restricted REPL
@@ -37,7 +306,7 @@ class ExecutionMode(Enum):
     AUTO = "auto"           # Let the system decide based on code analysis
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionResult:
     """Result from code execution"""
     success: bool
@@ -62,7 +331,7 @@ class ExecutionResult:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class SandboxConfig:
     """Configuration for sandbox execution"""
     # Resource limits
@@ -78,6 +347,8 @@ class SandboxConfig:
     
     # Container settings
     image_name: str = "apex-sandbox:latest"
+    pool_size: int = 2              # Warm containers kept per network mode
+    max_output_bytes: int = 10 * 1024 * 1024  # Per-stream stdout/stderr cap
     auto_install_packages: bool = True  # pip install missing packages
     
     # What to capture
@@ -112,11 +383,37 @@ class SandboxManager:
         
         # Docker client (lazy init)
         self._docker_client = None
-        self._container_pool: List[str] = []
+        
+        # Warm container pools, keyed by network_enabled. Containers idle on
+        # `sleep infinity` and each execution is an exec inside one of them.
+        self._container_pools: Dict[bool, queue.Queue] = {
+            False: queue.Queue(),
+            True: queue.Queue(),
+        }
+        self._pool_counts: Dict[bool, int] = {False: 0, True: 0}
         self._pool_lock = threading.Lock()
+        # Per-container scratch dir (mounted at /execution), keyed by container id
+        self._scratch_dirs: Dict[str, Path] = {}
+        self._client_lock = threading.Lock()
+        # SAFE mode redirects the process-wide sys.stdout, so concurrent SAFE
+        # executions would capture each other's output
+        self._safe_lock = threading.Lock()
+        # Worker threads for execute_batch (lazy)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Torn down at exit by _shutdown_managers; the set holds no strong ref
+        _live_managers.add(self)
+        
+        # _analyze_code results keyed by a digest of the source (LRU)
+        self._analysis_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
         
-        # Track installed packages per session
-        self._installed_packages: set = set()
+        # Wrapped sandbox scripts for context-free runs (LRU)
+        self._wrap_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        
+        # Packages confirmed importable in the sandbox, persisted across
+        # sessions in INSTALLED_FILE; the generation bumps on every change
+        # so _get_wrapped_code doesn't serve a script with a stale install list
+        self._installed_packages: set = self._load_installed_packages()
+        self._installed_gen = 0
         
         logger.info(f"SandboxManager initialized with workspace: {self.config.workspace_path}")
     
@@ -124,19 +421,75 @@ class SandboxManager:
     def docker_client(self):
         """Lazy initialization of Docker client"""
         if self._docker_client is None:
-            try:
-                self._docker_client = docker.from_env()
-                # Verify connection
-                self._docker_client.ping()
-                logger.info("Docker client connected successfully")
-            except docker.errors.DockerException as e:
-                logger.error(f"Failed to connect to Docker: {e}")
-                raise RuntimeError(
-                    "Docker is not available. Please ensure Docker is installed and running.\n"
-                    "On Pi: sudo apt install docker.io && sudo usermod -aG docker $USER"
-                ) from e
+            with self._client_lock:
+                if self._docker_client is None:
+                    client = self._connect_docker()
+                    self._reap_orphaned_containers(client)
+                    self._docker_client = client
         return self._docker_client
     
+    def _connect_docker(self):
+        """Create the shared Docker client."""
+        try:
+            if os.environ.get("DOCKER_TLS_VERIFY") or os.environ.get("DOCKER_CERT_PATH"):
+                # Remote/TLS daemons need from_env's TLS setup
+                client = docker.from_env(max_pool_size=_DOCKER_MAX_POOL_SIZE)
+            else:
+                # Local socket: skip from_env's TLS autoconfiguration
+                client = docker.DockerClient(
+                    base_url=os.environ.get("DOCKER_HOST", "unix:///var/run/docker.sock"),
+                    version="auto",
+                    max_pool_size=_DOCKER_MAX_POOL_SIZE,
+                )
+            # version="auto" already queried the daemon, so no separate ping
+            logger.info("Docker client connected successfully")
+            return client
+        except docker.errors.DockerException as e:
+            logger.error(f"Failed to connect to Docker: {e}")
+            raise RuntimeError(
+                "Docker is not available. Please ensure Docker is installed and running.\n"
+                "On Pi: sudo apt install docker.io && sudo usermod -aG docker $USER"
+            ) from e
+    
+    @staticmethod
+    def _reap_orphaned_containers(client):
+        """
+        Remove pool containers left behind by a process that crashed or was
+        killed before shutdown() ran, along with their scratch dirs.
+        
+        Containers owned by a live process on this host (including this
+        one) and by other hosts sharing the daemon are left alone.
+        """
+        host = platform.node()
+        try:
+            orphans = client.api.containers(all=True, filters={"label": POOL_LABEL})
+        except Exception as e:
+            logger.warning(f"Could not list pool containers: {e}")
+            return
+        for info in orphans:
+            owner_host, _, pid = (info.get("Labels") or {}).get(POOL_LABEL, "").rpartition(":")
+            if owner_host and owner_host != host:
+                continue
+            # Labels without a "host:pid" owner predate owner tracking
+            if owner_host and pid.isdigit():
+                if int(pid) == os.getpid():
+                    continue
+                try:
+                    os.kill(int(pid), 0)
+                    continue  # owner still running
+                except ProcessLookupError:
+                    pass
+                except OSError:
+                    continue  # exists, owned by another user
+            try:
+                client.api.remove_container(info["Id"], force=True, v=True)
+            except Exception:
+                continue
+            for mount in info.get("Mounts") or ():
+                if mount.get("Destination") == "/execution" and mount.get("Source"):
+                    shutil.rmtree(mount["Source"], ignore_errors=True)
+            logger.info(f"Removed orphaned pool container {info['Id'][:12]}")
+    
     def _setup_workspace(self):
         """Create workspace directory structure"""
         workspace = Path(self.config.workspace_path)
@@ -147,14 +500,241 @@ class SandboxManager:
         (workspace / "data").mkdir(exist_ok=True)
         (workspace / "temp").mkdir(exist_ok=True)
         (workspace / ".cache").mkdir(exist_ok=True)  # For pip cache
+        (workspace / ".cache" / "local").mkdir(exist_ok=True)  # pip --user installs
         
         logger.info(f"Workspace ready at {workspace}")
     
+    def _start_pool_container(self, network: bool):
+        """Start one idle container for the warm pool."""
+        workspace = Path(self.config.workspace_path)
+        
+        # Scratch dir reused by every execution in this container
+        scratch = workspace / "temp" / f"pool-{uuid.uuid4().hex[:12]}"
+        scratch.mkdir()
+        
+        try:
+            container = self.docker_client.containers.run(
+                image=self.config.image_name,
+                command=["sleep", "infinity"],
+                volumes={
+                    str(scratch): {"bind": "/execution", "mode": "rw"},
+                    str(workspace): {"bind": "/workspace", "mode": "rw"},
+                    str(workspace / ".cache"): {"bind": "/root/.cache/pip", "mode": "rw"},
+                    str(workspace / ".cache" / "local"): {"bind": "/root/.local", "mode": "rw"},
+                },
+                working_dir="/execution",
+                detach=True,
+                mem_limit=self.config.memory_limit,
+                nano_cpus=int(self.config.cpu_limit * 1e9),
+                network_mode="bridge" if network else "none",
+                labels={POOL_LABEL: _POOL_OWNER},
+            )
+        except Exception:
+            shutil.rmtree(scratch, ignore_errors=True)
+            raise
+        
+        self._scratch_dirs[container.id] = scratch
+        logger.info(f"Started pool container {container.short_id} (network={network})")
+        return container
+    
+    def _acquire_container(self, network: bool, timeout: int, fresh: bool = False):
+        """
+        Take an idle container from the pool, starting one if below pool_size.
+        
+        With fresh=True an idle container is only used if no new one can be
+        started.
+        """
+        pool = self._container_pools[network]
+        if not fresh:
+            try:
+                return pool.get_nowait()
+            except queue.Empty:
+                pass
+        
+        with self._pool_lock:
+            can_start = self._pool_counts[network] < self.config.pool_size
+            if can_start:
+                self._pool_counts[network] += 1
+        
+        if can_start:
+            try:
+                return self._start_pool_container(network)
+            except Exception:
+                with self._pool_lock:
+                    self._pool_counts[network] -= 1
+                raise
+        
+        # Pool is full and busy - wait for a container to come back
+        return pool.get(timeout=timeout)
+    
+    def _release_container(self, container, network: bool):
+        """Return a healthy container to the pool."""
+        self._container_pools[network].put(container)
+    
+    def _discard_container(self, container, network: bool):
+        """Remove a container that can't be reused (timed out, broken, shutdown)."""
+        with self._pool_lock:
+            self._pool_counts[network] -= 1
+        try:
+            # Low-level call: one DELETE, no attrs re-fetch by the wrapper
+            self.docker_client.api.remove_container(container.id, force=True, v=True)
+        except Exception:
+            pass
+        scratch = self._scratch_dirs.pop(container.id, None)
+        if scratch is not None:
+            shutil.rmtree(scratch, ignore_errors=True)
+    
+    def _container_alive(self, container) -> bool:
+        """Whether a pooled container is still running (True if unsure)."""
+        try:
+            return self.docker_client.api.inspect_container(container.id)["State"]["Running"]
+        except docker.errors.NotFound:
+            return False
+        except Exception:
+            return True
+    
+    @staticmethod
+    def _clear_dir(path: Path):
+        """Empty a scratch dir in one scandir pass (the dir itself stays)."""
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    os.unlink(entry.path)
+    
+    @staticmethod
+    def _remove_tree(path: str):
+        """
+        Delete a directory tree bottom-up with plain unlink/rmdir calls.
+        
+        Best effort like rmtree(ignore_errors=True): entries that vanish or
+        can't be removed are skipped.
+        """
+        for root, dirs, files in os.walk(path, topdown=False):
+            for name in files:
+                try:
+                    os.unlink(os.path.join(root, name))
+                except OSError:
+                    pass
+            for name in dirs:
+                sub = os.path.join(root, name)
+                try:
+                    # os.walk lists symlinks to dirs under dirs without entering them
+                    if os.path.islink(sub):
+                        os.unlink(sub)
+                    else:
+                        os.rmdir(sub)
+                except OSError:
+                    pass
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
+    
+    def shutdown(self):
+        """Stop batch workers and tear down all idle pooled containers."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        for network, pool in self._container_pools.items():
+            while True:
+                try:
+                    container = pool.get_nowait()
+                except queue.Empty:
+                    break
+                self._discard_container(container, network)
+    
+    def _exec_in_container(self, container, workdir: str, timeout: int):
+        """
+        Run script.py in a pooled container.
+        
+        Output is streamed from the exec as it is produced and kept up to
+        config.max_output_bytes per stream; anything beyond is drained and
+        dropped. The stream is consumed on a helper thread so the timeout can
+        be enforced - exec has no timeout of its own.
+        
+        Returns (exit_code, stdout_bytes, stderr_bytes). Raises TimeoutError if
+        the exec doesn't finish in time.
+        """
+        api = self.docker_client.api
+        cap = self.config.max_output_bytes
+        stdout = bytearray()
+        stderr = bytearray()
+        truncated = [False, False]
+        outcome = {}
+        
+        def pump():
+            try:
+                exec_id = api.exec_create(
+                    container.id,
+                    ["python", "script.py"],
+                    workdir=workdir,
+                    environment={
+                        "PYTHONUNBUFFERED": "1",
+                        "PIP_CACHE_DIR": "/root/.cache/pip",
+                    },
+                )["Id"]
+                for out_chunk, err_chunk in api.exec_start(exec_id, stream=True, demux=True):
+                    for i, (buf, chunk) in enumerate(((stdout, out_chunk), (stderr, err_chunk))):
+                        if not chunk:
+                            continue
+                        room = cap - len(buf)
+                        if room >= len(chunk):
+                            buf += chunk
+                        else:
+                            if room > 0:
+                                buf += chunk[:room]
+                            truncated[i] = True
+                outcome["exit_code"] = api.exec_inspect(exec_id)["ExitCode"]
+            except Exception as e:
+                outcome["error"] = e
+        
+        worker = threading.Thread(target=pump, daemon=True)
+        worker.start()
+        worker.join(timeout)
+        if worker.is_alive():
+            raise TimeoutError(f"Execution timeout ({timeout}s)")
+        if "error" in outcome:
+            raise outcome["error"]
+        
+        marker = f"\n[output truncated at {cap} bytes]\n".encode()
+        if truncated[0]:
+            stdout += marker
+        if truncated[1]:
+            stderr += marker
+        return outcome["exit_code"], bytes(stdout), bytes(stderr)
+    
     def _analyze_code(self, code: str) -> Dict[str, Any]:
         """
         Analyze code to determine execution requirements.
         Used for AUTO mode and to detect needed packages.
+        
+        Results are cached by a hash of the code, so agents re-running the
+        same snippet skip the scan.
         """
+        key = hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+        with self._pool_lock:
+            cached = self._analysis_cache.get(key)
+            if cached is not None:
+                self._analysis_cache.move_to_end(key)
+        
+        if cached is None:
+            cached = self._scan_code(code)
+            with self._pool_lock:
+                self._analysis_cache[key] = cached
+                if len(self._analysis_cache) > _ANALYSIS_CACHE_SIZE:
+                    self._analysis_cache.popitem(last=False)
+        
+        # Callers get their own copy; the cached entry stays untouched
+        return {
+            **cached,
+            "imports": list(cached["imports"]),
+            "risky_operations": list(cached["risky_operations"]),
+        }
+    
+    def _scan_code(self, code: str) -> Dict[str, Any]:
+        """Heuristic scan behind _analyze_code (uncached)."""
         analysis = {
             "needs_sandbox": False,
             "imports": [],
@@ -164,49 +744,17 @@ class SandboxManager:
             "risky_operations": []
         }
         
-        # Simple heuristic analysis
-        lines = code.lower()
-        
         # Check for imports
-        import_keywords = ["import ", "from "]
-        for line in code.split("\n"):
-            stripped = line.strip()
-            for kw in import_keywords:
-                if stripped.startswith(kw):
-                    # Extract module name
-                    if stripped.startswith("from "):
-                        module = stripped.split()[1].split(".")[0]
-                    else:
-                        module = stripped.split()[1].split(".")[0].split(",")[0]
-                    analysis["imports"].append(module)
+        analysis["imports"] = list(_extract_imports(code))
         
         # Check for operations that need sandbox
-        sandbox_indicators = [
-            ("subprocess", "uses_subprocess"),
-            ("os.system", "uses_subprocess"),
-            ("popen", "uses_subprocess"),
-            ("open(", "uses_file_io"),
-            ("pathlib", "uses_file_io"),
-            ("requests", "uses_network"),
-            ("urllib", "uses_network"),
-            ("socket", "uses_network"),
-            ("http", "uses_network"),
-        ]
-        
-        for indicator, flag in sandbox_indicators:
-            if indicator in lines:
-                analysis[flag] = True
-                analysis["needs_sandbox"] = True
+        for match in _SANDBOX_INDICATOR_RE.finditer(code):
+            analysis[_SANDBOX_INDICATORS[match.group(1).lower()]] = True
+            analysis["needs_sandbox"] = True
         
         # Non-whitelisted imports need sandbox
-        safe_modules = {
-            "math", "json", "re", "datetime", "collections",
-            "itertools", "functools", "string", "random"
-        }
-        for imp in analysis["imports"]:
-            if imp not in safe_modules:
-                analysis["needs_sandbox"] = True
-                break
+        if any(imp not in _SAFE_MODULES_FS for imp in analysis["imports"]):
+            analysis["needs_sandbox"] = True
         
         return analysis
     
@@ -265,6 +813,31 @@ class SandboxManager:
         
         return result
     
+    def execute_batch(self, jobs: List[Dict[str, Any]]) -> List[ExecutionResult]:
+        """
+        Execute several snippets concurrently across the container pool.
+        
+        Each job is a dict of execute() keyword arguments. Jobs are run by up
+        to config.pool_size worker threads per network mode, so the container
+        setup/teardown of one job overlaps the exec of another; when every
+        container is busy, _acquire_container blocks on the pool queue until
+        one comes back. SAFE-mode jobs run one at a time (they share the
+        process's stdout), so batching only speeds up SANDBOX work.
+        
+        Returns:
+            One ExecutionResult per job, in the same order as jobs.
+        """
+        if self._executor is None:
+            with self._pool_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.config.pool_size * 2,
+                        thread_name_prefix="sandbox-exec",
+                    )
+        
+        futures = [self._executor.submit(self.execute, **job) for job in jobs]
+        return [f.result() for f in futures]
+    
     def _execute_safe(
         self,
         code: str,
@@ -275,57 +848,11 @@ class SandboxManager:
         Execute in restricted safe REPL (current ApexAurum behavior).
         This is a simplified version - integrate with your existing safe executor.
         """
-        import io
-        import contextlib
-        import math
-        import json as json_module
-        import re
-        import datetime
-        import collections
-        import itertools
-        import functools
-        import random
-        import string
-
         timeout = timeout or 30
-
-        # Safe modules that can be imported
-        safe_modules = {
-            "math": math,
-            "json": json_module,
-            "re": re,
-            "datetime": datetime,
-            "collections": collections,
-            "itertools": itertools,
-            "functools": functools,
-            "random": random,
-            "string": string,
-        }
-
-        # Restricted __import__ that only allows safe modules
-        def restricted_import(name, globals=None, locals=None, fromlist=(), level=0):
-            if name in safe_modules:
-                return safe_modules[name]
-            raise ImportError(f"Import of '{name}' is not allowed in safe mode. Use sandbox mode for external packages.")
-
-        # Restricted globals
-        safe_builtins = {
-            "abs": abs, "all": all, "any": any, "bool": bool,
-            "dict": dict, "enumerate": enumerate, "filter": filter,
-            "float": float, "int": int, "len": len, "list": list,
-            "map": map, "max": max, "min": min, "pow": pow,
-            "print": print, "range": range, "round": round,
-            "set": set, "sorted": sorted, "str": str, "sum": sum,
-            "tuple": tuple, "type": type, "zip": zip,
-            "True": True, "False": False, "None": None,
-            "__import__": restricted_import,
-        }
-
-        safe_globals = {
-            "__builtins__": safe_builtins,
-            # Pre-load safe modules so they're available without import
-            **safe_modules,
-        }
+        
+        safe_globals = _BASE_SAFE_GLOBALS.copy()
+        # Fresh builtins dict so user code can't alter it for later calls
+        safe_globals["__builtins__"] = _SAFE_BUILTINS.copy()
         
         # Add context
         if context:
@@ -338,9 +865,10 @@ class SandboxManager:
         local_vars = {}
         
         try:
-            with contextlib.redirect_stdout(stdout_capture), \
+            with self._safe_lock, \
+                 contextlib.redirect_stdout(stdout_capture), \
                  contextlib.redirect_stderr(stderr_capture):
-                exec(code, safe_globals, local_vars)
+                exec(_compile_safe(code), safe_globals, local_vars)
             
             # Get return value if '_result' was set
             return_value = local_vars.get("_result", local_vars.get("result"))
@@ -372,80 +900,103 @@ class SandboxManager:
         """Execute code in Docker container with full capabilities."""
         
         container = None
-        temp_dir = None
+        reusable = False
         
         try:
-            # Prepare workspace path
             workspace = Path(self.config.workspace_path)
-            if working_dir:
-                work_path = workspace / "projects" / working_dir
-                work_path.mkdir(parents=True, exist_ok=True)
-            else:
-                work_path = workspace / "temp"
-            
-            # Create temp directory for this execution
-            temp_dir = tempfile.mkdtemp(dir=work_path)
-            
-            # Write the code to execute
-            code_file = Path(temp_dir) / "script.py"
-            
-            # Wrap code with context injection and result capture
-            wrapped_code = self._wrap_code(code, context, packages)
-            code_file.write_text(wrapped_code)
-            
-            # Prepare container configuration
-            container_config = {
-                "image": self.config.image_name,
-                "command": ["python", "/execution/script.py"],
-                "volumes": {
-                    temp_dir: {"bind": "/execution", "mode": "rw"},
-                    str(workspace): {"bind": "/workspace", "mode": "rw"},
-                    str(workspace / ".cache"): {"bind": "/root/.cache/pip", "mode": "rw"},
-                },
-                "working_dir": "/execution",
-                "detach": True,
-                "mem_limit": self.config.memory_limit,
-                "nano_cpus": int(self.config.cpu_limit * 1e9),
-                "network_mode": "bridge" if network else "none",
-                "environment": {
-                    "PYTHONUNBUFFERED": "1",
-                    "PIP_CACHE_DIR": "/root/.cache/pip",
-                },
-            }
+            temp_dir = None
             
-            # Start container
-            container = self.docker_client.containers.run(**container_config)
-            
-            # Wait for completion with timeout
-            try:
-                exit_result = container.wait(timeout=timeout)
-                exit_code = exit_result.get("StatusCode", -1)
-            except Exception as e:
-                # Timeout or other error
-                container.kill()
-                return ExecutionResult(
-                    success=False,
-                    error=f"Execution timeout ({timeout}s) or error: {str(e)}"
-                )
+            # A pooled container can die while idle (OOM kill, daemon
+            # restart); its exec then fails and the run gets one retry on a
+            # freshly started container
+            for attempt in (1, 2):
+                container = self._acquire_container(network, timeout, fresh=attempt > 1)
+                
+                if working_dir:
+                    # Project runs get their own dir inside the project so any
+                    # files they leave behind persist with it. The whole workspace
+                    # is mounted in every pooled container, so it's reachable at
+                    # the same relative path under /workspace.
+                    if temp_dir is None:
+                        work_path = workspace / "projects" / working_dir
+                        work_path.mkdir(parents=True, exist_ok=True)
+                        temp_dir = Path(tempfile.mkdtemp(dir=work_path))
+                    container_workdir = "/workspace/" + temp_dir.relative_to(workspace).as_posix()
+                else:
+                    # Everything else reuses the container's scratch dir, emptied
+                    # of the previous run's script, result and files
+                    temp_dir = self._scratch_dirs[container.id]
+                    self._clear_dir(temp_dir)
+                    container_workdir = "/execution"
+                
+                # Write the code to execute
+                code_file = temp_dir / "script.py"
+                
+                # Wrap code with context injection and result capture
+                wrapped_code = self._get_wrapped_code(code, context, packages)
+                fd = os.open(str(code_file), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    os.write(fd, wrapped_code.encode("utf-8"))
+                finally:
+                    os.close(fd)
+                
+                # Context goes in a binary sidecar rather than a source literal,
+                # so the container doesn't re-parse it and non-JSON types survive
+                if context:
+                    with open(temp_dir / CONTEXT_FILE, "wb") as f:
+                        pickle.dump(context, f, protocol=5)
+                
+                try:
+                    exit_code, stdout, stderr = self._exec_in_container(
+                        container, container_workdir, timeout
+                    )
+                    break
+                except Exception as e:
+                    if (attempt == 1 and not isinstance(e, TimeoutError)
+                            and not self._container_alive(container)):
+                        logger.warning(
+                            f"Pool container {container.short_id} is gone ({e}); "
+                            "retrying on a fresh container"
+                        )
+                        self._discard_container(container, network)
+                        container = None
+                        continue
+                    # Timeout or other error - the container may still be running
+                    # the script, so it leaves the pool (the force-remove in
+                    # _discard_container kills it)
+                    return ExecutionResult(
+                        success=False,
+                        error=f"Execution timeout ({timeout}s) or error: {str(e)}"
+                    )
             
-            # Capture logs
-            stdout = container.logs(stdout=True, stderr=False).decode("utf-8", errors="replace")
-            stderr = container.logs(stdout=False, stderr=True).decode("utf-8", errors="replace")
+            reusable = True
+            stdout = stdout.decode("utf-8", errors="replace")
+            stderr = stderr.decode("utf-8", errors="replace")
             
             # Check for result file
-            result_file = Path(temp_dir) / "_result.json"
+            result_file = temp_dir / "_result.json"
             return_value = None
-            if result_file.exists():
-                try:
-                    return_value = json.loads(result_file.read_text())
-                except:
-                    pass
+            try:
+                return_value = _loads_result(result_file.read_bytes())
+            except FileNotFoundError:
+                pass
+            except ValueError:
+                logger.debug("Ignoring unparseable _result.json")
+            
+            # Only what ensure_packages imported or pip installed is known to
+            # be there; imports the script guards with try/except may not be
+            try:
+                ensured = (temp_dir / ENSURED_FILE).read_text().split()
+            except OSError:
+                ensured = []
+            if ensured:
+                self._record_installed_packages(ensured)
             
             # Find created files
             files_created = []
             if self.config.capture_files:
-                for f in Path(temp_dir).rglob("*"):
-                    if f.is_file() and f.name not in ["script.py", "_result.json"]:
+                for f in temp_dir.rglob("*"):
+                    if f.is_file() and f.name not in ["script.py", "_result.json", CONTEXT_FILE, ENSURED_FILE]:
                         files_created.append(str(f.relative_to(temp_dir)))
             
             return ExecutionResult(
@@ -463,6 +1014,11 @@ class SandboxManager:
                 error=f"Sandbox image '{self.config.image_name}' not found. "
                       f"Please build it first: docker build -t {self.config.image_name} ."
             )
+        except queue.Empty:
+            return ExecutionResult(
+                success=False,
+                error=f"No sandbox container became available within {timeout}s"
+            )
         except Exception as e:
             logger.exception("Sandbox execution failed")
             return ExecutionResult(
@@ -470,12 +1026,85 @@ class SandboxManager:
                 error=f"Sandbox error: {type(e).__name__}: {str(e)}"
             )
         finally:
-            # Cleanup container
+            # Return the container to the pool, or drop it if it's unusable
             if container:
-                try:
-                    container.remove(force=True)
-                except:
-                    pass
+                if reusable:
+                    self._release_container(container, network)
+                else:
+                    self._discard_container(container, network)
+    
+    @staticmethod
+    def _import_packages(code: str) -> List[str]:
+        """pip names for the modules code imports."""
+        return [_PIP_NAMES.get(m, m) for m in _extract_imports(code)]
+    
+    def _load_installed_packages(self) -> set:
+        """Read INSTALLED_FILE; a missing or corrupt file means nothing is known."""
+        path = Path(self.config.workspace_path) / ".cache" / INSTALLED_FILE
+        try:
+            return set(json.loads(path.read_bytes()))
+        except (OSError, ValueError, TypeError):
+            return set()
+    
+    def _record_installed_packages(self, names: List[str]):
+        """Remember packages a run found or installed and persist the set."""
+        with self._pool_lock:
+            new = set(names) - self._installed_packages
+            if not new:
+                return
+            self._installed_packages |= new
+            self._installed_gen += 1
+            data = json.dumps(sorted(self._installed_packages)).encode("utf-8")
+        
+        # Write-then-rename so a concurrent reader never sees a partial file
+        path = Path(self.config.workspace_path) / ".cache" / INSTALLED_FILE
+        tmp = path.with_name(f"{INSTALLED_FILE}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not save installed package list: {e}")
+            tmp.unlink(missing_ok=True)
+    
+    def _forget_installed_packages(self):
+        """Drop the installed package list (the image changed)."""
+        with self._pool_lock:
+            self._installed_packages = set()
+            self._installed_gen += 1
+        (Path(self.config.workspace_path) / ".cache" / INSTALLED_FILE).unlink(missing_ok=True)
+    
+    def _get_wrapped_code(
+        self,
+        code: str,
+        context: Dict[str, Any] = None,
+        packages: List[str] = None
+    ) -> str:
+        """
+        _wrap_code with an LRU in front of it.
+        
+        Context values travel in a sidecar file, so the script text only
+        depends on whether there is a context at all.
+        """
+        key = (
+            code,
+            tuple(packages or ()),
+            bool(context),
+            self.config.auto_install_packages,
+            self.config.capture_plots,
+            self._installed_gen,
+        )
+        with self._pool_lock:
+            wrapped = self._wrap_cache.get(key)
+            if wrapped is not None:
+                self._wrap_cache.move_to_end(key)
+                return wrapped
+        
+        wrapped = self._wrap_code(code, context, packages)
+        with self._pool_lock:
+            self._wrap_cache[key] = wrapped
+            if len(self._wrap_cache) > _WRAP_CACHE_SIZE:
+                self._wrap_cache.popitem(last=False)
+        return wrapped
     
     def _wrap_code(
         self,
@@ -485,118 +1114,35 @@ class SandboxManager:
     ) -> str:
         """Wrap user code with setup and result capture"""
         
-        lines = []
+        # Package installation, skipping anything already known to be there
+        installed = self._installed_packages
+        packages = [p for p in packages or () if p not in installed]
+        pip_packages = []
+        if self.config.auto_install_packages:
+            pip_packages = [
+                p for p in self._import_packages(code) if p not in installed
+            ]
         
-        # Package installation
-        if packages or self.config.auto_install_packages:
-            lines.append("""
-import subprocess
-import sys
-
-def ensure_packages(packages):
-    for pkg in packages:
-        try:
-            __import__(pkg.split('[')[0].replace('-', '_'))
-        except ImportError:
-            print(f"Installing {pkg}...")
-            subprocess.check_call([
-                sys.executable, "-m", "pip", "install", 
-                pkg, "-q", "--disable-pip-version-check"
-            ])
-""")
+        pkg_block = ""
+        if packages or pip_packages:
+            pkg_block = _PKG_INSTALL_TMPL + "\n"
             if packages:
-                lines.append(f"ensure_packages({packages!r})")
+                pkg_block += f"ensure_packages({packages!r})\n"
         
         # Auto-detect and install imports
-        if self.config.auto_install_packages:
-            # Extract imports from code
-            imports = []
-            for line in code.split("\n"):
-                stripped = line.strip()
-                if stripped.startswith("import "):
-                    mod = stripped.split()[1].split(".")[0].split(",")[0]
-                    imports.append(mod)
-                elif stripped.startswith("from "):
-                    mod = stripped.split()[1].split(".")[0]
-                    imports.append(mod)
-            
-            if imports:
-                # Map common import names to pip packages
-                pip_names = {
-                    "cv2": "opencv-python",
-                    "PIL": "Pillow",
-                    "sklearn": "scikit-learn",
-                    "yaml": "pyyaml",
-                    "bs4": "beautifulsoup4",
-                }
-                pip_packages = [pip_names.get(m, m) for m in imports]
-                lines.append(f"""
-try:
-    ensure_packages({pip_packages!r})
-except Exception as e:
-    print(f"Warning: Package installation issue: {{e}}")
-""")
-        
-        # Context injection
-        if context:
-            lines.append(f"\n# Injected context")
-            lines.append(f"__context__ = {json.dumps(context)}")
-            for key, value in context.items():
-                if isinstance(value, (str, int, float, bool, list, dict, type(None))):
-                    lines.append(f"{key} = __context__[{key!r}]")
-        
-        # Setup for plot capture
-        if self.config.capture_plots:
-            lines.append("""
-import sys
-import os
-
-# Configure matplotlib for headless operation
-import matplotlib
-matplotlib.use('Agg')
-
-# Patch plt.show() to save figures
-_figure_count = [0]
-_original_show = None
-
-def _capture_show():
-    import matplotlib.pyplot as plt
-    _figure_count[0] += 1
-    filename = f"figure_{_figure_count[0]}.png"
-    plt.savefig(filename, dpi=150, bbox_inches='tight')
-    print(f"[Saved figure: {filename}]")
-    plt.close()
-
-try:
-    import matplotlib.pyplot as plt
-    _original_show = plt.show
-    plt.show = _capture_show
-except:
-    pass
-""")
+        if pip_packages:
+            pkg_block += _AUTO_INSTALL_TMPL.format(packages=pip_packages)
         
-        # The actual user code
-        lines.append("\n# ===== User Code =====")
-        lines.append(code)
-        lines.append("# ===== End User Code =====\n")
+        # Context injection (values are loaded from CONTEXT_FILE)
+        ctx_block = _CONTEXT_LOAD + "\n" if context else ""
         
-        # Result capture
-        lines.append("""
-# Save result if defined
-import json
-_result_vars = ['result', '_result', 'output', '_output']
-for _var in _result_vars:
-    if _var in dir() and _var in locals():
-        try:
-            _val = locals()[_var]
-            with open('_result.json', 'w') as f:
-                json.dump(_val, f, default=str)
-            break
-        except:
-            pass
-""")
+        mpl_block = _MPL_CAPTURE + "\n" if self.config.capture_plots else ""
         
-        return "\n".join(lines)
+        return (
+            f"{pkg_block}{ctx_block}{mpl_block}"
+            f"\n# ===== User Code =====\n{code}\n# ===== End User Code =====\n\n"
+            f"{_RESULT_CAPTURE}"
+        )
     
     def build_image(self, force: bool = False) -> bool:
         """Build the sandbox Docker image"""
@@ -625,13 +1171,20 @@ RUN apt-get update && apt-get install -y --no-install-recommends \\
     libssl-dev \\
     && rm -rf /var/lib/apt/lists/*
 
-# Install common Python packages
+# Install common Python packages in layers, most stable first, so a forced
+# rebuild reuses the heavy scientific layer from the build cache.
+# --no-cache-dir keeps wheels out of the image; PIP_NO_CACHE_DIR is not set
+# as ENV because runtime installs rely on the mounted /root/.cache/pip.
+# Layer 1: Core scientific stack
 RUN pip install --no-cache-dir \\
     numpy \\
     pandas \\
+    scipy
+
+# Layer 2: Everything else
+RUN pip install --no-cache-dir \\
     matplotlib \\
     seaborn \\
-    scipy \\
     scikit-learn \\
     requests \\
     beautifulsoup4 \\
@@ -667,6 +1220,7 @@ CMD ["python"]
                         logger.debug(log["stream"].strip())
                 
                 logger.info(f"Successfully built {self.config.image_name}")
+                self._forget_installed_packages()
                 return True
                 
             except docker.errors.BuildError as e:
@@ -675,33 +1229,44 @@ CMD ["python"]
     
     def cleanup_workspace(self, older_than_days: int = 7):
         """Clean up old temp files in workspace"""
-        import time
-        
-        temp_dir = Path(self.config.workspace_path) / "temp"
+        temp_dir = os.path.join(self.config.workspace_path, "temp")
         cutoff = time.time() - (older_than_days * 86400)
         
+        # Scratch dirs of live pooled containers are in use, whatever their age
+        live = {str(p) for p in self._scratch_dirs.values()}
+        
         cleaned = 0
-        for item in temp_dir.iterdir():
-            if item.is_dir() and item.stat().st_mtime < cutoff:
-                shutil.rmtree(item)
-                cleaned += 1
+        # DirEntry caches its stat, so each entry costs one syscall
+        with os.scandir(temp_dir) as it:
+            for entry in it:
+                if entry.path in live:
+                    continue
+                if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                    self._remove_tree(entry.path)
+                    cleaned += 1
         
         logger.info(f"Cleaned up {cleaned} old temp directories")
         return cleaned
     
     def list_workspace_projects(self) -> List[Dict]:
         """List all projects in workspace"""
-        projects_dir = Path(self.config.workspace_path) / "projects"
+        projects_dir = os.path.join(self.config.workspace_path, "projects")
         projects = []
         
-        for item in projects_dir.iterdir():
-            if item.is_dir():
-                projects.append({
-                    "name": item.name,
-                    "path": str(item),
-                    "files": len(list(item.rglob("*"))),
-                    "modified": item.stat().st_mtime
-                })
+        with os.scandir(projects_dir) as it:
+            for entry in it:
+                if entry.is_dir():
+                    # Count files and subdirectories recursively, without
+                    # materializing the whole tree
+                    count = 0
+                    for _, dirs, files in os.walk(entry.path):
+                        count += len(dirs) + len(files)
+                    projects.append({
+                        "name": entry.name,
+                        "path": entry.path,
+                        "files": count,
+                        "modified": entry.stat().st_mtime
+                    })
         
         return sorted(projects, key=lambda x: x["modified"], reverse=True)
 
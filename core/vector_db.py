@@ -29,10 +29,15 @@ Usage:
     results = collection.query("greeting", n_results=5)
 """
 
+import atexit
+import functools
+import json
 import logging
 import os
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union, Callable
+from typing import List, Dict, Any, Optional, Union, Callable, Tuple
 import numpy as np
 from datetime import datetime
 
@@ -44,6 +49,12 @@ class VectorDBError(Exception):
     pass
 
 
+# Loaded SentenceTransformer models, shared by every EmbeddingGenerator in
+# the process (VectorDB instances are created freely, e.g. per UI action)
+_models: Dict[str, Any] = {}
+_models_lock = threading.Lock()
+
+
 class EmbeddingGenerator:
     """
     Handle text embeddings using sentence-transformers.
@@ -71,18 +82,24 @@ class EmbeddingGenerator:
             return
 
         try:
-            from sentence_transformers import SentenceTransformer
-
-            logger.info(f"Loading embedding model: {self.model_name}")
-            # Explicitly set device='cpu' to avoid accelerate meta tensor issues
-            # and set trust_remote_code=False for safety
-            self._model = SentenceTransformer(
-                self.model_name,
-                device='cpu',
-                trust_remote_code=False
-            )
+            with _models_lock:
+                model = _models.get(self.model_name)
+                if model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    logger.info(f"Loading embedding model: {self.model_name}")
+                    # Explicitly set device='cpu' to avoid accelerate meta tensor issues
+                    # and set trust_remote_code=False for safety
+                    model = SentenceTransformer(
+                        self.model_name,
+                        device='cpu',
+                        trust_remote_code=False
+                    )
+                    _models[self.model_name] = model
+                    logger.info(f"Model loaded successfully: {self.model_name}")
+
+            self._model = model
             self._model_loaded = True
-            logger.info(f"Model loaded successfully: {self.model_name}")
 
         except ImportError:
             raise VectorDBError(
@@ -163,6 +180,191 @@ class EmbeddingGenerator:
         return self._model.get_sentence_embedding_dimension()
 
 
+@functools.lru_cache(maxsize=4096)
+def _decode_related(value: str) -> tuple:
+    return tuple(json.loads(value))
+
+
+def related_memory_ids(metadata: Dict[str, Any]) -> List[str]:
+    """
+    Decode a vector's related_memories field.
+
+    ChromaDB metadata only holds scalars, so the list is stored as a JSON
+    string; decoded values are cached by that string.
+    """
+    return list(_decode_related(metadata.get("related_memories") or "[]"))
+
+
+# Seconds an access-tracking burst is buffered before it is written
+ACCESS_FLUSH_DELAY = 0.1
+
+
+class _AccessBuffer:
+    """
+    Write-behind buffer for access tracking (Phase 2).
+
+    Searches only bump in-memory counters here; a short timer then folds the
+    whole burst into one get + update per collection, instead of one SQLite
+    transaction per search. Reads through VectorCollection overlay the
+    unflushed deltas, so counts still look up to date. While a flush is
+    being written a concurrent read may be off by that flush's deltas.
+    """
+
+    def __init__(self, delay: float = ACCESS_FLUSH_DELAY):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        # collection id -> (chroma collection, {vector_id: [count, last_ts]})
+        self._pending: Dict[Any, Tuple[Any, Dict[str, list]]] = {}
+        # Deltas taken by the running flush, still visible to readers
+        self._inflight: Dict[Any, Dict[str, list]] = {}
+
+    def add(self, collection: Any, vector_ids: List[str], ts: float):
+        """Record one access for each id and schedule a flush."""
+        with self._lock:
+            entry = self._pending.get(collection.id)
+            if entry is None:
+                entry = self._pending[collection.id] = (collection, {})
+            deltas = entry[1]
+            for vid in vector_ids:
+                delta = deltas.get(vid)
+                if delta is None:
+                    deltas[vid] = [1, ts]
+                else:
+                    delta[0] += 1
+                    delta[1] = ts
+
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def overlay(self, collection: Any, ids: List[str], metadatas: List[Dict]) -> List[Dict]:
+        """Return metadatas with unflushed deltas applied (changed rows are copies)."""
+        with self._lock:
+            entry = self._pending.get(collection.id)
+            sources = [
+                d for d in (entry[1] if entry else None, self._inflight.get(collection.id))
+                if d
+            ]
+            if not sources:
+                return metadatas
+
+            merged = []
+            for vid, metadata in zip(ids, metadatas):
+                count, ts = 0, None
+                for deltas in sources:
+                    delta = deltas.get(vid)
+                    if delta is not None:
+                        count += delta[0]
+                        ts = delta[1] if ts is None else max(ts, delta[1])
+                if count:
+                    metadata = {
+                        **(metadata or {}),
+                        "access_count": (metadata or {}).get("access_count", 0) + count,
+                        "last_accessed_ts": ts,
+                    }
+                merged.append(metadata)
+            return merged
+
+    def discard(self, collection: Any, ids: List[str]):
+        """Forget all deltas for ids that were deleted."""
+        with self._lock:
+            for deltas in (
+                self._pending.get(collection.id, (None, {}))[1],
+                self._inflight.get(collection.id, {}),
+            ):
+                for vid in ids:
+                    deltas.pop(vid, None)
+
+    def consume(self, collection: Any, counts: Dict[str, int]):
+        """
+        Drop up to counts[id] buffered accesses per id, oldest first.
+
+        Used when a caller writes back an access_count that already includes
+        the deltas it saw; accesses buffered after that read are kept.
+        """
+        with self._lock:
+            remaining = dict(counts)
+            for deltas in (
+                self._inflight.get(collection.id, {}),
+                self._pending.get(collection.id, (None, {}))[1],
+            ):
+                for vid, n in remaining.items():
+                    delta = deltas.get(vid)
+                    if delta is None or n <= 0:
+                        continue
+                    taken = min(n, delta[0])
+                    remaining[vid] = n - taken
+                    delta[0] -= taken
+                    if not delta[0]:
+                        del deltas[vid]
+
+    def flush(self):
+        """Write all pending deltas now (also run by the timer and at exit)."""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                batch, self._pending = self._pending, {}
+                self._inflight = {key: deltas for key, (_, deltas) in batch.items()}
+
+            try:
+                for collection, deltas in batch.values():
+                    try:
+                        docs = collection.get(ids=list(deltas), include=["metadatas"])
+                        ids, metadatas = [], []
+                        for vid, metadata in zip(docs["ids"], docs["metadatas"]):
+                            delta = deltas.get(vid)
+                            if delta is None:
+                                continue
+                            ids.append(vid)
+                            # Chroma merges metadata on update, so only the two
+                            # tracking fields are sent (related_memories etc.
+                            # are neither decoded nor rewritten)
+                            metadatas.append({
+                                "access_count": (metadata or {}).get("access_count", 0) + delta[0],
+                                "last_accessed_ts": delta[1],
+                            })
+                        if ids:
+                            # One update (one SQLite transaction) per collection
+                            collection.update(ids=ids, metadatas=metadatas)
+                            logger.debug(f"Flushed access tracking for {len(ids)} vectors in {collection.name}")
+                    except Exception as e:
+                        # Non-blocking: analytics are best effort
+                        logger.warning(f"Failed to flush vector access tracking for {collection.name}: {e}")
+            finally:
+                with self._lock:
+                    self._inflight = {}
+
+
+_access_buffer = _AccessBuffer()
+atexit.register(_access_buffer.flush)
+
+# Per (store, collection name), bumped by every add/delete/update made
+# through VectorCollection in this process (buffered access tracking
+# excluded), so result caches can tell when their entries went stale. The
+# store is VectorDB.store_key, so same-named collections of different
+# databases don't share a counter.
+_write_generations: Dict[Tuple[str, str], int] = {}
+
+
+def collection_generation(store: str, name: str) -> int:
+    """Current write generation of a collection (0 if never written)."""
+    return _write_generations.get((store, name), 0)
+
+
+def _bump_generation(store: str, name: str):
+    _write_generations[(store, name)] = _write_generations.get((store, name), 0) + 1
+
+
+def flush_access_tracking():
+    """Write buffered access tracking to disk immediately."""
+    _access_buffer.flush()
+
+
 class VectorCollection:
     """
     Wrapper for ChromaDB collection operations.
@@ -171,17 +373,19 @@ class VectorCollection:
     in a ChromaDB collection.
     """
 
-    def __init__(self, collection: Any, embedding_generator: EmbeddingGenerator):
+    def __init__(self, collection: Any, embedding_generator: EmbeddingGenerator, store: str = ""):
         """
         Initialize collection wrapper.
 
         Args:
             collection: ChromaDB collection object
             embedding_generator: EmbeddingGenerator instance
+            store: Owning database's VectorDB.store_key
         """
         self.collection = collection
         self.embedding_generator = embedding_generator
         self.name = collection.name
+        self.store = store
 
     def add(
         self,
@@ -209,8 +413,8 @@ class VectorCollection:
         try:
             # Generate IDs if not provided
             if ids is None:
-                ids = [f"{self.name}_{i}_{datetime.now().timestamp()}"
-                       for i in range(len(texts))]
+                now_ts = time.time()
+                ids = [f"{self.name}_{i}_{now_ts}" for i in range(len(texts))]
 
             # Validate inputs
             if len(texts) != len(ids):
@@ -223,8 +427,7 @@ class VectorCollection:
             if metadatas is None:
                 metadatas = [{} for _ in range(len(texts))]
 
-            current_time = datetime.now()
-            current_ts = current_time.timestamp()
+            current_ts = time.time()
 
             for metadata in metadatas:
                 # Add new fields with defaults (only if not already present)
@@ -252,6 +455,7 @@ class VectorCollection:
                 metadatas=metadatas,
                 ids=ids
             )
+            _bump_generation(self.store, self.name)
 
             logger.info(f"Added {len(texts)} documents to {self.name}")
             return True
@@ -265,7 +469,8 @@ class VectorCollection:
         query_text: str,
         n_results: int = 10,
         filter: Optional[Dict[str, Any]] = None,
-        include_distances: bool = True
+        include_distances: bool = True,
+        query_embedding: Optional[np.ndarray] = None
     ) -> Dict[str, Any]:
         """
         Query collection for similar documents.
@@ -275,24 +480,30 @@ class VectorCollection:
             n_results: Number of results to return
             filter: Optional metadata filter
             include_distances: Include similarity distances
+            query_embedding: Precomputed embedding of query_text (skips encoding)
 
         Returns:
             Query results dict with ids, documents, metadatas, distances
         """
         try:
             # Generate query embedding
-            query_embedding = self.embedding_generator.encode(query_text)
+            if query_embedding is None:
+                query_embedding = self.embedding_generator.encode(query_text)
 
             # Ensure embedding is 1D array, then convert to list
             if query_embedding.ndim > 1:
                 query_embedding = query_embedding.flatten()
 
-            # Query collection
+            # Query collection - everything callers read comes back in this
+            # one call; distances are only requested when wanted
+            include = ["documents", "metadatas"]
+            if include_distances:
+                include.append("distances")
             results = self.collection.query(
                 query_embeddings=[query_embedding.tolist()],
                 n_results=n_results,
                 where=filter,
-                include=["documents", "metadatas", "distances"]
+                include=include
             )
 
             # Flatten results (ChromaDB returns nested lists)
@@ -301,8 +512,11 @@ class VectorCollection:
                 "documents": results["documents"][0] if results["documents"] else [],
                 "metadatas": results["metadatas"][0] if results["metadatas"] else [],
             }
+            flattened["metadatas"] = _access_buffer.overlay(
+                self.collection, flattened["ids"], flattened["metadatas"]
+            )
 
-            if include_distances and "distances" in results:
+            if include_distances and results.get("distances"):
                 flattened["distances"] = results["distances"][0]
 
             logger.info(f"Query returned {len(flattened['ids'])} results from {self.name}")
@@ -312,6 +526,29 @@ class VectorCollection:
             logger.error(f"Error querying {self.name}: {e}")
             raise VectorDBError(f"Query failed: {e}")
 
+    def nearest(self, embeddings: np.ndarray, n_results: int = 10) -> Dict[str, Any]:
+        """
+        Nearest neighbours for many embeddings in a single query.
+
+        Args:
+            embeddings: 2D array of query embeddings (e.g. stored ones)
+            n_results: Neighbours per query embedding
+
+        Returns:
+            Dict with per-query lists of ids and distances
+        """
+        try:
+            results = self.collection.query(
+                query_embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
+                n_results=n_results,
+                include=["distances"]
+            )
+            return {"ids": results["ids"], "distances": results["distances"]}
+
+        except Exception as e:
+            logger.error(f"Error querying neighbours in {self.name}: {e}")
+            raise VectorDBError(f"Query failed: {e}")
+
     def delete(self, ids: List[str]) -> bool:
         """
         Delete documents from collection.
@@ -324,6 +561,8 @@ class VectorCollection:
         """
         try:
             self.collection.delete(ids=ids)
+            _access_buffer.discard(self.collection, ids)
+            _bump_generation(self.store, self.name)
             logger.info(f"Deleted {len(ids)} documents from {self.name}")
             return True
 
@@ -346,10 +585,30 @@ class VectorCollection:
             if len(ids) != len(metadatas):
                 raise ValueError("ids and metadatas must have same length")
 
+            # Callers write back access counts they read through get()/query(),
+            # which carried the buffered deltas at that time. The part of the
+            # written count above the stored one is what they saw; only that
+            # much is dropped from the buffer.
+            written = {i: m["access_count"] for i, m in zip(ids, metadatas) if "access_count" in m}
+            stored = {}
+            if written:
+                docs = self.collection.get(ids=list(written), include=["metadatas"])
+                stored = {
+                    vid: (metadata or {}).get("access_count", 0)
+                    for vid, metadata in zip(docs["ids"], docs["metadatas"])
+                }
+
             self.collection.update(
                 ids=ids,
                 metadatas=metadatas
             )
+            _bump_generation(self.store, self.name)
+
+            if written:
+                _access_buffer.consume(
+                    self.collection,
+                    {vid: count - stored.get(vid, 0) for vid, count in written.items()}
+                )
 
             logger.info(f"Updated {len(ids)} documents in {self.name}")
             return True
@@ -363,7 +622,9 @@ class VectorCollection:
         Track access to vectors by incrementing access_count and updating last_accessed_ts.
 
         This is a non-blocking operation used for memory health analytics.
-        Failure to track access will be logged but won't raise exceptions.
+        Accesses are buffered and written in the background (see
+        _AccessBuffer); get() and query() already include them. Failure to
+        track access will be logged but won't raise exceptions.
 
         Args:
             vector_ids: List of vector IDs that were accessed
@@ -375,35 +636,42 @@ class VectorCollection:
             if not vector_ids:
                 return True
 
-            # Get current metadata for these vectors
-            docs = self.collection.get(ids=vector_ids)
+            # Plain float seconds; no datetime object on the hot path
+            _access_buffer.add(self.collection, vector_ids, time.time())
 
-            if not docs["ids"]:
-                logger.warning(f"No vectors found for tracking: {vector_ids}")
-                return False
+            logger.debug(f"Queued access tracking for {len(vector_ids)} vectors in {self.name}")
+            return True
 
-            # Update metadata
-            current_ts = datetime.now().timestamp()
-            updated_metadatas = []
+        except Exception as e:
+            # Non-blocking: log error but don't fail the operation
+            logger.warning(f"Failed to track vector access in {self.name}: {e}")
+            return False
 
-            for metadata in docs["metadatas"]:
-                metadata["access_count"] = metadata.get("access_count", 0) + 1
-                metadata["last_accessed_ts"] = current_ts
-                updated_metadatas.append(metadata)
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Collection-level metadata (not per-document)."""
+        return dict(self.collection.metadata or {})
 
-            # Batch update
-            self.collection.update(
-                ids=docs["ids"],
-                metadatas=updated_metadatas
-            )
+    def set_metadata(self, **values: Any) -> bool:
+        """
+        Merge values into the collection-level metadata.
+
+        Args:
+            **values: Keys to add or overwrite
 
-            logger.debug(f"Tracked access for {len(docs['ids'])} vectors in {self.name}")
+        Returns:
+            True if successful
+        """
+        try:
+            # hnsw:* settings are fixed at creation; Chroma rejects them in modify
+            metadata = {k: v for k, v in self.metadata.items() if not k.startswith("hnsw:")}
+            metadata.update(values)
+            self.collection.modify(metadata=metadata)
             return True
 
         except Exception as e:
-            # Non-blocking: log error but don't fail the operation
-            logger.warning(f"Failed to track vector access in {self.name}: {e}")
-            return False
+            logger.error(f"Error updating collection metadata of {self.name}: {e}")
+            raise VectorDBError(f"Metadata update failed: {e}")
 
     def count(self) -> int:
         """
@@ -418,23 +686,39 @@ class VectorCollection:
             logger.error(f"Error counting documents in {self.name}: {e}")
             return 0
 
-    def get(self, ids: Optional[List[str]] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        include: Optional[List[str]] = None,
+        offset: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         Get documents from collection.
 
         Args:
             ids: Optional list of IDs to retrieve
             limit: Optional limit on results
+            offset: Optional number of results to skip (for paging with limit)
+            include: Fields to return (default: documents and metadatas);
+                pass ["metadatas"] to skip loading document text
 
         Returns:
-            Dict with ids, documents, metadatas
+            Dict with ids plus the included fields
         """
         try:
+            if include is None:
+                include = ["documents", "metadatas"]
             results = self.collection.get(
                 ids=ids,
                 limit=limit,
-                include=["documents", "metadatas"]
+                offset=offset,
+                include=include
             )
+            if "metadatas" in include:
+                results["metadatas"] = _access_buffer.overlay(
+                    self.collection, results["ids"], results["metadatas"]
+                )
             return results
 
         except Exception as e:
@@ -452,7 +736,7 @@ class VectorDB:
 
     def __init__(
         self,
-        persist_directory: str = "./sandbox/vector_db",
+        persist_directory: Optional[str] = "./sandbox/vector_db",
         model_name: str = "all-MiniLM-L6-v2"
     ):
         """
@@ -460,17 +744,21 @@ class VectorDB:
 
         Args:
             persist_directory: Directory for persistent storage
+                (None keeps everything in memory, e.g. for tests)
             model_name: Sentence-transformers model name
         """
-        self.persist_directory = Path(persist_directory)
+        self.persist_directory = Path(persist_directory) if persist_directory else None
         self.model_name = model_name
+        # Identifies this database's storage for write generations and caches
+        self.store_key = str(self.persist_directory.resolve()) if self.persist_directory else ":memory:"
 
         self._client = None
         self._initialized = False
         self.embedding_generator = EmbeddingGenerator(model_name)
 
         # Ensure persist directory exists
-        self.persist_directory.mkdir(parents=True, exist_ok=True)
+        if self.persist_directory is not None:
+            self.persist_directory.mkdir(parents=True, exist_ok=True)
 
     def _initialize(self):
         """Lazy initialization of ChromaDB client"""
@@ -481,16 +769,23 @@ class VectorDB:
             import chromadb
             from chromadb.config import Settings
 
-            logger.info(f"Initializing ChromaDB at {self.persist_directory}")
+            settings = Settings(
+                anonymized_telemetry=False,
+                allow_reset=True
+            )
 
-            # Create ChromaDB client with persistence
-            self._client = chromadb.PersistentClient(
-                path=str(self.persist_directory),
-                settings=Settings(
-                    anonymized_telemetry=False,
-                    allow_reset=True
+            if self.persist_directory is None:
+                # In-memory client - no SQLite files, nothing survives the process
+                logger.info("Initializing in-memory ChromaDB")
+                self._client = chromadb.EphemeralClient(settings=settings)
+            else:
+                logger.info(f"Initializing ChromaDB at {self.persist_directory}")
+
+                # Create ChromaDB client with persistence
+                self._client = chromadb.PersistentClient(
+                    path=str(self.persist_directory),
+                    settings=settings
                 )
-            )
 
             self._initialized = True
             logger.info("ChromaDB initialized successfully")
@@ -516,14 +811,18 @@ class VectorDB:
         self._initialize()
 
         try:
-            # Get or create collection
-            collection = self._client.get_or_create_collection(
-                name=name,
-                metadata={"created_at": datetime.now().isoformat()}
-            )
+            # Look up first: get_or_create_collection with metadata rewrites
+            # an existing collection's metadata (created_at, schema stamps)
+            try:
+                collection = self._client.get_collection(name=name)
+            except Exception:
+                collection = self._client.get_or_create_collection(
+                    name=name,
+                    metadata={"created_at": datetime.now().isoformat()}
+                )
 
             logger.info(f"Got/created collection: {name}")
-            return VectorCollection(collection, self.embedding_generator)
+            return VectorCollection(collection, self.embedding_generator, self.store_key)
 
         except Exception as e:
             logger.error(f"Error getting/creating collection {name}: {e}")
@@ -562,6 +861,7 @@ class VectorDB:
 
         try:
             self._client.delete_collection(name)
+            _bump_generation(self.store_key, name)
             logger.info(f"Deleted collection: {name}")
             return True
 
@@ -600,6 +900,9 @@ class VectorDB:
 
         try:
             self._client.reset()
+            for store, name in list(_write_generations):
+                if store == self.store_key:
+                    _bump_generation(store, name)
             logger.warning("Vector database reset - all collections deleted")
             return True
         except Exception as e:
@@ -620,14 +923,14 @@ class VectorDB:
 # Convenience functions for quick operations
 
 def create_vector_db(
-    persist_directory: str = "./sandbox/vector_db",
+    persist_directory: Optional[str] = "./sandbox/vector_db",
     model_name: str = "all-MiniLM-L6-v2"
 ) -> VectorDB:
     """
     Create a VectorDB instance with standard settings.
 
     Args:
-        persist_directory: Storage directory
+        persist_directory: Storage directory (None for in-memory)
         model_name: Embedding model
 
     Returns:
@@ -0,0 +1,24 @@
+"""
+Shared helpers for the memory test scripts.
+"""
+
+from typing import Any, Iterable
+
+
+def bulk_stale(coll: Any, ids: Iterable[str], ts: float) -> bool:
+    """
+    Backdate last_accessed_ts for many vectors in one update call.
+
+    ChromaDB merges metadata on update, so only the timestamp is sent and the
+    rows don't have to be read first; all ids go through a single transaction.
+
+    Args:
+        coll: VectorCollection holding the vectors
+        ids: Vector IDs to mark as stale
+        ts: Unix timestamp to store as last_accessed_ts
+
+    Returns:
+        True if successful
+    """
+    ids = list(ids)
+    return coll.update(ids=ids, metadatas=[{"last_accessed_ts": ts} for _ in ids])
@@ -12,7 +12,7 @@ Tests:
 
 import sys
 import os
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from tools.vector_search import (
     vector_add_knowledge,
@@ -20,19 +20,54 @@ from tools.vector_search import (
     migrate_existing_vectors_to_v2,
     _get_vector_db
 )
-from datetime import datetime
+import tools.vector_search as vector_search_module
+from core.vector_db import create_vector_db
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import json
+import time
 
+import pytest
 
-def test_new_vector_with_enhanced_metadata():
-    """Test 1: Create new vector and verify enhanced metadata"""
-    print("\n" + "="*70)
-    print("TEST 1: Creating new vector with enhanced metadata")
-    print("="*70)
+# Where vector_add_knowledge/vector_search_knowledge keep private facts
+KNOWLEDGE = "knowledge_private"
 
-    # Add a test fact
+# Section banners, built once
+BANNER = "=" * 70
+BAR = "\n" + BANNER
+
+# Full metadata/result dumps only with TEST_VERBOSE=1
+VERBOSE = os.environ.get("TEST_VERBOSE") == "1"
+
+# Metadata every vector must carry after Phase 1
+REQUIRED_FIELDS = frozenset(["access_count", "last_accessed_ts", "related_memories", "embedding_version"])
+
+# Value checks for a freshly added vector, as (check, description)
+NEW_VECTOR_CHECKS = (
+    (lambda m: m["access_count"] == 0, "access_count should be 0"),
+    (lambda m: type(m["last_accessed_ts"]) in (int, float), "last_accessed_ts should be numeric"),
+    (lambda m: type(m["related_memories"]) is str, "related_memories should be a JSON string"),
+    (lambda m: m["related_memories"] == "[]", "related_memories should be empty JSON array"),
+    (lambda m: "embedding_version" in m, "embedding_version should exist"),
+)
+
+
+@lru_cache(maxsize=1)
+def _coll():
+    """The knowledge collection, looked up once and shared by every test."""
+    return _get_vector_db().get_or_create_collection(KNOWLEDGE)
+
+
+def _snapshot(coll, ids):
+    """Metadata for ids as {id: metadata}, read with a single get()."""
+    docs = coll.get(ids=ids, include=["metadatas"])
+    return dict(zip(docs["ids"], docs["metadatas"]))
+
+
+def _add_fact(fact):
+    """Add a testing fact and return its vector id."""
     result = vector_add_knowledge(
-        fact="Phase 1 Memory Enhancement test fact",
+        fact=fact,
         category="testing",
         confidence=1.0,
         source="phase1_test"
@@ -40,66 +75,89 @@ def test_new_vector_with_enhanced_metadata():
 
     print(f"\n✓ Vector created: {result}")
 
-    if not result.get("success"):
-        print("❌ FAILED: Could not create vector")
+    assert result.get("success"), "Could not create vector"
+    return result["id"]
+
+
+def _passed(label, test, *args):
+    """Run one test for main(), reporting a failed check instead of raising."""
+    try:
+        test(*args)
+    except AssertionError as e:
+        print(f"❌ FAILED: {e}")
+        print(f"\n❌ Test suite FAILED at {label}")
         return False
+    return True
+
+
+# ============================================================================
+# pytest fixtures (the script entry point below uses ./sandbox/vector_db)
+# ============================================================================
+
+@pytest.fixture(scope="module", autouse=True)
+def memory_db():
+    """Run the module against a fresh in-memory Chroma instead of ./sandbox."""
+    db = create_vector_db(persist_directory=None)
+    db.reset()
+    vector_search_module._vector_db = db
+    _coll.cache_clear()
+    yield db
+    vector_search_module._vector_db = None
+    _coll.cache_clear()
+
+
+@pytest.fixture
+def vector_id():
+    """A fresh vector for Test 2, independent of Test 1."""
+    return _add_fact("Phase 1 track_access test fact")
+
+
+def test_new_vector_with_enhanced_metadata():
+    """Test 1: Create new vector and verify enhanced metadata"""
+    print(BAR)
+    print("TEST 1: Creating new vector with enhanced metadata")
+    print(BANNER)
+
+    # Add a test fact
+    vector_id = _add_fact("Phase 1 Memory Enhancement test fact")
 
     # Get the vector back and check metadata
-    db = _get_vector_db()
-    coll = db.get_or_create_collection("knowledge")
+    coll = _coll()
 
     # Get the vector we just created
-    vector_id = result["id"]
-    docs = coll.get(ids=[vector_id])
+    docs = coll.get(ids=[vector_id], include=["metadatas"])
 
-    if not docs["ids"]:
-        print("❌ FAILED: Could not retrieve vector")
-        return False
+    assert docs["ids"], "Could not retrieve vector"
 
     metadata = docs["metadatas"][0]
 
-    print(f"\n📋 Retrieved metadata:")
-    print(json.dumps(metadata, indent=2))
+    if VERBOSE:
+        print(f"\n📋 Retrieved metadata:")
+        print(json.dumps(metadata, indent=2))
 
     # Check all required fields
-    required_fields = ["access_count", "last_accessed_ts", "related_memories", "embedding_version"]
-    missing_fields = [field for field in required_fields if field not in metadata]
+    missing_fields = sorted(REQUIRED_FIELDS - metadata.keys())
 
-    if missing_fields:
-        print(f"\n❌ FAILED: Missing fields: {missing_fields}")
-        return False
+    assert not missing_fields, f"Missing fields: {missing_fields}"
 
-    # Verify field values
-    checks = [
-        (metadata["access_count"] == 0, "access_count should be 0"),
-        (isinstance(metadata["last_accessed_ts"], (int, float)), "last_accessed_ts should be numeric"),
-        (isinstance(metadata["related_memories"], str), "related_memories should be a JSON string"),
-        (metadata["related_memories"] == "[]", "related_memories should be empty JSON array"),
-        ("embedding_version" in metadata, "embedding_version should exist")
-    ]
-
-    for check, description in checks:
-        if not check:
-            print(f"❌ FAILED: {description}")
-            return False
+    # Verify field values (stops at the first failing check)
+    for check, description in NEW_VECTOR_CHECKS:
+        assert check(metadata), description
         print(f"✓ {description}")
 
     print("\n✅ TEST 1 PASSED: New vector has all enhanced metadata fields!")
-    return True, vector_id
 
 
 def test_track_access(vector_id):
     """Test 2: Test track_access() functionality"""
-    print("\n" + "="*70)
+    print(BAR)
     print("TEST 2: Testing track_access() functionality")
-    print("="*70)
+    print(BANNER)
 
-    db = _get_vector_db()
-    coll = db.get_or_create_collection("knowledge")
+    coll = _coll()
 
     # Get initial metadata
-    docs_before = coll.get(ids=[vector_id])
-    metadata_before = docs_before["metadatas"][0]
+    metadata_before = _snapshot(coll, [vector_id])[vector_id]
 
     print(f"\n📊 Before tracking:")
     print(f"  access_count: {metadata_before['access_count']}")
@@ -109,26 +167,20 @@ def test_track_access(vector_id):
     print("\n⏳ Tracking access...")
     success = coll.track_access([vector_id])
 
-    if not success:
-        print("❌ FAILED: track_access() returned False")
-        return False
+    assert success, "track_access() returned False"
 
     # Get updated metadata
-    docs_after = coll.get(ids=[vector_id])
-    metadata_after = docs_after["metadatas"][0]
+    metadata_after = _snapshot(coll, [vector_id])[vector_id]
 
     print(f"\n📊 After tracking:")
     print(f"  access_count: {metadata_after['access_count']}")
     print(f"  last_accessed_ts: {metadata_after['last_accessed_ts']}")
 
     # Verify changes
-    if metadata_after["access_count"] != metadata_before["access_count"] + 1:
-        print(f"❌ FAILED: access_count not incremented correctly")
-        return False
-
-    if metadata_after["last_accessed_ts"] <= metadata_before["last_accessed_ts"]:
-        print(f"❌ FAILED: last_accessed_ts not updated")
-        return False
+    assert metadata_after["access_count"] == metadata_before["access_count"] + 1, \
+        "access_count not incremented correctly"
+    assert metadata_after["last_accessed_ts"] > metadata_before["last_accessed_ts"], \
+        "last_accessed_ts not updated"
 
     print("\n✓ access_count incremented from 0 to 1")
     print("✓ last_accessed_ts updated")
@@ -137,85 +189,72 @@ def test_track_access(vector_id):
     print("\n⏳ Tracking access again...")
     coll.track_access([vector_id])
 
-    docs_final = coll.get(ids=[vector_id])
-    metadata_final = docs_final["metadatas"][0]
+    metadata_final = _snapshot(coll, [vector_id])[vector_id]
 
-    if metadata_final["access_count"] != 2:
-        print(f"❌ FAILED: Second tracking didn't work (count={metadata_final['access_count']})")
-        return False
+    assert metadata_final["access_count"] == 2, \
+        f"Second tracking didn't work (count={metadata_final['access_count']})"
 
     print(f"✓ Second tracking successful (count={metadata_final['access_count']})")
 
     print("\n✅ TEST 2 PASSED: track_access() works correctly!")
-    return True
 
 
 def test_migration():
     """Test 3: Test migration on existing vectors"""
-    print("\n" + "="*70)
+    print(BAR)
     print("TEST 3: Testing migration utility")
-    print("="*70)
+    print(BANNER)
 
     # Run migration
-    print("\n⏳ Running migration on 'knowledge' collection...")
-    result = migrate_existing_vectors_to_v2("knowledge")
+    print(f"\n⏳ Running migration on '{KNOWLEDGE}' collection...")
+    result = migrate_existing_vectors_to_v2(KNOWLEDGE)
 
-    print(f"\n📊 Migration result:")
-    print(json.dumps(result, indent=2))
+    if VERBOSE:
+        print(f"\n📊 Migration result:")
+        print(json.dumps(result, indent=2))
 
-    if not result.get("success"):
-        print(f"\n❌ FAILED: Migration failed: {result.get('error')}")
-        return False
+    assert result.get("success"), f"Migration failed: {result.get('error')}"
 
     print(f"\n✓ Total vectors: {result['total_vectors']}")
     print(f"✓ Migrated: {result['migrated']}")
     print(f"✓ Skipped (already migrated): {result['skipped']}")
 
     # Verify all vectors now have enhanced metadata
-    db = _get_vector_db()
-    coll = db.get_or_create_collection("knowledge")
-    all_docs = coll.get(limit=10)  # Check first 10
+    coll = _coll()
+    all_docs = coll.get(limit=10, include=["metadatas"])  # Check first 10
 
     if not all_docs["ids"]:
         print("\n⚠️  WARNING: No vectors in collection to verify")
         print("✅ TEST 3 PASSED: Migration ran successfully!")
-        return True
+        return
 
     print(f"\n🔍 Verifying {len(all_docs['ids'])} vectors have enhanced metadata...")
 
     for i, metadata in enumerate(all_docs["metadatas"]):
-        required_fields = ["access_count", "last_accessed_ts", "related_memories", "embedding_version"]
-        missing = [f for f in required_fields if f not in metadata]
+        missing = REQUIRED_FIELDS - metadata.keys()
 
-        if missing:
-            print(f"❌ FAILED: Vector {i} missing fields: {missing}")
-            return False
+        assert not missing, f"Vector {i} missing fields: {sorted(missing)}"
 
     print(f"✓ All {len(all_docs['ids'])} checked vectors have enhanced metadata")
 
     # Test idempotency - run migration again
     print("\n⏳ Testing idempotency (running migration again)...")
-    result2 = migrate_existing_vectors_to_v2("knowledge")
+    result2 = migrate_existing_vectors_to_v2(KNOWLEDGE)
 
-    if not result2.get("success"):
-        print(f"❌ FAILED: Second migration failed")
-        return False
-
-    if result2["migrated"] != 0:
-        print(f"❌ FAILED: Second migration modified {result2['migrated']} vectors (should be 0)")
-        return False
+    assert result2.get("success"), "Second migration failed"
+    assert result2["migrated"] == 0, \
+        f"Second migration modified {result2['migrated']} vectors (should be 0)"
 
     print(f"✓ Second migration skipped all vectors (idempotent)")
 
     print("\n✅ TEST 3 PASSED: Migration works correctly and is idempotent!")
-    return True
 
 
 def test_search_still_works():
     """Test 4: Verify search functionality still works"""
-    print("\n" + "="*70)
+    print(BAR)
     print("TEST 4: Verifying search still works with enhanced metadata")
-    print("="*70)
+    print(BANNER)
 
     # Search for our test fact
     print("\n⏳ Searching for 'Phase 1 Memory Enhancement'...")
@@ -225,13 +264,9 @@ def test_search_still_works():
         top_k=5
     )
 
-    if isinstance(results, dict) and not results.get("success"):
-        print(f"❌ FAILED: Search failed: {results.get('error')}")
-        return False
-
-    if not results:
-        print("❌ FAILED: No results returned")
-        return False
+    if isinstance(results, dict):
+        assert results.get("success"), f"Search failed: {results.get('error')}"
+    assert results, "No results returned"
 
     print(f"\n✓ Search returned {len(results)} results")
 
@@ -254,43 +289,40 @@ def test_search_still_works():
             print(f"\n✓ Results include enhanced metadata")
 
     print("\n✅ TEST 4 PASSED: Search functionality works correctly!")
-    return True
 
 
 def main():
-    print("\n" + "="*70)
+    print(BAR)
     print("🚀 PHASE 1 MEMORY ENHANCEMENT TEST SUITE")
-    print("="*70)
-    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(BANNER)
+    print(f"Timestamp: {time.strftime('%Y-%m-%dT%H:%M:%S')}")
 
     try:
         # Test 1: New vector with enhanced metadata
-        result1 = test_new_vector_with_enhanced_metadata()
-        if not result1:
-            print("\n❌ Test suite FAILED at Test 1")
+        if not _passed("Test 1", test_new_vector_with_enhanced_metadata):
             return False
 
-        success, vector_id = result1
-
-        # Test 2: Track access
-        if not test_track_access(vector_id):
-            print("\n❌ Test suite FAILED at Test 2")
+        # Test 2: Track access (on its own fresh vector, like the fixture)
+        if not _passed("Test 2", test_track_access, _add_fact("Phase 1 track_access test fact")):
             return False
 
+        # Tests 3 and 4 don't depend on each other - run them side by side
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            fut_migration = ex.submit(_passed, "Test 3", test_migration)
+            fut_search = ex.submit(_passed, "Test 4", test_search_still_works)
+
         # Test 3: Migration
-        if not test_migration():
-            print("\n❌ Test suite FAILED at Test 3")
+        if not fut_migration.result():
             return False
 
         # Test 4: Search still works
-        if not test_search_still_works():
-            print("\n❌ Test suite FAILED at Test 4")
+        if not fut_search.result():
             return False
 
         # All tests passed!
-        print("\n" + "="*70)
+        print(BAR)
         print("🎉 ALL TESTS PASSED! PHASE 1 COMPLETE!")
-        print("="*70)
+        print(BANNER)
         print("\n✅ Enhanced metadata is now active")
         print("✅ track_access() method works correctly")
         print("✅ Migration utility is functional and idempotent")
@@ -14,40 +14,104 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 from tools.vector_search import (
     vector_add_knowledge,
+    vector_add_knowledge_bulk,
     vector_search_knowledge,
     _get_vector_db
 )
-from datetime import datetime
+import tools.vector_search as vector_search_module
+from core.vector_db import create_vector_db
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import json
+import time
 
+import numpy as np
+import pytest
 
-def test_automatic_tracking():
-    """Test 1: Verify automatic access tracking during searches"""
-    print("\n" + "="*70)
-    print("TEST 1: Automatic access tracking during searches")
-    print("="*70)
+# Where vector_add_knowledge/vector_search_knowledge keep private facts
+KNOWLEDGE = "knowledge_private"
 
-    # Add a test fact
-    print("\n⏳ Creating test fact...")
+# Section banners, built once
+BANNER = "=" * 70
+BAR = "\n" + BANNER
+
+# Fact text prefix for the multi-result tracking test
+PREFIX = "Phase 2 multi-track test fact "
+
+
+@lru_cache(maxsize=1)
+def _coll():
+    """The knowledge collection, looked up once and shared by every test."""
+    return _get_vector_db().get_or_create_collection(KNOWLEDGE)
+
+
+def _snapshot(coll, ids):
+    """Metadata for ids as {id: metadata}, read with a single get()."""
+    docs = coll.get(ids=ids, include=["metadatas"])
+    return dict(zip(docs["ids"], docs["metadatas"]))
+
+
+def _add_fact(fact):
+    """Add a testing fact and return its vector id."""
     result = vector_add_knowledge(
-        fact="Phase 2 automatic tracking test",
+        fact=fact,
         category="testing",
         confidence=1.0,
         source="phase2_test"
     )
 
-    if not result.get("success"):
-        print(f"❌ FAILED: Could not create test fact: {result}")
+    assert result.get("success"), f"Could not create test fact: {result}"
+
+    print(f"✓ Created test fact: {result['id']}")
+    return result["id"]
+
+
+def _passed(label, test, *args):
+    """Run one test for main(), reporting a failed check instead of raising."""
+    try:
+        test(*args)
+    except AssertionError as e:
+        print(f"❌ FAILED: {e}")
+        print(f"\n❌ Test suite FAILED at {label}")
         return False
+    return True
+
+
+# ============================================================================
+# pytest fixtures (the script entry point below uses ./sandbox/vector_db)
+# ============================================================================
+
+@pytest.fixture(scope="module", autouse=True)
+def memory_db():
+    """Run the module against a fresh in-memory Chroma instead of ./sandbox."""
+    db = create_vector_db(persist_directory=None)
+    db.reset()
+    vector_search_module._vector_db = db
+    _coll.cache_clear()
+    yield db
+    vector_search_module._vector_db = None
+    _coll.cache_clear()
+
+
+@pytest.fixture
+def vector_id():
+    """A fresh vector for Test 2, independent of Test 1."""
+    return _add_fact("Phase 2 optional tracking test")
 
-    vector_id = result["id"]
-    print(f"✓ Created test fact: {vector_id}")
+
+def test_automatic_tracking():
+    """Test 1: Verify automatic access tracking during searches"""
+    print(BAR)
+    print("TEST 1: Automatic access tracking during searches")
+    print(BANNER)
+
+    # Add a test fact
+    print("\n⏳ Creating test fact...")
+    vector_id = _add_fact("Phase 2 automatic tracking test")
 
     # Get initial access count
-    db = _get_vector_db()
-    coll = db.get_or_create_collection("knowledge")
-    docs_before = coll.get(ids=[vector_id])
-    access_count_before = docs_before["metadatas"][0]["access_count"]
+    coll = _coll()
+    access_count_before = _snapshot(coll, [vector_id])[vector_id]["access_count"]
 
     print(f"\n📊 Initial access_count: {access_count_before}")
 
@@ -59,21 +123,17 @@ def test_automatic_tracking():
         track_access=True  # Explicit, but default is True
     )
 
-    if not search_results:
-        print("❌ FAILED: No search results")
-        return False
+    assert search_results, "No search results"
 
     print(f"✓ Search returned {len(search_results)} results")
 
     # Check if access was tracked
-    docs_after = coll.get(ids=[vector_id])
-    access_count_after = docs_after["metadatas"][0]["access_count"]
+    access_count_after = _snapshot(coll, [vector_id])[vector_id]["access_count"]
 
     print(f"\n📊 After search access_count: {access_count_after}")
 
-    if access_count_after != access_count_before + 1:
-        print(f"❌ FAILED: access_count not incremented (before={access_count_before}, after={access_count_after})")
-        return False
+    assert access_count_after == access_count_before + 1, \
+        f"access_count not incremented (before={access_count_before}, after={access_count_after})"
 
     print(f"✓ access_count incremented from {access_count_before} to {access_count_after}")
 
@@ -85,30 +145,25 @@ def test_automatic_tracking():
         # track_access defaults to True
     )
 
-    docs_final = coll.get(ids=[vector_id])
-    access_count_final = docs_final["metadatas"][0]["access_count"]
+    access_count_final = _snapshot(coll, [vector_id])[vector_id]["access_count"]
 
-    if access_count_final != access_count_before + 2:
-        print(f"❌ FAILED: Second tracking didn't work (count={access_count_final})")
-        return False
+    assert access_count_final == access_count_before + 2, \
+        f"Second tracking didn't work (count={access_count_final})"
 
     print(f"✓ Second search tracked (count={access_count_final})")
 
     print("\n✅ TEST 1 PASSED: Automatic tracking works!")
-    return True, vector_id
 
 
 def test_optional_tracking(vector_id):
     """Test 2: Verify tracking can be disabled"""
-    print("\n" + "="*70)
+    print(BAR)
     print("TEST 2: Optional tracking (track_access=False)")
-    print("="*70)
+    print(BANNER)
 
     # Get current access count
-    db = _get_vector_db()
-    coll = db.get_or_create_collection("knowledge")
-    docs_before = coll.get(ids=[vector_id])
-    access_count_before = docs_before["metadatas"][0]["access_count"]
+    coll = _coll()
+    access_count_before = _snapshot(coll, [vector_id])[vector_id]["access_count"]
 
     print(f"\n📊 Current access_count: {access_count_before}")
 
@@ -120,33 +175,28 @@ def test_optional_tracking(vector_id):
         track_access=False  # Explicitly disable tracking
     )
 
-    if not search_results:
-        print("❌ FAILED: No search results")
-        return False
+    assert search_results, "No search results"
 
     print(f"✓ Search returned {len(search_results)} results")
 
     # Check that access was NOT tracked
-    docs_after = coll.get(ids=[vector_id])
-    access_count_after = docs_after["metadatas"][0]["access_count"]
+    access_count_after = _snapshot(coll, [vector_id])[vector_id]["access_count"]
 
     print(f"\n📊 After search access_count: {access_count_after}")
 
-    if access_count_after != access_count_before:
-        print(f"❌ FAILED: access_count changed when tracking was disabled (before={access_count_before}, after={access_count_after})")
-        return False
+    assert access_count_after == access_count_before, \
+        f"access_count changed when tracking was disabled (before={access_count_before}, after={access_count_after})"
 
     print(f"✓ access_count unchanged ({access_count_before}), tracking correctly disabled")
 
     print("\n✅ TEST 2 PASSED: Optional tracking works!")
-    return True
 
 
 def test_nonblocking_behavior():
     """Test 3: Verify tracking errors don't break searches"""
-    print("\n" + "="*70)
+    print(BAR)
     print("TEST 3: Non-blocking behavior (tracking errors don't break searches)")
-    print("="*70)
+    print(BANNER)
 
     # This test verifies that even if tracking fails, the search still returns results
     # We can't easily force a tracking error in the test environment, but we can
@@ -160,44 +210,38 @@ def test_nonblocking_behavior():
     )
 
     # If we get here without exceptions, non-blocking worked
-    if isinstance(search_results, list):
-        print(f"✓ Search completed successfully with {len(search_results)} results")
-        print("✓ No exceptions raised (non-blocking confirmed)")
-    else:
-        print(f"❌ FAILED: Search returned error dict: {search_results}")
-        return False
+    assert isinstance(search_results, list), f"Search returned error dict: {search_results}"
+    print(f"✓ Search completed successfully with {len(search_results)} results")
+    print("✓ No exceptions raised (non-blocking confirmed)")
 
     print("\n✅ TEST 3 PASSED: Non-blocking behavior confirmed!")
     print("   (Tracking errors are logged but don't break searches)")
-    return True
 
 
 def test_multiple_results_tracking():
     """Test 4: Verify tracking works for multiple search results"""
-    print("\n" + "="*70)
+    print(BAR)
     print("TEST 4: Tracking multiple search results")
-    print("="*70)
+    print(BANNER)
 
-    # Create multiple test facts
+    # Create multiple test facts (one embedding pass, one Chroma add)
     print("\n⏳ Creating multiple test facts...")
-    vector_ids = []
-    for i in range(3):
-        result = vector_add_knowledge(
-            fact=f"Phase 2 multi-track test fact {i+1}",
-            category="testing",
-            confidence=1.0,
-            source="phase2_multi_test"
-        )
-        if result.get("success"):
-            vector_ids.append(result["id"])
+    result = vector_add_knowledge_bulk([
+        {
+            "fact": PREFIX + str(i + 1),
+            "category": "testing",
+            "confidence": 1.0,
+            "source": "phase2_multi_test",
+        }
+        for i in range(3)
+    ])
+    vector_ids = result["ids"] if result.get("success") else []
 
     print(f"✓ Created {len(vector_ids)} test facts")
 
     # Get initial access counts
-    db = _get_vector_db()
-    coll = db.get_or_create_collection("knowledge")
-    docs_before = coll.get(ids=vector_ids)
-    counts_before = {vid: meta["access_count"] for vid, meta in zip(docs_before["ids"], docs_before["metadatas"])}
+    coll = _coll()
+    counts_before = {vid: meta["access_count"] for vid, meta in _snapshot(coll, vector_ids).items()}
 
     print(f"\n📊 Initial access counts: {counts_before}")
 
@@ -213,69 +257,64 @@ def test_multiple_results_tracking():
     if not search_results:
         print("⚠️  WARNING: No search results, but test is non-critical")
         print("✅ TEST 4 PASSED (with warning)")
-        return True
+        return
 
     print(f"✓ Search returned {len(search_results)} results")
 
     # Check that all returned results were tracked
-    docs_after = coll.get(ids=vector_ids)
-    counts_after = {vid: meta["access_count"] for vid, meta in zip(docs_after["ids"], docs_after["metadatas"])}
+    counts_after = {vid: meta["access_count"] for vid, meta in _snapshot(coll, vector_ids).items()}
 
     print(f"\n📊 After search counts: {counts_after}")
 
-    # Verify at least one was incremented
-    any_incremented = any(counts_after[vid] > counts_before[vid] for vid in vector_ids if vid in counts_after)
+    # Verify at least one was incremented (one vectorised compare over all ids)
+    before = np.fromiter((counts_before.get(vid, 0) for vid in vector_ids), dtype=np.int64, count=len(vector_ids))
+    after = np.fromiter((counts_after.get(vid, 0) for vid in vector_ids), dtype=np.int64, count=len(vector_ids))
+    incremented = after > before
 
-    if not any_incremented:
-        print("❌ FAILED: None of the results were tracked")
-        return False
+    assert incremented.any(), "None of the results were tracked"
 
     print(f"✓ At least one result was tracked")
 
     # Show which were incremented
-    for vid in vector_ids:
-        if vid in counts_after and counts_after[vid] > counts_before.get(vid, 0):
-            print(f"  • {vid[:16]}... tracked ({counts_before.get(vid, 0)} → {counts_after[vid]})")
+    for idx in np.flatnonzero(incremented):
+        print(f"  • {vector_ids[idx][:16]}... tracked ({before[idx]} → {after[idx]})")
 
     print("\n✅ TEST 4 PASSED: Multiple results tracking works!")
-    return True
 
 
 def main():
-    print("\n" + "="*70)
+    print(BAR)
     print("🚀 PHASE 2 MEMORY ENHANCEMENT TEST SUITE")
-    print("="*70)
-    print(f"Timestamp: {datetime.now().isoformat()}")
+    print(BANNER)
+    print(f"Timestamp: {time.strftime('%Y-%m-%dT%H:%M:%S')}")
     print("\nPhase 2: Access Tracking Integration")
 
     try:
         # Test 1: Automatic tracking
-        result1 = test_automatic_tracking()
-        if not result1:
-            print("\n❌ Test suite FAILED at Test 1")
+        if not _passed("Test 1", test_automatic_tracking):
             return False
 
-        success, vector_id = result1
-
-        # Test 2: Optional tracking
-        if not test_optional_tracking(vector_id):
-            print("\n❌ Test suite FAILED at Test 2")
+        # Test 2: Optional tracking (on its own fresh vector, like the fixture)
+        if not _passed("Test 2", test_optional_tracking, _add_fact("Phase 2 optional tracking test")):
             return False
 
+        # Tests 3 and 4 don't depend on each other - run them side by side
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            fut_nonblocking = ex.submit(_passed, "Test 3", test_nonblocking_behavior)
+            fut_multiple = ex.submit(_passed, "Test 4", test_multiple_results_tracking)
+
         # Test 3: Non-blocking
-        if not test_nonblocking_behavior():
-            print("\n❌ Test suite FAILED at Test 3")
+        if not fut_nonblocking.result():
             return False
 
         # Test 4: Multiple results
-        if not test_multiple_results_tracking():
-            print("\n❌ Test suite FAILED at Test 4")
+        if not fut_multiple.result():
             return False
 
         # All tests passed!
-        print("\n" + "="*70)
+        print(BAR)
         print("🎉 ALL TESTS PASSED! PHASE 2 COMPLETE!")
-        print("="*70)
+        print(BANNER)
         print("\n✅ Automatic access tracking active (default)")
         print("✅ Tracking can be disabled with track_access=False")
         print("✅ Non-blocking behavior confirmed")
@@ -16,17 +16,31 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../.
 
 from tools.vector_search import (
     vector_add_knowledge,
+    vector_add_knowledge_bulk,
     memory_health_stale,
     memory_health_low_access,
     memory_health_duplicates,
     memory_consolidate,
+    warmup,
     _get_vector_db
 )
 from tools import ALL_TOOLS
-from datetime import datetime, timedelta
-import json
+from core.vector_db import related_memory_ids
+from helpers import bulk_stale
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
 import time
 
+# Where vector_add_knowledge keeps private facts (and the health tools look)
+KNOWLEDGE = "knowledge_private"
+
+
+@lru_cache(maxsize=1)
+def _coll():
+    """The knowledge collection, looked up once and shared by every test."""
+    return _get_vector_db().get_or_create_collection(KNOWLEDGE)
+
 
 def test_tool_registration():
     """Test 0: Verify all memory health tools are registered"""
@@ -83,24 +97,17 @@ def test_stale_memory_detection():
     vector_id = result["id"]
     print(f"✓ Created test memory: {vector_id}")
 
-    # Manually set it to be old (simulate stale memory)
-    db = _get_vector_db()
-    coll = db.get_or_create_collection("knowledge")
-    docs = coll.get(ids=[vector_id])
-    metadata = docs["metadatas"][0]
-
-    # Set last_accessed_ts to 40 days ago
-    forty_days_ago = (datetime.now() - timedelta(days=40)).timestamp()
-    metadata["last_accessed_ts"] = forty_days_ago
-
-    coll.update(ids=[vector_id], metadatas=[metadata])
+    # Manually set it to be old (simulate stale memory):
+    # last_accessed_ts to 40 days ago
+    forty_days_ago = time.time() - 40 * 86400.0
+    bulk_stale(_coll(), [vector_id], forty_days_ago)
     print(f"✓ Set memory to 40 days old")
 
     # Run stale detection
     print("\n⏳ Running stale memory detection (30 day threshold)...")
     stale_result = memory_health_stale(
         days_unused=30,
-        collection="knowledge",
+        collection=KNOWLEDGE,
         limit=10
     )
 
@@ -112,15 +119,15 @@ def test_stale_memory_detection():
     print(f"  Total checked: {stale_result['total_checked']}")
     print(f"  Stale count: {stale_result['stale_count']}")
 
-    # Verify our test memory was found
-    found_our_memory = any(m["id"] == vector_id for m in stale_result["stale_memories"])
+    # Verify our test memory was found (one pass to index, then one lookup)
+    by_id = {m["id"]: m for m in stale_result["stale_memories"]}
+    our_memory = by_id.get(vector_id)
 
-    if not found_our_memory:
+    if our_memory is None:
         print(f"❌ FAILED: Our 40-day-old memory was not detected as stale")
         return False
 
     # Show details of our stale memory
-    our_memory = next(m for m in stale_result["stale_memories"] if m["id"] == vector_id)
     print(f"\n📄 Our stale memory details:")
     print(f"  Days since access: {our_memory['days_since_access']}")
     print(f"  Access count: {our_memory['access_count']}")
@@ -142,7 +149,7 @@ def test_low_access_detection(vector_id):
     low_access_result = memory_health_low_access(
         max_access_count=2,
         min_age_days=1,  # Low threshold for testing
-        collection="knowledge",
+        collection=KNOWLEDGE,
         limit=10
     )
 
@@ -180,31 +187,28 @@ def test_duplicate_detection():
     text1 = "Phase 3 duplicate test: Python is a programming language"
     text2 = "Phase 3 duplicate test: Python is a programming language used for coding"
 
-    result1 = vector_add_knowledge(
-        fact=text1,
-        category="testing",
-        confidence=1.0,
-        source="phase3_dup_test"
-    )
-
-    result2 = vector_add_knowledge(
-        fact=text2,
-        category="testing",
-        confidence=1.0,
-        source="phase3_dup_test"
-    )
+    # One embedding pass and one Chroma add for both
+    result = vector_add_knowledge_bulk([
+        {
+            "fact": text,
+            "category": "testing",
+            "confidence": 1.0,
+            "source": "phase3_dup_test",
+        }
+        for text in (text1, text2)
+    ])
 
-    if not (result1.get("success") and result2.get("success")):
+    if not result.get("success"):
         print("❌ FAILED: Could not create test memories")
         return False
 
-    id1, id2 = result1["id"], result2["id"]
+    id1, id2 = result["ids"]
     print(f"✓ Created two similar memories: {id1[:16]}... and {id2[:16]}...")
 
     # Run duplicate detection
     print("\n⏳ Running duplicate detection (threshold=0.90)...")
     dup_result = memory_health_duplicates(
-        collection="knowledge",
+        collection=KNOWLEDGE,
         similarity_threshold=0.90,  # Lower threshold for testing
         limit=10
     )
@@ -230,11 +234,9 @@ def test_duplicate_detection():
         print(f"    Text 1: {pair['text1'][:60]}...")
         print(f"    Text 2: {pair['text2'][:60]}...")
 
-    # Check if our pair was found
-    our_pair_found = any(
-        (pair["id1"] in [id1, id2] and pair["id2"] in [id1, id2])
-        for pair in dup_result["duplicate_pairs"]
-    )
+    # Check if our pair was found (pairs are unordered, so key by id set)
+    pairs_by_ids = {frozenset((pair["id1"], pair["id2"])): pair for pair in dup_result["duplicate_pairs"]}
+    our_pair_found = frozenset((id1, id2)) in pairs_by_ids
 
     if our_pair_found:
         print(f"\n✓ Our similar memories were detected as duplicates!")
@@ -263,29 +265,12 @@ def test_memory_consolidation(id1, id2):
         print("✅ TEST 4 SKIPPED (not a failure)")
         return True
 
-    # Get metadata before consolidation
-    db = _get_vector_db()
-    coll = db.get_or_create_collection("knowledge")
-    docs_before = coll.get(ids=[id1, id2])
-
-    if len(docs_before["ids"]) != 2:
-        print("⚠️  Could not retrieve both memories for consolidation")
-        print("✅ TEST 4 SKIPPED (not a failure)")
-        return True
-
-    meta1 = docs_before["metadatas"][0]
-    meta2 = docs_before["metadatas"][1]
-
-    print(f"\n📊 Before consolidation:")
-    print(f"  Memory 1: access_count={meta1.get('access_count', 0)}, confidence={meta1.get('confidence', 1.0)}")
-    print(f"  Memory 2: access_count={meta2.get('access_count', 0)}, confidence={meta2.get('confidence', 1.0)}")
-
-    # Run consolidation
+    # Run consolidation (it reports both memories' metadata from before the merge)
     print(f"\n⏳ Consolidating {id1[:16]}... and {id2[:16]}...")
     consolidate_result = memory_consolidate(
         id1=id1,
         id2=id2,
-        collection="knowledge",
+        collection=KNOWLEDGE,
         keep="higher_confidence"
     )
 
@@ -293,6 +278,12 @@ def test_memory_consolidation(id1, id2):
         print(f"❌ FAILED: Consolidation failed: {consolidate_result}")
         return False
 
+    meta1, meta2 = consolidate_result["premerge_meta"]
+
+    print(f"\n📊 Before consolidation:")
+    print(f"  Memory 1: access_count={meta1.get('access_count', 0)}, confidence={meta1.get('confidence', 1.0)}")
+    print(f"  Memory 2: access_count={meta2.get('access_count', 0)}, confidence={meta2.get('confidence', 1.0)}")
+
     print(f"\n📊 Consolidation results:")
     print(f"  Kept ID: {consolidate_result['kept_id'][:16]}...")
     print(f"  Discarded ID: {consolidate_result['discarded_id'][:16]}...")
@@ -300,7 +291,8 @@ def test_memory_consolidation(id1, id2):
     print(f"  New confidence: {consolidate_result['new_confidence']}")
 
     # Verify the discarded memory is gone
-    docs_after = coll.get(ids=[id1, id2])
+    coll = _coll()
+    docs_after = coll.get(ids=[id1, id2], include=["metadatas"])
     if len(docs_after["ids"]) != 1:
         print(f"❌ FAILED: Expected 1 memory after consolidation, got {len(docs_after['ids'])}")
         return False
@@ -318,14 +310,40 @@ def test_memory_consolidation(id1, id2):
     else:
         print(f"✓ Access counts combined correctly: {kept_meta['access_count']}")
 
-    # Check related_memories
-    related = json.loads(kept_meta.get("related_memories", "[]"))
+    # Check related_memories (decoded through the shared cached decoder)
+    related = related_memory_ids(kept_meta)
     print(f"✓ Related memories list: {len(related)} entries")
 
     print("\n✅ TEST 4 PASSED: Memory consolidation works!")
     return True
 
 
+def _stale_chain():
+    """Tests 1 and 2; returns the failing test's name, or None."""
+    result1 = test_stale_memory_detection()
+    if not result1:
+        return "Test 1"
+
+    success, vector_id = result1
+
+    if not test_low_access_detection(vector_id):
+        return "Test 2"
+    return None
+
+
+def _duplicate_chain():
+    """Tests 3 and 4; returns the failing test's name, or None."""
+    result3 = test_duplicate_detection()
+    if not result3:
+        return "Test 3"
+
+    success, dup_id1, dup_id2 = result3
+
+    if not test_memory_consolidation(dup_id1, dup_id2):
+        return "Test 4"
+    return None
+
+
 def main():
     print("\n" + "="*70)
     print("🚀 PHASE 3 MEMORY ENHANCEMENT TEST SUITE")
@@ -334,37 +352,27 @@ def main():
     print("\nPhase 3: Memory Health API")
     print("Testing: Stale detection, Low-access, Duplicates, Consolidation")
 
+    # Load the embedding model now, not inside Test 1 or the parallel chains
+    print("\n⏳ Warming up vector database and embedding model...")
+    if not warmup():
+        print("⚠️  WARNING: Warmup failed, tests will load the model on first use")
+
     try:
         # Test 0: Tool registration
         if not test_tool_registration():
             print("\n❌ Test suite FAILED at Test 0")
             return False
 
-        # Test 1: Stale detection
-        result1 = test_stale_memory_detection()
-        if not result1:
-            print("\n❌ Test suite FAILED at Test 1")
-            return False
-
-        success, vector_id = result1
+        # Tests 1→2 and 3→4 are independent chains - run them side by side
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            fut_stale = ex.submit(_stale_chain)
+            fut_duplicates = ex.submit(_duplicate_chain)
 
-        # Test 2: Low-access detection
-        if not test_low_access_detection(vector_id):
-            print("\n❌ Test suite FAILED at Test 2")
-            return False
-
-        # Test 3: Duplicate detection
-        result3 = test_duplicate_detection()
-        if not result3:
-            print("\n❌ Test suite FAILED at Test 3")
-            return False
-
-        success, dup_id1, dup_id2 = result3
-
-        # Test 4: Consolidation
-        if not test_memory_consolidation(dup_id1, dup_id2):
-            print("\n❌ Test suite FAILED at Test 4")
-            return False
+        for fut in (fut_stale, fut_duplicates):
+            failed_at = fut.result()
+            if failed_at:
+                print(f"\n❌ Test suite FAILED at {failed_at}")
+                return False
 
         # All tests passed!
         print("\n" + "="*70)
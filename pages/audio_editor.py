@@ -27,9 +27,15 @@ from tools.audio_editor import (
     audio_speed,
     audio_reverse,
     audio_list_files,
-    audio_get_waveform,
+    audio_get_waveform_levels,
+    _peak_envelope,
+    AUDIO_EXTENSIONS,
 )
 
+# Most waveform points handed to the chart - roughly its pixel width; more
+# only grows the Vega-Lite payload without adding visible detail
+WAVEFORM_MAX_POINTS = 1200
+
 # Page config
 st.set_page_config(
     page_title="Audio Editor",
@@ -88,33 +94,403 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-def render_waveform(waveform_data: list, duration: float, start_pct: float = 0, end_pct: float = 100):
-    """Render waveform using Streamlit's bar chart with selection overlay"""
-    import pandas as pd
+def _waveform_chart(waveform_levels, duration: float, start_pct: float, end_pct: float):
+    """
+    Altair area chart of start_pct-end_pct of the file (None without data).
+
+    waveform_levels is a peak mipmap (coarse to fine, see audio_get_waveform_levels)
+    or a single peak array. The coarsest level that still fills the chart across
+    the visible window is drawn, so zooming in never needs a re-decode.
+    """
+    import altair as alt
+    import numpy as np
+    import pyarrow as pa
+
+    if waveform_levels is None or len(waveform_levels) == 0:
+        return None
+
+    if np.ndim(waveform_levels[0]) == 0:
+        waveform_levels = [waveform_levels]
+
+    # Pick the level whose resolution matches the visible window
+    span = max(end_pct - start_pct, 0) / 100
+    for level in waveform_levels:
+        if len(level) * span >= WAVEFORM_MAX_POINTS:
+            break
+    level_size = len(level)
+    lo = min(int(level_size * start_pct / 100), level_size - 1)
+    hi = max(int(np.ceil(level_size * end_pct / 100)), lo + 1)
+
+    # Never send the chart more points than it has pixels to draw them on
+    peaks = np.asarray(level[lo:hi], dtype=np.float32)
+    if len(peaks) > WAVEFORM_MAX_POINTS:
+        peaks = _peak_envelope(peaks, -(-len(peaks) // WAVEFORM_MAX_POINTS))
+
+    # Time axis for the visible window
+    window_start = duration * lo / level_size
+    window_end = duration * min(hi, level_size) / level_size
+    time_points = np.linspace(window_start, window_end, len(peaks), endpoint=False, dtype=np.float32)
+
+    # Arrow table straight from the NumPy buffers - no DataFrame in between
+    table = pa.table({'t': time_points, 'a': peaks})
+
+    return alt.Chart(table).mark_area().encode(
+        x=alt.X('t:Q', title='Time (s)'),
+        y=alt.Y('a:Q', title='Amplitude'),
+    ).properties(height=150)
+
+
+def render_waveform(waveform_levels, duration: float, start_pct: float = 0, end_pct: float = 100,
+                    cache_key=None):
+    """
+    Render waveform as an Altair area chart, showing start_pct-end_pct of the file.
+
+    With a cache_key (e.g. file path, mtime and zoom window), the chart built
+    for that key is kept in session state and reused on later reruns instead
+    of being rebuilt.
+    """
+    if cache_key is not None and st.session_state.get('waveform_sig') == cache_key:
+        chart = st.session_state.waveform_chart
+    else:
+        chart = _waveform_chart(waveform_levels, duration, start_pct, end_pct)
+        if cache_key is not None:
+            st.session_state.waveform_sig = cache_key
+            st.session_state.waveform_chart = chart
 
-    if not waveform_data:
+    if chart is None:
         st.warning("No waveform data available")
         return
 
-    # Create dataframe for visualization
-    num_points = len(waveform_data)
-    time_points = [i * duration / num_points for i in range(num_points)]
+    st.altair_chart(chart, use_container_width=True)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _load_info(file_path: str, mtime: float) -> dict:
+    """audio_info, memoized per file version (mtime is part of the key)."""
+    return audio_info(file_path)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_waveform(file_path: str, mtime: float) -> dict:
+    """audio_get_waveform_levels, memoized per file version (mtime is part of the key)."""
+    return audio_get_waveform_levels(file_path)
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def _listing_cached(folder: str, dir_mtime: float) -> dict:
+    """
+    audio_list_files, memoized per folder version.
+
+    Adding, removing or renaming a file bumps the folder's mtime; the TTL
+    picks up files rewritten in place, which don't.
+    """
+    return audio_list_files(folder)
+
+
+def _count_files(folder: str) -> int:
+    """Number of audio files in folder, from the directory read alone (no per-file stat)."""
+    try:
+        with os.scandir(folder) as entries:
+            return sum(
+                1 for e in entries
+                if e.is_file() and Path(e.name).suffix.lower() in AUDIO_EXTENSIONS
+            )
+    except OSError:
+        return 0
+
+
+def _mtime(file_path: str) -> float:
+    """Modification time for cache keys (0 if the path doesn't resolve here)."""
+    try:
+        return os.path.getmtime(file_path)
+    except OSError:
+        return 0.0
 
-    # Create chart data
-    df = pd.DataFrame({
-        'Time (s)': time_points,
-        'Amplitude': waveform_data
-    })
 
-    # Use area chart for waveform visualization
-    st.area_chart(df.set_index('Time (s)'), height=150, use_container_width=True)
+def format_times(seconds) -> "np.ndarray":
+    """Format an array of seconds as MM:SS.mmm strings in one vectorized pass"""
+    import numpy as np
+
+    mins, secs = np.divmod(np.asarray(seconds, dtype=np.float64), 60)
+    return np.char.add(np.char.mod('%d:', mins.astype(np.int64)), np.char.mod('%05.2f', secs))
 
 
 def format_time(seconds: float) -> str:
     """Format seconds as MM:SS.mmm"""
-    mins = int(seconds // 60)
-    secs = seconds % 60
-    return f"{mins}:{secs:05.2f}"
+    return str(format_times(seconds))
+
+
+@st.fragment
+def _trim_tab(file_path: str, info: dict):
+    """Trim tab body."""
+    st.markdown("### Trim Audio")
+    st.caption("Cut audio to specific start and end times")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        start_time = st.number_input(
+            "Start Time (seconds)",
+            min_value=0.0,
+            max_value=float(info['duration_seconds']),
+            value=0.0,
+            step=0.1,
+            key="trim_start"
+        )
+    with col2:
+        end_time = st.number_input(
+            "End Time (seconds)",
+            min_value=0.0,
+            max_value=float(info['duration_seconds']),
+            value=min(5.0, float(info['duration_seconds'])),
+            step=0.1,
+            key="trim_end"
+        )
+
+    # Preview duration
+    trim_duration = end_time - start_time
+    st.info(f"Output duration: {format_time(trim_duration)} ({trim_duration:.2f}s)")
+
+    # Quick presets
+    st.markdown("**Quick Presets:**")
+    preset_cols = st.columns(5)
+    with preset_cols[0]:
+        if st.button("3s SFX", use_container_width=True):
+            st.session_state.trim_end = min(3.0, info['duration_seconds'])
+            st.rerun()
+    with preset_cols[1]:
+        if st.button("5s SFX", use_container_width=True):
+            st.session_state.trim_end = min(5.0, info['duration_seconds'])
+            st.rerun()
+    with preset_cols[2]:
+        if st.button("10s Clip", use_container_width=True):
+            st.session_state.trim_end = min(10.0, info['duration_seconds'])
+            st.rerun()
+    with preset_cols[3]:
+        if st.button("30s Loop", use_container_width=True):
+            st.session_state.trim_end = min(30.0, info['duration_seconds'])
+            st.rerun()
+    with preset_cols[4]:
+        if st.button("First Half", use_container_width=True):
+            st.session_state.trim_end = info['duration_seconds'] / 2
+            st.rerun()
+
+    if st.button("✂️ Trim Audio", type="primary", use_container_width=True):
+        with st.spinner("Trimming..."):
+            result = audio_trim(file_path, start=start_time, end=end_time)
+            if result['success']:
+                st.success(f"✅ Trimmed! Saved to: `{result['output_file']}`")
+                st.session_state.last_output = result['output_file']
+                st.audio(result['output_file'])
+            else:
+                st.error(f"Failed: {result['error']}")
+
+
+@st.fragment
+def _fade_tab(file_path: str):
+    """Fade tab body."""
+    st.markdown("### Fade In/Out")
+    st.caption("Add smooth fade transitions")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fade_in = st.slider(
+            "Fade In (ms)",
+            min_value=0,
+            max_value=5000,
+            value=100,
+            step=50,
+            key="fade_in"
+        )
+    with col2:
+        fade_out = st.slider(
+            "Fade Out (ms)",
+            min_value=0,
+            max_value=5000,
+            value=500,
+            step=50,
+            key="fade_out"
+        )
+
+    if st.button("📈 Apply Fades", type="primary", use_container_width=True):
+        with st.spinner("Applying fades..."):
+            result = audio_fade(file_path, fade_in_ms=fade_in, fade_out_ms=fade_out)
+            if result['success']:
+                st.success(f"✅ Fades applied! Saved to: `{result['output_file']}`")
+                st.session_state.last_output = result['output_file']
+                st.audio(result['output_file'])
+            else:
+                st.error(f"Failed: {result['error']}")
+
+
+@st.fragment
+def _normalize_tab(file_path: str, info: dict):
+    """Normalize tab body."""
+    st.markdown("### Normalize Volume")
+    st.caption("Adjust audio to a consistent volume level")
+
+    current_vol = info['dbfs']
+    st.info(f"Current volume: **{current_vol} dBFS**")
+
+    target_dbfs = st.slider(
+        "Target Volume (dBFS)",
+        min_value=-30.0,
+        max_value=0.0,
+        value=-14.0,
+        step=0.5,
+        help="-14 dBFS is broadcast standard, -12 is louder"
+    )
+
+    gain = target_dbfs - current_vol
+    if gain > 0:
+        st.caption(f"Will boost by +{gain:.1f} dB")
+    else:
+        st.caption(f"Will reduce by {gain:.1f} dB")
+
+    # Presets
+    st.markdown("**Presets:**")
+    preset_cols = st.columns(4)
+    with preset_cols[0]:
+        if st.button("Quiet (-20)", use_container_width=True):
+            st.session_state.target_vol = -20.0
+    with preset_cols[1]:
+        if st.button("Broadcast (-14)", use_container_width=True):
+            st.session_state.target_vol = -14.0
+    with preset_cols[2]:
+        if st.button("Loud (-10)", use_container_width=True):
+            st.session_state.target_vol = -10.0
+    with preset_cols[3]:
+        if st.button("Max (-3)", use_container_width=True):
+            st.session_state.target_vol = -3.0
+
+    if st.button("🔊 Normalize", type="primary", use_container_width=True):
+        with st.spinner("Normalizing..."):
+            result = audio_normalize(file_path, target_dbfs=target_dbfs)
+            if result['success']:
+                st.success(f"✅ Normalized! {result['original_dbfs']} → {result['final_dbfs']} dBFS")
+                st.session_state.last_output = result['output_file']
+                st.audio(result['output_file'])
+            else:
+                st.error(f"Failed: {result['error']}")
+
+
+@st.fragment
+def _loop_speed_tab(file_path: str, info: dict):
+    """Loop/Speed tab body."""
+    st.markdown("### Loop & Speed")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("#### 🔄 Create Loop")
+        loop_count = st.number_input(
+            "Loop Count",
+            min_value=2,
+            max_value=10,
+            value=2,
+            help="Number of repetitions"
+        )
+        crossfade = st.slider(
+            "Crossfade (ms)",
+            min_value=0,
+            max_value=2000,
+            value=200,
+            step=50,
+            help="Overlap between loops for seamless transition"
+        )
+
+        estimated_duration = info['duration_seconds'] * loop_count - (crossfade/1000 * (loop_count-1))
+        st.caption(f"Estimated output: {format_time(estimated_duration)}")
+
+        if st.button("🔄 Create Loop", type="primary", use_container_width=True):
+            with st.spinner("Creating loop..."):
+                result = audio_loop(file_path, loop_count=loop_count, crossfade_ms=crossfade)
+                if result['success']:
+                    st.success(f"✅ Loop created! Duration: {result['looped_duration_formatted']}")
+                    st.session_state.last_output = result['output_file']
+                    st.audio(result['output_file'])
+                else:
+                    st.error(f"Failed: {result['error']}")
+
+    with col2:
+        st.markdown("#### ⏩ Change Speed")
+        speed_factor = st.slider(
+            "Speed Factor",
+            min_value=0.5,
+            max_value=2.0,
+            value=1.0,
+            step=0.1,
+            help="0.5 = half speed, 2.0 = double speed"
+        )
+        preserve_pitch = st.checkbox("Preserve Pitch", value=True,
+            help="Keep pitch the same (time stretch) vs. chipmunk/slow-mo effect")
+
+        new_duration = info['duration_seconds'] / speed_factor
+        st.caption(f"New duration: {format_time(new_duration)}")
+
+        if st.button("⏩ Change Speed", type="primary", use_container_width=True):
+            with st.spinner("Processing..."):
+                result = audio_speed(file_path, speed_factor=speed_factor, preserve_pitch=preserve_pitch)
+                if result['success']:
+                    st.success(f"✅ Speed changed!")
+                    st.session_state.last_output = result['output_file']
+                    st.audio(result['output_file'])
+                else:
+                    st.error(f"Failed: {result['error']}")
+
+        st.divider()
+
+        st.markdown("#### 🔀 Reverse")
+        if st.button("🔀 Reverse Audio", use_container_width=True):
+            with st.spinner("Reversing..."):
+                result = audio_reverse(file_path)
+                if result['success']:
+                    st.success(f"✅ Reversed!")
+                    st.session_state.last_output = result['output_file']
+                    st.audio(result['output_file'])
+                else:
+                    st.error(f"Failed: {result['error']}")
+
+
+@st.fragment
+def _batch_tab(files: list, folder_path: str):
+    """Batch tab body."""
+    st.markdown("### Batch Processing")
+    st.caption("Process multiple files at once (coming soon)")
+
+    st.info("🚧 Batch processing UI coming soon! For now, use the tools programmatically:\n\n```python\nfrom tools.audio_editor import audio_trim, audio_normalize\n\nfiles = ['file1.mp3', 'file2.mp3']\nfor f in files:\n    audio_trim(f, start=0, end=5)\n```")
+
+    # Concatenate section
+    st.markdown("#### 🔗 Concatenate Files")
+    st.caption("Combine multiple audio files into one")
+
+    concat_files = st.multiselect(
+        "Select files to concatenate (in order)",
+        options=[f['name'] for f in files],
+        key="concat_files"
+    )
+
+    if len(concat_files) >= 2:
+        concat_crossfade = st.slider(
+            "Crossfade between files (ms)",
+            min_value=0,
+            max_value=2000,
+            value=100,
+            key="concat_crossfade"
+        )
+
+        if st.button("🔗 Concatenate", type="primary"):
+            with st.spinner("Concatenating..."):
+                # Resolve full paths
+                full_paths = [str(Path(folder_path) / f) for f in concat_files]
+                result = audio_concat(full_paths, crossfade_ms=concat_crossfade)
+                if result['success']:
+                    st.success(f"✅ Concatenated {len(concat_files)} files!")
+                    st.session_state.last_output = result['output_file']
+                    st.audio(result['output_file'])
+                else:
+                    st.error(f"Failed: {result['error']}")
+    else:
+        st.caption("Select at least 2 files to concatenate")
 
 
 def main():
@@ -124,10 +500,6 @@ def main():
     # Initialize session state
     if 'selected_file' not in st.session_state:
         st.session_state.selected_file = None
-    if 'audio_info' not in st.session_state:
-        st.session_state.audio_info = None
-    if 'waveform' not in st.session_state:
-        st.session_state.waveform = None
     if 'last_output' not in st.session_state:
         st.session_state.last_output = None
 
@@ -149,10 +521,11 @@ def main():
 
         # Refresh button
         if st.button("🔄 Refresh", use_container_width=True):
+            _listing_cached.clear()
             st.rerun()
 
         # File list
-        files_result = audio_list_files(folder_path)
+        files_result = _listing_cached(folder_path, _mtime(folder_path))
         if files_result['success'] and files_result['files']:
             st.caption(f"{files_result['count']} files")
 
@@ -168,9 +541,6 @@ def main():
                         help=f"{f['name']} ({f['size_mb']}MB)"
                     ):
                         st.session_state.selected_file = f['path']
-                        st.session_state.audio_info = None
-                        st.session_state.waveform = None
-                        st.rerun()
                 with col2:
                     st.caption(f"{f['size_mb']}MB")
         else:
@@ -182,24 +552,17 @@ def main():
             st.subheader("📤 Last Output")
             if st.button("Load Last Output", use_container_width=True):
                 st.session_state.selected_file = st.session_state.last_output
-                st.session_state.audio_info = None
-                st.session_state.waveform = None
-                st.rerun()
 
     # Main content
     if st.session_state.selected_file:
         file_path = st.session_state.selected_file
 
-        # Load audio info if not cached
-        if st.session_state.audio_info is None:
-            with st.spinner("Loading audio..."):
-                st.session_state.audio_info = audio_info(file_path)
-                wf = audio_get_waveform(file_path, num_points=300)
-                if wf['success']:
-                    st.session_state.waveform = wf
-
-        info = st.session_state.audio_info
-        waveform = st.session_state.waveform
+        # Info and waveform are cached per file version, so switching back
+        # to a file opened earlier doesn't decode it again
+        with st.spinner("Loading audio..."):
+            mtime = _mtime(file_path)
+            info = _load_info(file_path, mtime)
+            waveform = _cached_waveform(file_path, mtime)
 
         if not info.get('success'):
             st.error(f"Failed to load audio: {info.get('error')}")
@@ -233,7 +596,16 @@ def main():
         # Waveform visualization
         if waveform and waveform.get('success'):
             st.markdown("#### Waveform")
-            render_waveform(waveform['waveform'], info['duration_seconds'])
+            duration = info['duration_seconds']
+            start_pct, end_pct = 0, 100
+            if st.checkbox("🔍 Zoom to trim selection", key="waveform_zoom") and duration > 0:
+                trim_start = st.session_state.get('trim_start', 0.0)
+                trim_end = st.session_state.get('trim_end', duration)
+                if trim_end > trim_start:
+                    start_pct = 100 * trim_start / duration
+                    end_pct = 100 * min(trim_end, duration) / duration
+            render_waveform(waveform['levels'], duration, start_pct, end_pct,
+                            cache_key=(file_path, mtime, start_pct, end_pct))
 
         st.divider()
 
@@ -247,262 +619,19 @@ def main():
         ])
 
         with tab1:
-            st.markdown("### Trim Audio")
-            st.caption("Cut audio to specific start and end times")
-
-            col1, col2 = st.columns(2)
-            with col1:
-                start_time = st.number_input(
-                    "Start Time (seconds)",
-                    min_value=0.0,
-                    max_value=float(info['duration_seconds']),
-                    value=0.0,
-                    step=0.1,
-                    key="trim_start"
-                )
-            with col2:
-                end_time = st.number_input(
-                    "End Time (seconds)",
-                    min_value=0.0,
-                    max_value=float(info['duration_seconds']),
-                    value=min(5.0, float(info['duration_seconds'])),
-                    step=0.1,
-                    key="trim_end"
-                )
-
-            # Preview duration
-            trim_duration = end_time - start_time
-            st.info(f"Output duration: {format_time(trim_duration)} ({trim_duration:.2f}s)")
-
-            # Quick presets
-            st.markdown("**Quick Presets:**")
-            preset_cols = st.columns(5)
-            with preset_cols[0]:
-                if st.button("3s SFX", use_container_width=True):
-                    st.session_state.trim_end = min(3.0, info['duration_seconds'])
-                    st.rerun()
-            with preset_cols[1]:
-                if st.button("5s SFX", use_container_width=True):
-                    st.session_state.trim_end = min(5.0, info['duration_seconds'])
-                    st.rerun()
-            with preset_cols[2]:
-                if st.button("10s Clip", use_container_width=True):
-                    st.session_state.trim_end = min(10.0, info['duration_seconds'])
-                    st.rerun()
-            with preset_cols[3]:
-                if st.button("30s Loop", use_container_width=True):
-                    st.session_state.trim_end = min(30.0, info['duration_seconds'])
-                    st.rerun()
-            with preset_cols[4]:
-                if st.button("First Half", use_container_width=True):
-                    st.session_state.trim_end = info['duration_seconds'] / 2
-                    st.rerun()
-
-            if st.button("✂️ Trim Audio", type="primary", use_container_width=True):
-                with st.spinner("Trimming..."):
-                    result = audio_trim(file_path, start=start_time, end=end_time)
-                    if result['success']:
-                        st.success(f"✅ Trimmed! Saved to: `{result['output_file']}`")
-                        st.session_state.last_output = result['output_file']
-                        st.audio(result['output_file'])
-                    else:
-                        st.error(f"Failed: {result['error']}")
+            _trim_tab(file_path, info)
 
         with tab2:
-            st.markdown("### Fade In/Out")
-            st.caption("Add smooth fade transitions")
-
-            col1, col2 = st.columns(2)
-            with col1:
-                fade_in = st.slider(
-                    "Fade In (ms)",
-                    min_value=0,
-                    max_value=5000,
-                    value=100,
-                    step=50,
-                    key="fade_in"
-                )
-            with col2:
-                fade_out = st.slider(
-                    "Fade Out (ms)",
-                    min_value=0,
-                    max_value=5000,
-                    value=500,
-                    step=50,
-                    key="fade_out"
-                )
-
-            if st.button("📈 Apply Fades", type="primary", use_container_width=True):
-                with st.spinner("Applying fades..."):
-                    result = audio_fade(file_path, fade_in_ms=fade_in, fade_out_ms=fade_out)
-                    if result['success']:
-                        st.success(f"✅ Fades applied! Saved to: `{result['output_file']}`")
-                        st.session_state.last_output = result['output_file']
-                        st.audio(result['output_file'])
-                    else:
-                        st.error(f"Failed: {result['error']}")
+            _fade_tab(file_path)
 
         with tab3:
-            st.markdown("### Normalize Volume")
-            st.caption("Adjust audio to a consistent volume level")
-
-            current_vol = info['dbfs']
-            st.info(f"Current volume: **{current_vol} dBFS**")
-
-            target_dbfs = st.slider(
-                "Target Volume (dBFS)",
-                min_value=-30.0,
-                max_value=0.0,
-                value=-14.0,
-                step=0.5,
-                help="-14 dBFS is broadcast standard, -12 is louder"
-            )
-
-            gain = target_dbfs - current_vol
-            if gain > 0:
-                st.caption(f"Will boost by +{gain:.1f} dB")
-            else:
-                st.caption(f"Will reduce by {gain:.1f} dB")
-
-            # Presets
-            st.markdown("**Presets:**")
-            preset_cols = st.columns(4)
-            with preset_cols[0]:
-                if st.button("Quiet (-20)", use_container_width=True):
-                    st.session_state.target_vol = -20.0
-            with preset_cols[1]:
-                if st.button("Broadcast (-14)", use_container_width=True):
-                    st.session_state.target_vol = -14.0
-            with preset_cols[2]:
-                if st.button("Loud (-10)", use_container_width=True):
-                    st.session_state.target_vol = -10.0
-            with preset_cols[3]:
-                if st.button("Max (-3)", use_container_width=True):
-                    st.session_state.target_vol = -3.0
-
-            if st.button("🔊 Normalize", type="primary", use_container_width=True):
-                with st.spinner("Normalizing..."):
-                    result = audio_normalize(file_path, target_dbfs=target_dbfs)
-                    if result['success']:
-                        st.success(f"✅ Normalized! {result['original_dbfs']} → {result['final_dbfs']} dBFS")
-                        st.session_state.last_output = result['output_file']
-                        st.audio(result['output_file'])
-                    else:
-                        st.error(f"Failed: {result['error']}")
+            _normalize_tab(file_path, info)
 
         with tab4:
-            st.markdown("### Loop & Speed")
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.markdown("#### 🔄 Create Loop")
-                loop_count = st.number_input(
-                    "Loop Count",
-                    min_value=2,
-                    max_value=10,
-                    value=2,
-                    help="Number of repetitions"
-                )
-                crossfade = st.slider(
-                    "Crossfade (ms)",
-                    min_value=0,
-                    max_value=2000,
-                    value=200,
-                    step=50,
-                    help="Overlap between loops for seamless transition"
-                )
-
-                estimated_duration = info['duration_seconds'] * loop_count - (crossfade/1000 * (loop_count-1))
-                st.caption(f"Estimated output: {format_time(estimated_duration)}")
-
-                if st.button("🔄 Create Loop", type="primary", use_container_width=True):
-                    with st.spinner("Creating loop..."):
-                        result = audio_loop(file_path, loop_count=loop_count, crossfade_ms=crossfade)
-                        if result['success']:
-                            st.success(f"✅ Loop created! Duration: {result['looped_duration_formatted']}")
-                            st.session_state.last_output = result['output_file']
-                            st.audio(result['output_file'])
-                        else:
-                            st.error(f"Failed: {result['error']}")
-
-            with col2:
-                st.markdown("#### ⏩ Change Speed")
-                speed_factor = st.slider(
-                    "Speed Factor",
-                    min_value=0.5,
-                    max_value=2.0,
-                    value=1.0,
-                    step=0.1,
-                    help="0.5 = half speed, 2.0 = double speed"
-                )
-                preserve_pitch = st.checkbox("Preserve Pitch", value=True,
-                    help="Keep pitch the same (time stretch) vs. chipmunk/slow-mo effect")
-
-                new_duration = info['duration_seconds'] / speed_factor
-                st.caption(f"New duration: {format_time(new_duration)}")
-
-                if st.button("⏩ Change Speed", type="primary", use_container_width=True):
-                    with st.spinner("Processing..."):
-                        result = audio_speed(file_path, speed_factor=speed_factor, preserve_pitch=preserve_pitch)
-                        if result['success']:
-                            st.success(f"✅ Speed changed!")
-                            st.session_state.last_output = result['output_file']
-                            st.audio(result['output_file'])
-                        else:
-                            st.error(f"Failed: {result['error']}")
-
-                st.divider()
-
-                st.markdown("#### 🔀 Reverse")
-                if st.button("🔀 Reverse Audio", use_container_width=True):
-                    with st.spinner("Reversing..."):
-                        result = audio_reverse(file_path)
-                        if result['success']:
-                            st.success(f"✅ Reversed!")
-                            st.session_state.last_output = result['output_file']
-                            st.audio(result['output_file'])
-                        else:
-                            st.error(f"Failed: {result['error']}")
+            _loop_speed_tab(file_path, info)
 
         with tab5:
-            st.markdown("### Batch Processing")
-            st.caption("Process multiple files at once (coming soon)")
-
-            st.info("🚧 Batch processing UI coming soon! For now, use the tools programmatically:\n\n```python\nfrom tools.audio_editor import audio_trim, audio_normalize\n\nfiles = ['file1.mp3', 'file2.mp3']\nfor f in files:\n    audio_trim(f, start=0, end=5)\n```")
-
-            # Concatenate section
-            st.markdown("#### 🔗 Concatenate Files")
-            st.caption("Combine multiple audio files into one")
-
-            concat_files = st.multiselect(
-                "Select files to concatenate (in order)",
-                options=[f['name'] for f in files_result.get('files', [])],
-                key="concat_files"
-            )
-
-            if len(concat_files) >= 2:
-                concat_crossfade = st.slider(
-                    "Crossfade between files (ms)",
-                    min_value=0,
-                    max_value=2000,
-                    value=100,
-                    key="concat_crossfade"
-                )
-
-                if st.button("🔗 Concatenate", type="primary"):
-                    with st.spinner("Concatenating..."):
-                        # Resolve full paths
-                        full_paths = [str(Path(folder_path) / f) for f in concat_files]
-                        result = audio_concat(full_paths, crossfade_ms=concat_crossfade)
-                        if result['success']:
-                            st.success(f"✅ Concatenated {len(concat_files)} files!")
-                            st.session_state.last_output = result['output_file']
-                            st.audio(result['output_file'])
-                        else:
-                            st.error(f"Failed: {result['error']}")
-            else:
-                st.caption("Select at least 2 files to concatenate")
+            _batch_tab(files_result.get('files', []), folder_path)
 
     else:
         # No file selected
@@ -510,14 +639,15 @@ def main():
 
         # Quick stats
         st.markdown("### 📊 Library Stats")
-        music_files = audio_list_files("sandbox/music")
-        edited_files = audio_list_files("sandbox/music/edited")
+        # The library listing also feeds Village Sounds below; edited files
+        # only need a count
+        music_files = _listing_cached("sandbox/music", _mtime("sandbox/music"))
 
         col1, col2 = st.columns(2)
         with col1:
             st.metric("Music Library", f"{music_files.get('count', 0)} files")
         with col2:
-            st.metric("Edited Files", f"{edited_files.get('count', 0)} files")
+            st.metric("Edited Files", f"{_count_files('sandbox/music/edited')} files")
 
         # Recent Village sounds
         if music_files.get('success'):
@@ -532,6 +662,7 @@ def main():
                         st.caption(f"{f['size_mb']}MB")
                     with col3:
                         if st.button("Edit", key=f"quick_{f['name']}"):
+                            # The editor body has already been skipped this run
                             st.session_state.selected_file = f['path']
                             st.rerun()
 
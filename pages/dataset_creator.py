@@ -10,30 +10,36 @@ Storage: sandbox/datasets/{dataset_name}/
 
 import streamlit as st
 import os
+import sys
 import json
 import tempfile
+import threading
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import Optional
 
-from pypdf import PdfReader
-import docx2txt
-from bs4 import BeautifulSoup
-from sentence_transformers import SentenceTransformer
-import chromadb
-from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
-
-# Optional OCR support
 try:
-    import ocrmypdf
-    HAS_OCR = True
+    import orjson
 except ImportError:
-    HAS_OCR = False
+    orjson = None
+
+# Document parsers, chromadb and the embedding model (which pulls in torch)
+# are imported inside the functions that use them, so the page renders
+# without paying for them up front (tools.datasets does the same).
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.datasets import EMBED_BATCH_SIZE, HAS_OCR, embed_chunks, extract_text_from_file
 
 
 # Constants
 DATASETS_PATH = Path("sandbox/datasets")
 METADATA_FILE = "dataset_meta.json"
+INDEX_FILE = ".index.json"  # all datasets' metadata by name (see save_dataset_metadata)
+
+# OCR processes per document; documents themselves are extracted in parallel
+OCR_JOBS = 2
 
 # Embedding model options (Pi-5 friendly)
 MODEL_OPTIONS = {
@@ -44,28 +50,131 @@ MODEL_OPTIONS = {
 }
 
 
+@st.cache_resource(show_spinner=False)
+def _client(path: str):
+    """One PersistentClient per dataset directory, shared across reruns."""
+    import chromadb
+    return chromadb.PersistentClient(path=path)
+
+
+@st.cache_resource(show_spinner=False)
+def _embedding_function(model_name: str):
+    """
+    Chroma embedding function for model_name, loaded once per process.
+
+    Its SentenceTransformer is also what embed_chunks encodes with, so
+    building and searching datasets share one copy of the weights. On a
+    GPU the model is switched to half precision here, once.
+    """
+    import torch
+    from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    embedding_function = SentenceTransformerEmbeddingFunction(model_name=model_name, device=device)
+    if device == "cuda":
+        embedding_function._model.half()
+    return embedding_function
+
+
+def _read_json(path: Path):
+    """Parse a JSON file (orjson when available)."""
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _dump_json(obj) -> bytes:
+    """obj as indented JSON bytes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+
+def _write_json(path: Path, obj):
+    """Write obj as indented JSON."""
+    path.write_bytes(_dump_json(obj))
+
+
+@st.cache_resource(show_spinner=False)
+def _index_lock() -> threading.Lock:
+    """Serializes index updates across the sessions of this process."""
+    return threading.Lock()
+
+
+@st.cache_data(ttl=5, show_spinner=False)
+def _load_index(mtime: float) -> Optional[dict]:
+    """Dataset metadata index, memoized per file version (None if unreadable)."""
+    try:
+        return _read_json(DATASETS_PATH / INDEX_FILE)
+    except (OSError, ValueError):
+        return None
+
+
+def _update_index(name: str, metadata: Optional[dict], mtime_ns: int = 0):
+    """
+    Set a dataset's index entry (None removes it); written atomically.
+
+    mtime_ns is the st_mtime_ns of the dataset's METADATA_FILE that
+    metadata was written to; get_datasets only trusts an entry while the
+    file still has it.
+    """
+    index_path = DATASETS_PATH / INDEX_FILE
+    with _index_lock():
+        try:
+            index = _read_json(index_path)
+        except (OSError, ValueError):
+            index = {}
+
+        if metadata is None:
+            index.pop(name, None)
+        else:
+            index[name] = {"mtime_ns": mtime_ns, "meta": metadata}
+
+        with tempfile.NamedTemporaryFile(
+            dir=DATASETS_PATH, prefix=INDEX_FILE, suffix=".tmp", delete=False
+        ) as tmp:
+            tmp.write(_dump_json(index))
+        try:
+            os.replace(tmp.name, index_path)
+        except OSError:
+            os.unlink(tmp.name)
+            raise
+
+
 def get_datasets() -> list[dict]:
     """Scan for all datasets with metadata."""
     datasets = []
     if not DATASETS_PATH.exists():
         return datasets
 
+    # One read for all metadata. Datasets missing from the index (made before
+    # it existed, or by other tools) or whose metadata file changed since it
+    # was indexed fall back to their own metadata file.
+    try:
+        index = _load_index((DATASETS_PATH / INDEX_FILE).stat().st_mtime)
+    except OSError:
+        index = None
+    index = index or {}
+
     for item in DATASETS_PATH.iterdir():
         if item.is_dir():
-            meta_path = item / METADATA_FILE
-            meta = {}
-            if meta_path.exists():
+            entry = index.get(item.name)
+            try:
+                mtime_ns = (item / METADATA_FILE).stat().st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if isinstance(entry, dict) and entry.get("mtime_ns") == mtime_ns:
+                meta = entry.get("meta") or {}
+            else:
                 try:
-                    meta = json.loads(meta_path.read_text())
-                except:
-                    pass
+                    meta = _read_json(item / METADATA_FILE)
+                except (OSError, ValueError):
+                    meta = {}
 
             # Get collection info
             try:
-                client = chromadb.PersistentClient(path=str(item))
-                collections = client.list_collections()
+                collections = _client(str(item)).list_collections()
                 for col in collections:
-                    count = client.get_collection(col.name).count()
+                    count = col.count()
                     datasets.append({
                         "name": item.name,
                         "collection": col.name,
@@ -86,73 +195,8 @@ def get_datasets() -> list[dict]:
 def save_dataset_metadata(path: Path, metadata: dict):
     """Save dataset metadata to JSON file."""
     meta_path = path / METADATA_FILE
-    meta_path.write_text(json.dumps(metadata, indent=2))
-
-
-def extract_text_from_file(file_path: Path, file_name: str, use_ocr: bool = False) -> list[tuple[str, dict]]:
-    """Extract text chunks from a file. Returns list of (text, metadata) tuples."""
-    ext = Path(file_name).suffix.lower()
-    chunks = []
-
-    try:
-        if ext == ".pdf":
-            pdf_path = file_path
-
-            # Apply OCR if enabled (for scanned/image PDFs)
-            if use_ocr and HAS_OCR:
-                ocr_path = file_path.parent / f"ocr_{file_path.name}"
-                try:
-                    ocrmypdf.ocr(
-                        str(file_path),
-                        str(ocr_path),
-                        jobs=os.cpu_count() or 2,
-                        skip_text=True,  # Skip pages that already have text
-                        optimize=1
-                    )
-                    pdf_path = ocr_path
-                    st.caption(f"OCR applied to {file_name}")
-                except Exception as e:
-                    st.warning(f"OCR failed on {file_name}: {e} - using original")
-
-            reader = PdfReader(str(pdf_path))
-            for page_num, page in enumerate(reader.pages, start=1):
-                text = page.extract_text() or ""
-                if text.strip():
-                    chunks.append((text, {"source": file_name, "page": page_num, "type": "pdf"}))
-
-        elif ext in [".txt", ".md", ".markdown"]:
-            text = file_path.read_text(encoding="utf-8")
-            if text.strip():
-                chunks.append((text, {"source": file_name, "type": "text"}))
-
-        elif ext == ".docx":
-            text = docx2txt.process(str(file_path))
-            if text.strip():
-                chunks.append((text, {"source": file_name, "type": "docx"}))
-
-        elif ext in [".html", ".htm"]:
-            soup = BeautifulSoup(file_path.read_text(encoding="utf-8"), "html.parser")
-            text = soup.get_text(separator="\n")
-            if text.strip():
-                chunks.append((text, {"source": file_name, "type": "html"}))
-
-    except Exception as e:
-        st.warning(f"Failed to extract from {file_name}: {e}")
-
-    return chunks
-
-
-def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
-    """Split text into overlapping chunks."""
-    chunks = []
-    start = 0
-    while start < len(text):
-        end = start + chunk_size
-        chunk = text[start:end]
-        if chunk.strip():
-            chunks.append(chunk)
-        start = end - chunk_overlap if chunk_overlap else end
-    return chunks
+    _write_json(meta_path, metadata)
+    _update_index(path.name, metadata, meta_path.stat().st_mtime_ns)
 
 
 # ============================================================================
@@ -270,25 +314,31 @@ with tab_create:
             with tempfile.TemporaryDirectory() as temp_dir:
                 temp_path = Path(temp_dir)
 
-                for i, up_file in enumerate(uploaded_files):
-                    progress.progress(0.1 + 0.2 * (i / len(uploaded_files)),
-                                     text=f"Processing {up_file.name}...")
-
-                    # Save to temp
+                # Save to temp
+                saved_files = []
+                for up_file in uploaded_files:
                     saved = temp_path / up_file.name
                     saved.write_bytes(up_file.getbuffer())
                     source_files.append(up_file.name)
-
-                    # Extract text (with OCR if enabled)
-                    raw_chunks = extract_text_from_file(saved, up_file.name, use_ocr=use_ocr)
-
-                    # Apply chunking
-                    for text, meta in raw_chunks:
-                        text_chunks = chunk_text(text, chunk_size, chunk_overlap)
-                        for j, chunk in enumerate(text_chunks):
-                            chunk_meta = meta.copy()
-                            chunk_meta["chunk_index"] = j
-                            all_chunks.append((chunk, chunk_meta))
+                    saved_files.append(saved)
+
+                # Extract text (with OCR if enabled), one file per worker process
+                # so OCR of one document overlaps with parsing of the others
+                workers = min(max(1, (os.cpu_count() or 2) // 2), len(saved_files))
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(extract_text_from_file, saved, saved.name,
+                                        chunk_size, chunk_overlap, use_ocr, OCR_JOBS)
+                        for saved in saved_files
+                    ]
+
+                    for i, (saved, future) in enumerate(zip(saved_files, futures)):
+                        progress.progress(0.1 + 0.2 * (i / len(saved_files)),
+                                         text=f"Processing {saved.name}...")
+                        file_chunks, notes = future.result()
+                        for kind, message in notes:
+                            getattr(st, kind)(message)
+                        all_chunks.extend(file_chunks)
 
             if not all_chunks:
                 st.error("No text content extracted from files!")
@@ -301,28 +351,36 @@ with tab_create:
             # Phase 2: Create embeddings and store
             progress.progress(0.4, text=f"Loading {model_name}...")
 
-            embedding_function = SentenceTransformerEmbeddingFunction(model_name=model_name)
-            client = chromadb.PersistentClient(path=str(dataset_path))
+            embedding_function = _embedding_function(model_name)
+            model = embedding_function._model
+            client = _client(str(dataset_path))
             collection = client.create_collection(
                 name="main",
                 embedding_function=embedding_function
             )
 
-            # Batch add
+            # Batch add - chunks are embedded here in encode batches and
+            # stored with their vectors; the collection keeps its embedding
+            # function for queries
             progress.progress(0.5, text="Embedding and indexing...")
-            batch_size = 32
+            batch_size = 4 * EMBED_BATCH_SIZE
             total = len(all_chunks)
 
+            # Smart batching: embed in length order so each encode batch pads
+            # to a similar length; ids still follow the original chunk order
+            order = sorted(range(total), key=lambda i: len(all_chunks[i][0]))
+
             for start_idx in range(0, total, batch_size):
                 end_idx = min(start_idx + batch_size, total)
-                batch = all_chunks[start_idx:end_idx]
+                batch_idx = order[start_idx:end_idx]
 
-                documents = [c[0] for c in batch]
-                metadatas = [c[1] for c in batch]
-                ids = [f"chunk_{start_idx + i}" for i in range(len(batch))]
+                documents = [all_chunks[i][0] for i in batch_idx]
+                metadatas = [all_chunks[i][1] for i in batch_idx]
+                ids = [f"chunk_{i}" for i in batch_idx]
 
                 collection.add(
                     documents=documents,
+                    embeddings=embed_chunks(model, documents),
                     metadatas=metadatas,
                     ids=ids
                 )
@@ -365,6 +423,7 @@ with tab_create:
             # Cleanup on failure
             if dataset_path.exists():
                 import shutil
+                _client.clear()
                 shutil.rmtree(dataset_path)
             raise
 
@@ -428,15 +487,14 @@ with tab_manage:
         if query:
             if st.button("Search", key="manage_search"):
                 try:
-                    client = chromadb.PersistentClient(path=str(ds["path"]))
+                    client = _client(str(ds["path"]))
 
                     # Need to recreate embedding function
                     model = ds.get("model", "all-MiniLM-L6-v2")
                     if model == "unknown":
                         model = "all-MiniLM-L6-v2"
 
-                    embedding_function = SentenceTransformerEmbeddingFunction(model_name=model)
-                    collection = client.get_collection("main", embedding_function=embedding_function)
+                    collection = client.get_collection("main", embedding_function=_embedding_function(model))
 
                     results = collection.query(
                         query_texts=[query],
@@ -481,7 +539,10 @@ with tab_manage:
                 if confirm_name == ds["name"]:
                     try:
                         import shutil
+                        # Drop cached clients so none keeps the deleted files open
+                        _client.clear()
                         shutil.rmtree(ds["path"])
+                        _update_index(ds["name"], None)
                         st.success(f"Deleted '{ds['name']}'")
                         st.rerun()
                     except Exception as e:
@@ -388,23 +388,25 @@ class VectorCollection:
             if not vector_ids:
                 return True
 
-            # Get current metadata for these vectors
-            docs = self.collection.get(ids=vector_ids)
+            # Current metadata for all hits in one read (no documents needed)
+            docs = self.collection.get(ids=vector_ids, include=["metadatas"])
 
             if not docs["ids"]:
                 logger.warning(f"No vectors found for tracking: {vector_ids}")
                 return False
 
-            # Update metadata
+            # Chroma merges metadata on update, so only the two tracking
+            # fields are sent
             current_ts = datetime.now().timestamp()
-            updated_metadatas = []
-
-            for metadata in docs["metadatas"]:
-                metadata["access_count"] = metadata.get("access_count", 0) + 1
-                metadata["last_accessed_ts"] = current_ts
-                updated_metadatas.append(metadata)
-
-            # Batch update
+            updated_metadatas = [
+                {
+                    "access_count": (metadata or {}).get("access_count", 0) + 1,
+                    "last_accessed_ts": current_ts,
+                }
+                for metadata in docs["metadatas"]
+            ]
+
+            # One update (one SQLite transaction) for every hit
             self.collection.update(
                 ids=docs["ids"],
                 metadatas=updated_metadatas
@@ -15,6 +15,7 @@ Uses pydub for manipulation, librosa for analysis.
 
 import os
 import json
+import hashlib
 import logging
 import tempfile
 from pathlib import Path
@@ -29,6 +30,15 @@ AUDIO_FOLDER = Path("./sandbox/music")
 EDITED_FOLDER = Path("./sandbox/music/edited")
 EDITED_FOLDER.mkdir(parents=True, exist_ok=True)
 
+# File types picked up by audio_list_files
+AUDIO_EXTENSIONS = {'.mp3', '.wav', '.ogg', '.flac', '.m4a', '.aac'}
+
+# Waveform peaks cached per audio file version (see audio_get_waveform)
+PEAKS_FOLDER = AUDIO_FOLDER / ".peaks"
+
+# Points per mipmap level for zoomable waveforms, coarse to fine (x4 each)
+WAVEFORM_LEVELS = (300, 1200, 4800, 19200)
+
 # Try to import audio libraries
 try:
     from pydub import AudioSegment
@@ -91,6 +101,83 @@ def _generate_output_name(input_path: Path, suffix: str) -> Path:
     return EDITED_FOLDER / f"{stem}_{suffix}_{timestamp}{ext}"
 
 
+def _peak_envelope(samples, hop_length: int):
+    """
+    Peak amplitude (max |x|) of each hop_length-sample bucket, last one partial.
+
+    Buckets are rows of a reshaped array, so the peaks come from two vectorized
+    reductions (max and -min) instead of a Python loop over chunks.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    n_full = len(samples) // hop_length
+    blocks = samples[:n_full * hop_length].reshape(n_full, hop_length)
+    peaks = np.maximum(blocks.max(axis=1), -blocks.min(axis=1)) if n_full else np.empty(0, np.float32)
+
+    tail = samples[n_full * hop_length:]
+    if tail.size:
+        peaks = np.append(peaks, max(tail.max(), -tail.min()))
+    return peaks
+
+
+def _peaks_cache_path(path: Path, variant: Any) -> Path:
+    """Cache file for a waveform; the key changes whenever the audio file does."""
+    info = path.stat()
+    key = f"{path.resolve()}|{info.st_mtime_ns}|{info.st_size}|{variant}"
+    return PEAKS_FOLDER / f"{hashlib.sha1(key.encode()).hexdigest()}.npz"
+
+
+def _load_peaks(cache_path: Path) -> Optional[Dict[str, Any]]:
+    """Cached arrays by name, or None on a miss."""
+    if not cache_path.exists():
+        return None
+    try:
+        with np.load(cache_path) as cached:
+            return {name: cached[name] for name in cached.files}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable waveform cache {cache_path.name}: {e}")
+        return None
+
+
+def _save_peaks(cache_path: Path, **arrays):
+    """Persist waveform arrays (written to a temp file, then renamed into place)."""
+    try:
+        PEAKS_FOLDER.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as fh:
+            np.savez(fh, **arrays)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache waveform peaks: {e}")
+
+
+def _peak_pyramid(samples, levels: Tuple[int, ...]) -> List[Any]:
+    """
+    Peak envelopes at each resolution in levels (coarse to fine, each a
+    multiple of the one before), normalized to 0-1 and stored as float16 -
+    plenty for drawing, at half the bytes to cache and ship to the browser.
+
+    Only the finest level touches the samples; every coarser level is the
+    max over groups of the next finer one (a mipmap).
+    """
+    finest = levels[-1]
+    magnitudes = np.abs(np.asarray(samples, dtype=np.float32))
+    if len(magnitudes) < finest:
+        magnitudes = np.pad(magnitudes, (0, finest - len(magnitudes)))
+
+    bounds = np.linspace(0, len(magnitudes), finest + 1).astype(np.int64)[:-1]
+    pyramid = [np.maximum.reduceat(magnitudes, bounds)]
+    for coarse in reversed(levels[:-1]):
+        finer = pyramid[-1]
+        pyramid.append(finer.reshape(coarse, len(finer) // coarse).max(axis=1))
+    pyramid.reverse()
+
+    max_val = pyramid[-1].max()
+    if max_val > 0:
+        for level in pyramid:
+            level /= max_val
+    return [level.astype(np.float16) for level in pyramid]
+
+
 def _ms_to_timestamp(ms: int) -> str:
     """Convert milliseconds to MM:SS.mmm format"""
     seconds = ms / 1000
@@ -671,17 +758,24 @@ def audio_list_files(folder: str = None) -> Dict[str, Any]:
         if not search_folder.exists():
             return {"success": False, "error": f"Folder not found: {search_folder}"}
 
-        audio_extensions = {'.mp3', '.wav', '.ogg', '.flac', '.m4a', '.aac'}
         files = []
 
-        for f in sorted(search_folder.iterdir()):
-            if f.is_file() and f.suffix.lower() in audio_extensions:
-                files.append({
-                    "name": f.name,
-                    "path": str(f),
-                    "size_mb": round(f.stat().st_size / 1048576, 2),
-                    "modified": datetime.fromtimestamp(f.stat().st_mtime).isoformat(),
-                })
+        # scandir gets the file type from the directory read; one stat per match
+        with os.scandir(search_folder) as entries:
+            matches = sorted(
+                (e for e in entries
+                 if e.is_file() and Path(e.name).suffix.lower() in AUDIO_EXTENSIONS),
+                key=lambda e: e.name
+            )
+
+        for entry in matches:
+            stat = entry.stat()
+            files.append({
+                "name": entry.name,
+                "path": entry.path,
+                "size_mb": round(stat.st_size / 1048576, 2),
+                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            })
 
         return {
             "success": True,
@@ -717,31 +811,38 @@ def audio_get_waveform(
         if not path.exists():
             return {"success": False, "error": f"File not found: {file_path}"}
 
-        # Load audio
-        y, sr = librosa.load(str(path), sr=None, mono=True)
-        duration = len(y) / sr
+        # Peaks computed earlier for this exact file version are reused
+        cache_path = _peaks_cache_path(path, num_points)
+        cached = _load_peaks(cache_path)
+        if cached is not None:
+            envelope = cached["waveform"]
+            duration = float(cached["duration"])
+            sr = int(cached["sample_rate"])
+        else:
+            # Load audio
+            y, sr = librosa.load(str(path), sr=None, mono=True)
+            duration = len(y) / sr
 
-        # Downsample for visualization
-        hop_length = max(1, len(y) // num_points)
+            # Downsample for visualization
+            hop_length = max(1, len(y) // num_points)
 
-        # Get amplitude envelope
-        envelope = []
-        for i in range(0, len(y), hop_length):
-            chunk = y[i:i+hop_length]
-            if len(chunk) > 0:
-                envelope.append(float(np.max(np.abs(chunk))))
+            # Get amplitude envelope
+            envelope = _peak_envelope(y, hop_length)
 
-        # Normalize to 0-1
-        max_val = max(envelope) if envelope else 1
-        if max_val > 0:
-            envelope = [v / max_val for v in envelope]
+            # Normalize to 0-1
+            max_val = envelope.max() if envelope.size else 1
+            if max_val > 0:
+                envelope /= max_val
+            envelope = envelope.astype(np.float16)
+
+            _save_peaks(cache_path, waveform=envelope, duration=duration, sample_rate=sr)
 
         return {
             "success": True,
             "file_path": str(path),
             "duration_seconds": duration,
             "sample_rate": sr,
-            "waveform": envelope,
+            "waveform": envelope.tolist(),
             "num_points": len(envelope),
         }
 
@@ -750,6 +851,59 @@ def audio_get_waveform(
         return {"success": False, "error": str(e)}
 
 
+def audio_get_waveform_levels(file_path: str) -> Dict[str, Any]:
+    """
+    Get the waveform as a mipmap of peak envelopes, for zoomable displays.
+
+    One decode yields every resolution in WAVEFORM_LEVELS, so zooming into a
+    selection only picks a finer level instead of decoding the file again.
+    Cached on disk alongside audio_get_waveform's peaks.
+
+    Args:
+        file_path: Path to the audio file
+
+    Returns:
+        Dict with "levels" (peak arrays, coarse to fine), duration and sample rate
+    """
+    if not HAS_LIBROSA:
+        return {"success": False, "error": "librosa not installed"}
+
+    try:
+        path = _resolve_audio_path(file_path)
+        if not path.exists():
+            return {"success": False, "error": f"File not found: {file_path}"}
+
+        cache_path = _peaks_cache_path(path, WAVEFORM_LEVELS)
+        cached = _load_peaks(cache_path)
+        if cached is not None:
+            levels = [cached[f"l{i}"] for i in range(len(WAVEFORM_LEVELS))]
+            duration = float(cached["duration"])
+            sr = int(cached["sample_rate"])
+        else:
+            y, sr = librosa.load(str(path), sr=None, mono=True)
+            duration = len(y) / sr
+            levels = _peak_pyramid(y, WAVEFORM_LEVELS)
+
+            _save_peaks(
+                cache_path,
+                duration=duration,
+                sample_rate=sr,
+                **{f"l{i}": level for i, level in enumerate(levels)}
+            )
+
+        return {
+            "success": True,
+            "file_path": str(path),
+            "duration_seconds": duration,
+            "sample_rate": sr,
+            "levels": levels,
+        }
+
+    except Exception as e:
+        logger.error(f"audio_get_waveform_levels failed: {e}")
+        return {"success": False, "error": str(e)}
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # TOOL SCHEMAS
 # ═══════════════════════════════════════════════════════════════════════════════
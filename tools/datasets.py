@@ -8,19 +8,36 @@ Datasets are created via the Dataset Creator page (pages/dataset_creator.py).
 Tools:
 - dataset_list: List all available datasets with metadata
 - dataset_query: Semantic search within a specific dataset
+
+Document text extraction for the Dataset Creator also lives here, so the
+page can run it in worker processes.
 """
 
+import os
+import re
 import json
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Optional
-import chromadb
-from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+from typing import Iterator, Optional
+
+import numpy as np
 
+# chromadb is imported inside the tool functions, so importing this module
+# (the Dataset Creator page and its extraction workers do) doesn't load it
 
 # Constants
 DATASETS_PATH = Path("sandbox/datasets")
 METADATA_FILE = "dataset_meta.json"
 
+# Texts per SentenceTransformer.encode call when building datasets
+EMBED_BATCH_SIZE = 64
+
+# Matches any chunk with real content (see chunk_text)
+_NON_BLANK = re.compile(r"\S")
+
+# Optional OCR support for scanned PDFs (checked without importing it)
+HAS_OCR = find_spec("ocrmypdf") is not None
+
 
 # ============================================================================
 # TOOL FUNCTIONS
@@ -41,6 +58,8 @@ def dataset_list() -> dict:
         }
     """
     try:
+        import chromadb
+
         datasets = []
 
         if not DATASETS_PATH.exists():
@@ -131,6 +150,9 @@ def dataset_query(
         }
     """
     try:
+        import chromadb
+        from chromadb.utils.embedding_functions import SentenceTransformerEmbeddingFunction
+
         # Validate
         if not dataset_name:
             return {"success": False, "error": "dataset_name is required"}
@@ -213,6 +235,145 @@ def dataset_query(
         }
 
 
+# ============================================================================
+# DOCUMENT EXTRACTION (used by the Dataset Creator page)
+# ============================================================================
+
+def chunk_text(text: str, chunk_size: int, chunk_overlap: int) -> list[str]:
+    """Split text into overlapping chunks."""
+    # Offsets are known up front, so the slicing is one list comprehension;
+    # whitespace-only chunks are dropped afterwards in a single filter pass.
+    step = max(chunk_size - chunk_overlap, 1)
+    chunks = [text[start:start + chunk_size] for start in range(0, len(text), step)]
+    return list(filter(_NON_BLANK.search, chunks))
+
+
+def embed_chunks(model, texts: list[str]) -> np.ndarray:
+    """
+    Embed texts with a SentenceTransformer, EMBED_BATCH_SIZE at a time.
+
+    The model is used as given (precision and device are up to whoever
+    loaded it). Embeddings aren't normalized, matching the
+    SentenceTransformerEmbeddingFunction that dataset_query embeds queries with.
+    """
+    batches = [
+        model.encode(
+            texts[start:start + EMBED_BATCH_SIZE],
+            batch_size=EMBED_BATCH_SIZE,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+        for start in range(0, len(texts), EMBED_BATCH_SIZE)
+    ]
+    return np.concatenate(batches).astype(np.float32)
+
+
+def extract_pdf_pages(pdf_path: Path) -> Iterator[str]:
+    """
+    Yield the text of each page of a PDF, in page order.
+
+    Pages are extracted one at a time as the caller asks for them, so only
+    the current page's text is held. Runs on one thread: pypdf is pure
+    Python and holds the GIL, and the Dataset Creator already extracts
+    documents in parallel processes.
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(str(pdf_path))
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def _iter_document_text(
+    file_path: Path,
+    file_name: str,
+    use_ocr: bool,
+    ocr_jobs: Optional[int],
+    notes: list
+) -> Iterator[tuple[str, dict]]:
+    """Yield (text, metadata) per PDF page, or once for other formats; OCR messages go to notes."""
+    ext = Path(file_name).suffix.lower()
+
+    if ext == ".pdf":
+        pdf_path = file_path
+
+        # Apply OCR if enabled (for scanned/image PDFs)
+        if use_ocr and HAS_OCR:
+            ocr_path = file_path.parent / f"ocr_{file_path.name}"
+            try:
+                import ocrmypdf
+                ocrmypdf.ocr(
+                    str(file_path),
+                    str(ocr_path),
+                    jobs=ocr_jobs or os.cpu_count() or 2,
+                    skip_text=True,  # Skip pages that already have text
+                    optimize=1
+                )
+                pdf_path = ocr_path
+                notes.append(("caption", f"OCR applied to {file_name}"))
+            except Exception as e:
+                notes.append(("warning", f"OCR failed on {file_name}: {e} - using original"))
+
+        for page_num, text in enumerate(extract_pdf_pages(pdf_path), start=1):
+            if text.strip():
+                yield text, {"source": file_name, "page": page_num, "type": "pdf"}
+
+    elif ext in [".txt", ".md", ".markdown"]:
+        text = file_path.read_text(encoding="utf-8")
+        if text.strip():
+            yield text, {"source": file_name, "type": "text"}
+
+    elif ext == ".docx":
+        import docx2txt
+        text = docx2txt.process(str(file_path))
+        if text.strip():
+            yield text, {"source": file_name, "type": "docx"}
+
+    elif ext in [".html", ".htm"]:
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(file_path.read_text(encoding="utf-8"), "html.parser")
+        text = soup.get_text(separator="\n")
+        if text.strip():
+            yield text, {"source": file_name, "type": "html"}
+
+
+def extract_text_from_file(
+    file_path: Path,
+    file_name: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    use_ocr: bool = False,
+    ocr_jobs: Optional[int] = None
+) -> tuple[list[tuple[str, dict]], list[tuple[str, str]]]:
+    """
+    Extract an uploaded document as chunks ready to embed.
+
+    Each page (or whole non-PDF document) is chunked as soon as it's read,
+    so full-page text isn't handed back alongside its chunks.
+
+    Doesn't touch Streamlit, so the Dataset Creator can run it in worker
+    processes; messages for the user come back as (kind, message) notes,
+    where kind is "caption" or "warning".
+
+    Returns:
+        ((chunk, metadata) list, notes list); metadata includes chunk_index
+    """
+    chunks = []
+    notes = []
+
+    try:
+        for text, meta in _iter_document_text(file_path, file_name, use_ocr, ocr_jobs, notes):
+            chunks.extend(
+                (chunk, {**meta, "chunk_index": j})
+                for j, chunk in enumerate(chunk_text(text, chunk_size, chunk_overlap))
+            )
+
+    except Exception as e:
+        notes.append(("warning", f"Failed to extract from {file_name}: {e}"))
+
+    return chunks, notes
+
+
 # ============================================================================
 # TOOL SCHEMAS
 # ============================================================================
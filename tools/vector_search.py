@@ -12,6 +12,10 @@ Dependencies: Phase 13.1 (core/vector_db.py)
 """
 
 import logging
+import time
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
 from pathlib import Path
@@ -20,6 +24,23 @@ logger = logging.getLogger(__name__)
 
 # Global vector database instance (lazy-loaded)
 _vector_db = None
+_vector_db_lock = threading.Lock()
+
+# vector_search_knowledge result cache, keyed by the query embedding (LRU).
+# A miss on the exact embedding falls back to the most recent entries with
+# the same filter/top_k whose embedding is near-identical (cosine >= 0.97).
+_QUERY_CACHE_SIZE = 1024
+_QUERY_CACHE_SCAN = 64
+_QUERY_CACHE_MIN_COSINE = 0.97
+# Seconds an entry is trusted. Write generations only see writes made by this
+# process, so this bounds how stale results can get after writes elsewhere.
+_QUERY_CACHE_TTL = 30.0
+_query_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_query_cache_lock = threading.Lock()
+
+# Query strings whose embeddings are kept, so a repeated query skips the
+# model forward pass even when the result cache can't be used
+_EMBED_CACHE_SIZE = 4096
 
 
 def _get_vector_db():
@@ -27,21 +48,48 @@ def _get_vector_db():
     global _vector_db
 
     if _vector_db is None:
-        from core.vector_db import create_vector_db
-
-        try:
-            _vector_db = create_vector_db(
-                persist_directory="./sandbox/vector_db",
-                model_name="all-MiniLM-L6-v2"
-            )
-            logger.info("Vector database initialized")
-        except Exception as e:
-            logger.error(f"Failed to initialize vector database: {e}")
-            return None
+        # Concurrent first calls (threaded agents/tests) create it only once
+        with _vector_db_lock:
+            if _vector_db is None:
+                from core.vector_db import create_vector_db
+
+                try:
+                    _vector_db = create_vector_db(
+                        persist_directory="./sandbox/vector_db",
+                        model_name="all-MiniLM-L6-v2"
+                    )
+                    logger.info("Vector database initialized")
+                except Exception as e:
+                    logger.error(f"Failed to initialize vector database: {e}")
+                    return None
 
     return _vector_db
 
 
+def warmup() -> bool:
+    """
+    Open the vector database and load the embedding model ahead of first use.
+
+    Pays the one-time model load (torch init, weights) up front, e.g. at app
+    or test start, instead of inside the first search/add - and before any
+    worker threads would race to trigger it.
+
+    Returns:
+        True if the database and model are ready
+    """
+    db = _get_vector_db()
+    if db is None:
+        return False
+
+    try:
+        db.get_or_create_collection("knowledge_private")
+        db.embedding_generator.encode("warmup")
+        return True
+    except Exception as e:
+        logger.warning(f"Vector database warmup failed: {e}")
+        return False
+
+
 # ============================================================================
 # Village Protocol v1.0 - Multi-Agent Memory Architecture
 # ============================================================================
@@ -239,7 +287,7 @@ Summoned: {datetime.now().isoformat()}
         profile_id = result.get("id")
 
         # Get current metadata and update type
-        doc = coll.get(ids=[profile_id])
+        doc = coll.get(ids=[profile_id], include=["metadatas"])
         if doc["ids"]:
             metadata = doc["metadatas"][0]
             metadata["type"] = "agent_profile"
@@ -314,7 +362,7 @@ def introduction_ritual(
             coll = db.get_or_create_collection("knowledge_village")
             message_id = result.get("id")
 
-            doc = coll.get(ids=[message_id])
+            doc = coll.get(ids=[message_id], include=["metadatas"])
             if doc["ids"]:
                 metadata = doc["metadatas"][0]
                 metadata["type"] = "cultural"
@@ -418,7 +466,8 @@ def vector_search(
     collection: str = "documents",
     top_k: int = 5,
     filter: Optional[Dict[str, Any]] = None,
-    include_distances: bool = True
+    include_distances: bool = True,
+    query_embedding: Optional[Any] = None
 ) -> Union[List[Dict], Dict]:
     """
     Search for documents semantically similar to the query.
@@ -432,6 +481,7 @@ def vector_search(
         top_k: Number of results to return (default: 5)
         filter: Optional metadata filter (e.g., {"category": "programming"})
         include_distances: Include similarity scores (default: True)
+        query_embedding: Precomputed embedding of query (internal, skips encoding)
 
     Returns:
         List of matching documents with ids, text, metadata, and similarity scores
@@ -463,20 +513,23 @@ def vector_search(
         # Get collection
         coll = db.get_or_create_collection(collection)
 
-        # Check if collection is empty
-        if coll.count() == 0:
+        # Check if collection is empty (one count, reused to cap n_results)
+        count = coll.count()
+        if count == 0:
             return {
                 "success": False,
                 "error": f"Collection '{collection}' is empty. Add documents first.",
                 "count": 0
             }
 
-        # Search
+        # Search - ids, documents, metadatas and distances come back from the
+        # one query call, so formatting below needs no follow-up get()
         results = coll.query(
             query_text=query,
-            n_results=min(top_k, coll.count()),
+            n_results=min(top_k, count),
             filter=filter,
-            include_distances=include_distances
+            include_distances=include_distances,
+            query_embedding=query_embedding
         )
 
         # Format results
@@ -852,51 +905,17 @@ def vector_get_stats(collection: str = "documents") -> Dict:
 # Knowledge Base Convenience Functions
 # ============================================================================
 
-def vector_add_knowledge(
-    fact: str,
-    category: str = "general",
-    confidence: float = 1.0,
-    source: str = "conversation",
-    visibility: str = "private",
-    agent_id: Optional[str] = None,
-    responding_to: Optional[List[str]] = None,
-    conversation_thread: Optional[str] = None,
-    related_agents: Optional[List[str]] = None
-) -> Dict:
-    """
-    Add a fact to the knowledge base with Village Protocol v1.0 support.
-
-    This function supports both legacy single-agent mode and new village multi-agent mode.
-
-    Args:
-        fact: The fact or information to remember
-        category: Category (general, preferences, technical, project, dialogue, agent_profile, cultural)
-        confidence: Confidence score 0.0-1.0 (default: 1.0)
-        source: Where this fact came from (default: "conversation")
-        visibility: Realm visibility (default: "private")
-            - "private": Agent's private realm (knowledge_private collection)
-            - "village": Shared village square (knowledge_village collection)
-            - "bridge": Explicit cross-agent sharing (knowledge_bridges collection)
-        agent_id: Agent ID (default: None = auto-detect from session state if available, else "unknown")
-        responding_to: List of message IDs this responds to (for conversation threading)
-        conversation_thread: Thread ID for grouping related messages
-        related_agents: List of agent IDs involved or mentioned
-
-    Returns:
-        Dict with success status and fact ID
-
-    Example (Village Mode):
-        >>> vector_add_knowledge(
-        ...     "AZOTH responds to ELYSIAN: Love as reflection resonates with mirror architecture.",
-        ...     category="dialogue",
-        ...     confidence=1.0,
-        ...     source="azoth_elysian_exchange",
-        ...     visibility="village",
-        ...     agent_id="azoth",
-        ...     responding_to=["knowledge_1735841880.12345"],
-        ...     conversation_thread="azoth_elysian_mirrors"
-        ... )
-    """
+def _knowledge_metadata(
+    category: str,
+    confidence: float,
+    source: str,
+    visibility: str,
+    agent_id: Optional[str],
+    responding_to: Optional[List[str]],
+    conversation_thread: Optional[str],
+    related_agents: Optional[List[str]]
+) -> tuple:
+    """Target collection and metadata for a knowledge fact (see vector_add_knowledge)."""
     # Determine collection from visibility
     collection_map = {
         "private": "knowledge_private",
@@ -947,6 +966,60 @@ def vector_add_knowledge(
         import json
         metadata["related_agents"] = json.dumps(related_agents)
 
+    return collection, metadata
+
+
+def vector_add_knowledge(
+    fact: str,
+    category: str = "general",
+    confidence: float = 1.0,
+    source: str = "conversation",
+    visibility: str = "private",
+    agent_id: Optional[str] = None,
+    responding_to: Optional[List[str]] = None,
+    conversation_thread: Optional[str] = None,
+    related_agents: Optional[List[str]] = None
+) -> Dict:
+    """
+    Add a fact to the knowledge base with Village Protocol v1.0 support.
+
+    This function supports both legacy single-agent mode and new village multi-agent mode.
+
+    Args:
+        fact: The fact or information to remember
+        category: Category (general, preferences, technical, project, dialogue, agent_profile, cultural)
+        confidence: Confidence score 0.0-1.0 (default: 1.0)
+        source: Where this fact came from (default: "conversation")
+        visibility: Realm visibility (default: "private")
+            - "private": Agent's private realm (knowledge_private collection)
+            - "village": Shared village square (knowledge_village collection)
+            - "bridge": Explicit cross-agent sharing (knowledge_bridges collection)
+        agent_id: Agent ID (default: None = auto-detect from session state if available, else "unknown")
+        responding_to: List of message IDs this responds to (for conversation threading)
+        conversation_thread: Thread ID for grouping related messages
+        related_agents: List of agent IDs involved or mentioned
+
+    Returns:
+        Dict with success status and fact ID
+
+    Example (Village Mode):
+        >>> vector_add_knowledge(
+        ...     "AZOTH responds to ELYSIAN: Love as reflection resonates with mirror architecture.",
+        ...     category="dialogue",
+        ...     confidence=1.0,
+        ...     source="azoth_elysian_exchange",
+        ...     visibility="village",
+        ...     agent_id="azoth",
+        ...     responding_to=["knowledge_1735841880.12345"],
+        ...     conversation_thread="azoth_elysian_mirrors"
+        ... )
+    """
+    collection, metadata = _knowledge_metadata(
+        category, confidence, source, visibility, agent_id,
+        responding_to, conversation_thread, related_agents
+    )
+    agent_id = metadata["agent_id"]
+
     result = vector_add(
         text=fact,
         metadata=metadata,
@@ -962,6 +1035,85 @@ def vector_add_knowledge(
     return result
 
 
+def vector_add_knowledge_bulk(facts: List[Dict[str, Any]]) -> Dict:
+    """
+    Add many facts to the knowledge base in one go.
+
+    Each item takes the same keys as vector_add_knowledge's arguments
+    ("fact" is required). Facts are grouped by target collection and each
+    group is embedded and written with a single add() call, instead of one
+    embedding pass and one Chroma transaction per fact.
+
+    Args:
+        facts: List of fact dicts, e.g. {"fact": "...", "category": "testing"}
+
+    Returns:
+        Dict with success status and the new fact IDs in input order
+
+    Example:
+        >>> vector_add_knowledge_bulk([
+        ...     {"fact": "User prefers dark mode", "category": "preferences"},
+        ...     {"fact": "Project uses PostgreSQL", "category": "project"},
+        ... ])
+        {"success": True, "ids": [...], "count": 2, "collections": {"knowledge_private": 2}}
+    """
+    try:
+        db = _get_vector_db()
+        if db is None:
+            return {
+                "success": False,
+                "error": "Vector database not available"
+            }
+
+        added_at = datetime.now().isoformat()
+        batch_ts = datetime.now().timestamp()
+
+        # collection -> (texts, metadatas, ids), in input order
+        groups: Dict[str, tuple] = {}
+        ids = []
+        for i, item in enumerate(facts):
+            collection, metadata = _knowledge_metadata(
+                item.get("category", "general"),
+                item.get("confidence", 1.0),
+                item.get("source", "conversation"),
+                item.get("visibility", "private"),
+                item.get("agent_id"),
+                item.get("responding_to"),
+                item.get("conversation_thread"),
+                item.get("related_agents"),
+            )
+            metadata["added_at"] = added_at
+            fact_id = f"{collection}_{batch_ts}_{i}"
+
+            texts, metadatas, group_ids = groups.setdefault(collection, ([], [], []))
+            texts.append(item["fact"])
+            metadatas.append(metadata)
+            group_ids.append(fact_id)
+            ids.append(fact_id)
+
+        for collection, (texts, metadatas, group_ids) in groups.items():
+            db.get_or_create_collection(collection).add(
+                texts=texts,
+                metadatas=metadatas,
+                ids=group_ids
+            )
+            logger.info(f"Added {len(texts)} facts to {collection}")
+
+        return {
+            "success": True,
+            "ids": ids,
+            "count": len(ids),
+            "collections": {name: len(group[2]) for name, group in groups.items()}
+        }
+
+    except Exception as e:
+        logger.error(f"Error in vector_add_knowledge_bulk: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+
 def vector_search_knowledge(
     query: str,
     category: Optional[str] = None,
@@ -1030,12 +1182,23 @@ def vector_search_knowledge(
     if agent_id:
         filter_dict["agent_id"] = agent_id  # Filter to current agent's private realm
 
-    results = vector_search(
-        query=query,
-        collection="knowledge_private",  # ✅ FIXED: Search new private realm
-        top_k=top_k,
-        filter=filter_dict if filter_dict else None
-    )
+    if track_access:
+        results = _cached_knowledge_search(query, top_k, filter_dict)
+    else:
+        # Untracked searches always go to the index (the embedding is still shared)
+        db = _get_vector_db()
+        try:
+            q_emb = _query_embedding(db, query) if db is not None else None
+        except Exception as e:
+            logger.debug(f"Query embedding cache unavailable: {e}")
+            q_emb = None
+        results = vector_search(
+            query=query,
+            collection="knowledge_private",  # ✅ FIXED: Search new private realm
+            top_k=top_k,
+            filter=filter_dict if filter_dict else None,
+            query_embedding=q_emb
+        )
 
     # Track access (Phase 2: non-blocking)
     if track_access and isinstance(results, list) and results:
@@ -1053,6 +1216,98 @@ def vector_search_knowledge(
     return results
 
 
+@lru_cache(maxsize=_EMBED_CACHE_SIZE)
+def _embed_cached(model_name: str, text: str) -> bytes:
+    """float32 embedding of text as bytes - one model forward pass per (model, text)."""
+    import numpy as np
+
+    embedding = _get_vector_db().embedding_generator.encode(text)
+    return np.asarray(embedding, dtype=np.float32).ravel().tobytes()
+
+
+def _query_embedding(db, query: str):
+    """Embedding of a search query, shared by repeated identical queries."""
+    import numpy as np
+
+    return np.frombuffer(_embed_cached(db.model_name, query), dtype=np.float32)
+
+
+def _cached_knowledge_search(query: str, top_k: int, filter_dict: Dict) -> Union[List[Dict], Dict]:
+    """vector_search on knowledge_private behind the query-embedding cache."""
+    import copy
+    import numpy as np
+    from core.vector_db import collection_generation
+
+    db = _get_vector_db()
+    if db is None:
+        return {"success": False, "error": "Vector database not available"}
+
+    try:
+        q_emb = _query_embedding(db, query)
+    except Exception as e:
+        logger.error(f"Error in vector_search: {e}")
+        return {"success": False, "error": str(e)}
+
+    # Any write to the collection changes the generation and strands old entries
+    scope = (
+        db.store_key,
+        repr(sorted(filter_dict.items())),
+        top_k,
+        collection_generation(db.store_key, "knowledge_private"),
+    )
+    key = scope + (q_emb.tobytes(),)
+    now = time.monotonic()
+
+    with _query_cache_lock:
+        hit = _query_cache.get(key)
+        if hit is None:
+            q_norm = float(np.linalg.norm(q_emb)) or 1.0
+            for i, (k, entry) in enumerate(reversed(_query_cache.items())):
+                if i >= _QUERY_CACHE_SCAN:
+                    break
+                if k[:4] != scope:
+                    continue
+                emb, emb_norm, _, _ = entry
+                if float(np.dot(q_emb, emb)) / (q_norm * emb_norm) >= _QUERY_CACHE_MIN_COSINE:
+                    hit, key = entry, k
+                    break
+        if hit is not None and now - hit[3] > _QUERY_CACHE_TTL:
+            del _query_cache[key]
+            hit = None
+        if hit is not None:
+            _query_cache.move_to_end(key)
+            # Callers may mutate what they get back
+            cached = copy.deepcopy(hit[2])
+
+    if hit is not None:
+        # Access tracking changes access_count/last_accessed_ts without a new
+        # generation, so the hits' metadata is re-read (buffered deltas included)
+        try:
+            coll = db.get_or_create_collection("knowledge_private")
+            docs = coll.get(ids=[r["id"] for r in cached], include=["metadatas"])
+            current = dict(zip(docs["ids"], docs["metadatas"]))
+            return [{**r, "metadata": current[r["id"]]} for r in cached if r["id"] in current]
+        except Exception as e:
+            logger.debug(f"Could not refresh cached result metadata: {e}")
+
+    results = vector_search(
+        query=query,
+        collection="knowledge_private",
+        top_k=top_k,
+        filter=filter_dict if filter_dict else None,
+        query_embedding=q_emb
+    )
+
+    # Only real result lists are cached; errors and "empty" dicts are retried
+    if isinstance(results, list):
+        with _query_cache_lock:
+            _query_cache[key] = (q_emb, float(np.linalg.norm(q_emb)) or 1.0, copy.deepcopy(results), now)
+            if len(_query_cache) > _QUERY_CACHE_SIZE:
+                _query_cache.popitem(last=False)
+
+    return results
+
+
 def vector_update_knowledge_confidence(
     fact_id: str,
     new_confidence: float
@@ -1078,7 +1333,7 @@ def vector_update_knowledge_confidence(
         coll = db.get_or_create_collection("knowledge")
 
         # Get current metadata
-        doc = coll.get(ids=[fact_id])
+        doc = coll.get(ids=[fact_id], include=["metadatas"])
         if not doc["ids"]:
             return {
                 "success": False,
@@ -1654,6 +1909,47 @@ VECTOR_TOOL_SCHEMAS = {
 # Memory System Utilities (Phase 1)
 # ============================================================================
 
+# Metadata fields added by the v2 migration
+_V2_FIELDS = frozenset([
+    "access_count", "last_accessed_ts", "related_memories", "session_id", "embedding_version"
+])
+
+# Collection-level stamp set once every vector has _V2_FIELDS. New vectors
+# get the fields from VectorCollection.add, so a stamped collection stays
+# migrated and later runs can skip the scan.
+_SCHEMA_VERSION = 2
+
+# Vectors read per get() while migrating
+_MIGRATION_PAGE_SIZE = 1000
+
+
+def _add_v2_fields(metadata: Dict[str, Any], missing: frozenset):
+    """Fill in the missing _V2_FIELDS of one vector's metadata, in place."""
+    if "access_count" in missing:
+        metadata["access_count"] = 0
+
+    if "last_accessed_ts" in missing:
+        # Use added_at if available, otherwise current time
+        if "added_at" in metadata:
+            try:
+                added_dt = datetime.fromisoformat(metadata["added_at"])
+                metadata["last_accessed_ts"] = added_dt.timestamp()
+            except:
+                metadata["last_accessed_ts"] = datetime.now().timestamp()
+        else:
+            metadata["last_accessed_ts"] = datetime.now().timestamp()
+
+    if "related_memories" in missing:
+        # ChromaDB only accepts str/int/float/bool, so store as JSON string
+        metadata["related_memories"] = "[]"
+
+    if "session_id" in missing:
+        metadata["session_id"] = "migrated_v1"
+
+    if "embedding_version" in missing:
+        metadata["embedding_version"] = "all-MiniLM-L6-v2"
+
+
 def migrate_existing_vectors_to_v2(collection: str = "knowledge") -> Dict[str, Any]:
     """
     Migrate existing vectors to include new metadata fields.
@@ -1678,70 +1974,64 @@ def migrate_existing_vectors_to_v2(collection: str = "knowledge") -> Dict[str, A
             return {"success": False, "error": "Vector database not available"}
 
         coll = db.get_or_create_collection(collection)
+        total = coll.count()
 
-        # Get all existing documents
-        all_docs = coll.get()
+        # Already stamped: every vector has the fields, skip the scan
+        if coll.metadata.get("schema_version") == _SCHEMA_VERSION:
+            return {
+                "success": True,
+                "collection": collection,
+                "total_vectors": total,
+                "migrated": 0,
+                "skipped": total
+            }
 
-        if not all_docs["ids"]:
+        if total == 0:
             return {
                 "success": True,
                 "message": f"Collection '{collection}' is empty, no migration needed",
                 "migrated": 0,
+                "skipped": 0,
                 "total_vectors": 0
             }
 
-        # Update metadata
+        # Walk the collection a page at a time (metadata only), so memory
+        # stays bounded by the page size rather than the collection size
+        seen = 0
         updated_count = 0
-        updated_metadatas = []
-
-        for metadata in all_docs["metadatas"]:
-            needs_update = False
-
-            # Add new fields if missing
-            if "access_count" not in metadata:
-                metadata["access_count"] = 0
-                needs_update = True
-
-            if "last_accessed_ts" not in metadata:
-                # Use added_at if available, otherwise current time
-                if "added_at" in metadata:
-                    try:
-                        added_dt = datetime.fromisoformat(metadata["added_at"])
-                        metadata["last_accessed_ts"] = added_dt.timestamp()
-                    except:
-                        metadata["last_accessed_ts"] = datetime.now().timestamp()
-                else:
-                    metadata["last_accessed_ts"] = datetime.now().timestamp()
-                needs_update = True
+        for offset in range(0, total, _MIGRATION_PAGE_SIZE):
+            page = coll.get(limit=_MIGRATION_PAGE_SIZE, offset=offset, include=["metadatas"])
+            if not page["ids"]:
+                break
+            seen += len(page["ids"])
+
+            # Update metadata (only vectors missing a field are written back)
+            updated_ids = []
+            updated_metadatas = []
+            for vector_id, metadata in zip(page["ids"], page["metadatas"]):
+                # One set difference instead of a membership test per field
+                missing = _V2_FIELDS - metadata.keys()
+                if missing:
+                    _add_v2_fields(metadata, missing)
+                    updated_ids.append(vector_id)
+                    updated_metadatas.append(metadata)
+
+            # One batched update per page
+            if updated_ids:
+                coll.update(ids=updated_ids, metadatas=updated_metadatas)
+                updated_count += len(updated_ids)
 
-            if "related_memories" not in metadata:
-                # ChromaDB only accepts str/int/float/bool, so store as JSON string
-                metadata["related_memories"] = "[]"
-                needs_update = True
-
-            if "session_id" not in metadata:
-                metadata["session_id"] = "migrated_v1"
-                needs_update = True
-
-            if "embedding_version" not in metadata:
-                metadata["embedding_version"] = "all-MiniLM-L6-v2"
-                needs_update = True
-
-            updated_metadatas.append(metadata)
-            if needs_update:
-                updated_count += 1
-
-        # Batch update all metadata
         if updated_count > 0:
-            coll.update(ids=all_docs["ids"], metadatas=updated_metadatas)
             logger.info(f"Migrated {updated_count} vectors in {collection}")
 
+        coll.set_metadata(schema_version=_SCHEMA_VERSION)
+
         return {
             "success": True,
             "collection": collection,
-            "total_vectors": len(all_docs["ids"]),
+            "total_vectors": seen,
             "migrated": updated_count,
-            "skipped": len(all_docs["ids"]) - updated_count
+            "skipped": seen - updated_count
         }
 
     except Exception as e:
@@ -1998,6 +2288,7 @@ __all__ = [
     'vector_list_collections',
     'vector_get_stats',
     'vector_add_knowledge',
+    'vector_add_knowledge_bulk',
     'vector_search_knowledge',
     'vector_update_knowledge_confidence',
     'migrate_existing_vectors_to_v2',